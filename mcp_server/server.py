@@ -9,7 +9,9 @@ Provides tools and resources for multi-project knowledge bases.
 
 import sys
 import json
-import sqlite3
+import time
+from io import TextIOWrapper
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
@@ -19,7 +21,7 @@ sys.path.insert(0, str(repo_root / "shared" / "src"))
 # NOTE: Do NOT add src/ to path - causes import conflicts with shared/src/extraction
 
 from project import ProjectManager, Project
-from extraction import SourceManager, ExtractionRunner, DatabaseLoader
+from extraction import SourceManager, DatabaseLoader, ExtractionJobQueue, ExtractionWorker
 
 # Add src/ to path AFTER shared imports for other modules
 sys.path.insert(0, str(repo_root / "src"))
@@ -27,9 +29,19 @@ sys.path.insert(0, str(repo_root / "src"))
 # Import new modules for Tier 1 features
 from analysis.coverage_analyzer import CoverageAnalyzer
 from visualization.diagram_generator import MermaidDiagramGenerator
+from database.query_engine import QueryEngine
+from database import universal_search
+from database.passages import DEFAULT_TOKEN_BUDGET, build_passages
+from database.fts_query import ranked_match
+from database.hydration import hydrate_rows
+from database.search_legs import DEFAULT_LATENCY_BUDGET_MS
+from database.embeddings_setup import refresh_embeddings
+from utils.answer_recorder import CSV_HEADER, build_answer_row, append_answer_rows, load_questions
+from utils.tool_pool import ToolPool, READ, WRITE
 
 # Import MCP SDK
 try:
+    import anyio
     from mcp.server import Server
     from mcp.server.stdio import stdio_server
     from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
@@ -45,6 +57,48 @@ app = Server("knowledge-platform")
 # Initialize ProjectManager
 pm = ProjectManager(repo_root)
 
+# Resident query engine (created and warmed up in main())
+engine: Optional[QueryEngine] = None
+_engine_lock = threading.Lock()
+
+# Tool bodies block (SQLite, NumPy, extraction), so they run on bounded pools
+# off the event loop: reads side by side, writes one at a time
+tool_pool = ToolPool()
+
+
+# Background extraction worker per project (jobs persist in data/extraction_jobs.db)
+job_workers: Dict[str, ExtractionWorker] = {}
+_job_workers_lock = threading.Lock()
+
+
+def get_engine() -> QueryEngine:
+    """Get the process-wide query engine, creating it if main() has not."""
+    global engine
+    with _engine_lock:
+        if engine is None:
+            engine = QueryEngine()
+            engine.start_warmup()
+        return engine
+
+
+def get_job_worker(project: Project) -> ExtractionWorker:
+    """Get the running extraction worker for a project, starting it on first use."""
+    with _job_workers_lock:
+        worker = job_workers.get(project.project_id)
+        if worker is None:
+            database_path = Path(project.database_path)
+
+            worker = ExtractionWorker(
+                ExtractionJobQueue(pm.projects_dir / project.project_id),
+                # Embeddings for new/changed rows are refreshed after each source loads
+                after_load=refresh_embeddings,
+                # New rows/tables: drop cached catalog and vector stores for this database
+                on_job_done=lambda job: get_engine().invalidate(database_path)
+            )
+            worker.start()
+            job_workers[project.project_id] = worker
+        return worker
+
 
 # ============================================================================
 # TOOLS
@@ -73,6 +127,15 @@ async def list_tools() -> List[Tool]:
                     "project_id": {
                         "type": "string",
                         "description": "Optional: specific project to query (defaults to current project)"
+                    },
+                    "full_text": {
+                        "type": "boolean",
+                        "description": "Return complete source text instead of best-matching passages",
+                        "default": False
+                    },
+                    "token_budget": {
+                        "type": "integer",
+                        "description": f"Approximate tokens of passage text in the response (default {DEFAULT_TOKEN_BUDGET})"
                     }
                 },
                 "required": ["query"]
@@ -124,9 +187,10 @@ async def list_tools() -> List[Tool]:
         Tool(
             name="extract_knowledge",
             description=(
-                "Run knowledge extraction on unextracted sources in current project. "
+                "Queue knowledge extraction for unextracted sources in current project. "
                 "Use after adding materials to extract entities and relationships. "
-                "Shows progress in real-time."
+                "Returns job IDs immediately; extraction runs in the background "
+                "(follow it with extraction_job_status)."
             ),
             inputSchema={
                 "type": "object",
@@ -145,6 +209,61 @@ async def list_tools() -> List[Tool]:
             }
         ),
 
+        Tool(
+            name="extraction_job_status",
+            description=(
+                "Show progress of background extraction jobs: status, steps completed, "
+                "the category being extracted and per-category throughput. "
+                "Omit job_id to list recent jobs."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Optional: job to inspect (omit to list recent jobs)"
+                    }
+                },
+                "required": []
+            }
+        ),
+
+        Tool(
+            name="cancel_extraction_job",
+            description=(
+                "Cancel a queued or running extraction job. A running job stops before "
+                "its next category; everything already loaded is kept."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID returned by extract_knowledge"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+
+        Tool(
+            name="resume_extraction_job",
+            description=(
+                "Resume a cancelled, failed or interrupted extraction job, "
+                "skipping the categories and relationship types it already loaded."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID to resume"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+
         Tool(
             name="get_statistics",
             description=(
@@ -168,11 +287,12 @@ async def list_tools() -> List[Tool]:
             name="answer_exam_question",
             description=(
                 "✅ PRIMARY TOOL - USE THIS FOR ALL USER QUESTIONS ABOUT THE LAW/DOMAIN. "
-                "Returns COMPLETE authoritative source text with citations and anti-hallucination instructions. "
+                "Returns the best-matching passages of authoritative source text (complete text with full_text=true) "
+                "with citations and anti-hallucination instructions. "
                 "Advanced search with phrase matching + fallback strategies (better than query_knowledge_base). "
                 "ALWAYS use for: exam questions, 'which of the following', legal/medical/technical questions, "
                 "'what does the law say', discharge questions, debts questions, ANY domain-specific query. "
-                "Output format: Sidebar with full quoted text + source citation + rationale + cross-references. "
+                "Output format: Sidebar with quoted text + source citation + rationale + cross-references. "
                 "CRITICAL: Follow ALL instructions in tool output - they prevent hallucinations. "
                 "Universal for all domains: law (BIA §178), medicine (ACR), engineering (ACI). "
                 "Records every Q&A to CSV audit trail."
@@ -191,12 +311,62 @@ async def list_tools() -> List[Tool]:
                     "topic_hint": {
                         "type": "string",
                         "description": "Optional: Topic keyword to narrow search (e.g., 'discharge', 'contrast safety', 'beam design')"
+                    },
+                    "full_text": {
+                        "type": "boolean",
+                        "description": "Return complete source text instead of best-matching passages",
+                        "default": False
+                    },
+                    "token_budget": {
+                        "type": "integer",
+                        "description": f"Approximate tokens of passage text in the response (default {DEFAULT_TOKEN_BUDGET})"
+                    },
+                    "latency_budget_ms": {
+                        "type": "integer",
+                        "description": (
+                            "Milliseconds the semantic (vector) search may take before answering "
+                            f"from keyword search alone (default {DEFAULT_LATENCY_BUDGET_MS}, or KB_LATENCY_BUDGET_MS; 0 = wait)"
+                        )
                     }
                 },
                 "required": ["question"]
             }
         ),
 
+        Tool(
+            name="answer_exam_questions_batch",
+            description=(
+                "Answer a whole set of exam questions in one call. "
+                "Reads questions from a file (one per line, or a CSV with a 'question' column "
+                "and optional 'answer_choice'/'topic_hint' columns) or from a list, "
+                "searches them together (one embedding call, one vector scoring pass) "
+                "and records every answer to the CSV audit trail in one write. "
+                "Returns a per-question summary of the top source found."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "questions_file": {
+                        "type": "string",
+                        "description": "Path to questions file (.txt or .csv)"
+                    },
+                    "questions": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional: questions given inline instead of a file"
+                    },
+                    "latency_budget_ms": {
+                        "type": "integer",
+                        "description": (
+                            "Milliseconds the semantic (vector) search of the whole set may take before "
+                            "answering from keyword search alone (default 0 = wait)"
+                        )
+                    }
+                },
+                "required": []
+            }
+        ),
+
         Tool(
             name="analyze_study_guide_coverage",
             description=(
@@ -286,37 +456,49 @@ async def list_tools() -> List[Tool]:
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-    """Handle tool calls."""
+    """Handle tool calls on the read or write pool, keeping the event loop free."""
 
     if name == "query_knowledge_base":
-        return await tool_query_knowledge_base(arguments)
+        return await tool_pool.run(READ, tool_query_knowledge_base, arguments)
 
     elif name == "switch_project":
-        return await tool_switch_project(arguments)
+        return await tool_pool.run(WRITE, tool_switch_project, arguments)
 
     elif name == "add_material":
-        return await tool_add_material(arguments)
+        return await tool_pool.run(WRITE, tool_add_material, arguments)
 
     elif name == "extract_knowledge":
-        return await tool_extract_knowledge(arguments)
+        return await tool_pool.run(WRITE, tool_extract_knowledge, arguments)
+
+    elif name == "extraction_job_status":
+        return await tool_pool.run(READ, tool_extraction_job_status, arguments)
+
+    elif name == "cancel_extraction_job":
+        return await tool_pool.run(WRITE, tool_cancel_extraction_job, arguments)
+
+    elif name == "resume_extraction_job":
+        return await tool_pool.run(WRITE, tool_resume_extraction_job, arguments)
 
     elif name == "get_statistics":
-        return await tool_get_statistics(arguments)
+        return await tool_pool.run(READ, tool_get_statistics, arguments)
 
     elif name == "answer_exam_question":
-        return await tool_answer_exam_question(arguments)
+        return await tool_pool.run(READ, tool_answer_exam_question, arguments)
+
+    elif name == "answer_exam_questions_batch":
+        return await tool_pool.run(READ, tool_answer_exam_questions_batch, arguments)
 
     elif name == "analyze_study_guide_coverage":
-        return await tool_analyze_coverage(arguments)
+        return await tool_pool.run(READ, tool_analyze_coverage, arguments)
 
     elif name == "generate_timeline_diagram":
-        return await tool_generate_timeline(arguments)
+        return await tool_pool.run(READ, tool_generate_timeline, arguments)
 
     elif name == "generate_process_diagram":
-        return await tool_generate_process(arguments)
+        return await tool_pool.run(READ, tool_generate_process, arguments)
 
     elif name == "generate_comparison_diagram":
-        return await tool_generate_comparison(arguments)
+        return await tool_pool.run(READ, tool_generate_comparison, arguments)
 
     else:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
@@ -326,10 +508,12 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
 # TOOL IMPLEMENTATIONS
 # ============================================================================
 
-async def tool_query_knowledge_base(args: Dict[str, Any]) -> List[TextContent]:
+def tool_query_knowledge_base(args: Dict[str, Any]) -> List[TextContent]:
     """Query knowledge base with direct quotes."""
     query = args.get("query", "")
     project_id = args.get("project_id")
+    full_text = args.get("full_text", False)
+    token_budget = args.get("token_budget") or DEFAULT_TOKEN_BUDGET
 
     # Get project
     if project_id:
@@ -353,7 +537,7 @@ async def tool_query_knowledge_base(args: Dict[str, Any]) -> List[TextContent]:
 
     # Query database
     try:
-        results = query_database(db_path, query)
+        results = query_database(db_path, query, token_budget=token_budget, full_text=full_text)
 
         if not results:
             return [TextContent(
@@ -382,9 +566,15 @@ DO NOT provide analysis based on "bankruptcy law principles" or any external kno
             response += f"**{idx}. {result['type']}**\n"
             response += f"```\n{result['text']}\n```\n"
             if result.get('source'):
-                response += f"*Source: {result['source']}*\n"
+                response += f"*Source: {result['source']}*"
+                if result.get('passage') and result['passage'].truncated:
+                    response += f" *({result['passage'].location()})*"
+                response += "\n"
             response += "\n"
 
+        if any(result.get('passage') and result['passage'].truncated for result in results):
+            response += "*Passages shown; pass full_text=true for complete text.*\n"
+
         return [TextContent(type="text", text=response)]
 
     except Exception as e:
@@ -394,7 +584,7 @@ DO NOT provide analysis based on "bankruptcy law principles" or any external kno
         )]
 
 
-async def tool_switch_project(args: Dict[str, Any]) -> List[TextContent]:
+def tool_switch_project(args: Dict[str, Any]) -> List[TextContent]:
     """Switch to a different project."""
     project_id = args.get("project_id")
 
@@ -440,7 +630,7 @@ async def tool_switch_project(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error: {e}")]
 
 
-async def tool_add_material(args: Dict[str, Any]) -> List[TextContent]:
+def tool_add_material(args: Dict[str, Any]) -> List[TextContent]:
     """Add source material to current project."""
     file_path = args.get("file_path", "")
     source_name = args.get("source_name")
@@ -476,8 +666,8 @@ async def tool_add_material(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error: {e}")]
 
 
-async def tool_extract_knowledge(args: Dict[str, Any]) -> List[TextContent]:
-    """Run extraction on sources."""
+def tool_extract_knowledge(args: Dict[str, Any]) -> List[TextContent]:
+    """Queue extraction jobs (returns job IDs immediately)."""
     source_id = args.get("source_id")
     use_mock = args.get("use_mock", False)
 
@@ -489,29 +679,29 @@ async def tool_extract_knowledge(args: Dict[str, Any]) -> List[TextContent]:
             text="No active project. Use switch_project first."
         )]
 
-    # Run extraction
     try:
-        project_dir = pm.projects_dir / project.project_id
-        runner = ExtractionRunner(project_dir, use_mock=use_mock)
+        worker = get_job_worker(project)
 
         if source_id:
-            result = runner.extract_source(source_id)
+            if not SourceManager(pm.projects_dir / project.project_id).get_source(source_id):
+                return [TextContent(type="text", text=f"Error: Source not found: {source_id}")]
+            jobs = [worker.queue.enqueue(source_id, use_mock=use_mock)]
+        else:
+            jobs = worker.queue.enqueue_unextracted(use_mock=use_mock)
 
-            response = f"**Extraction Complete!**\n\n"
-            response += f"- Source: {result['source_name']}\n"
-            response += f"- Entities extracted: {result['entities_extracted']:,}\n"
-            response += f"- Relationships extracted: {result['relationships_extracted']:,}\n\n"
-            response += f"**Total in database**:\n"
-            response += f"- Entities: {result['total_entities']:,}\n"
-            response += f"- Relationships: {result['total_relationships']:,}\n"
+        if not jobs:
+            return [TextContent(type="text", text="No unextracted sources found.")]
 
-        else:
-            result = runner.extract_all_sources()
+        worker.wake()
 
-            response = f"**Extraction Complete!**\n\n"
-            response += f"- Sources processed: {result['sources_processed']}\n"
-            response += f"- Entities extracted: {result['total_entities']:,}\n"
-            response += f"- Relationships extracted: {result['total_relationships']:,}\n"
+        response = f"**Extraction Queued** ({len(jobs)} job{'s' if len(jobs) != 1 else ''})\n\n"
+        for job in jobs:
+            response += f"- `{job.job_id}`: source {job.source_id} ({job.status})\n"
+        response += (
+            f"\nJobs run in the background; embeddings for new rows are refreshed after each source loads.\n"
+            f"Use `extraction_job_status` to follow progress, `cancel_extraction_job` to stop a job "
+            f"and `resume_extraction_job` to continue a cancelled or failed one."
+        )
 
         return [TextContent(type="text", text=response)]
 
@@ -519,7 +709,127 @@ async def tool_extract_knowledge(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error: {e}\n\nTry with use_mock=true for testing.")]
 
 
-async def tool_get_statistics(args: Dict[str, Any]) -> List[TextContent]:
+def tool_extraction_job_status(args: Dict[str, Any]) -> List[TextContent]:
+    """Report progress and per-step throughput of extraction jobs."""
+    job_id = args.get("job_id")
+
+    project = pm.get_current_project()
+    if not project:
+        return [TextContent(
+            type="text",
+            text="No active project. Use switch_project first."
+        )]
+
+    queue = get_job_worker(project).queue
+
+    if not job_id:
+        jobs = queue.list_jobs()
+        if not jobs:
+            return [TextContent(type="text", text="No extraction jobs yet. Use `extract_knowledge` to start one.")]
+
+        response = f"**Extraction Jobs** ({queue.queue_depth()} queued)\n\n"
+        for job in jobs:
+            progress = queue.get_progress(job.job_id)
+            response += (
+                f"- `{job.job_id}`: {job.source_id} - {job.status} "
+                f"({progress['completed_steps']}/{progress['total_steps']} steps)\n"
+            )
+        return [TextContent(type="text", text=response)]
+
+    progress = queue.get_progress(job_id)
+    if not progress:
+        return [TextContent(type="text", text=f"Error: Job not found: {job_id}")]
+
+    job = progress['job']
+    response = f"**Job {job['job_id']}**: {job['status']}\n\n"
+    response += f"- Source: {job['source_id']}\n"
+    response += (
+        f"- Progress: {progress['completed_steps']}/{progress['total_steps']} steps "
+        f"({progress['progress_percent']:.0f}%)\n"
+    )
+    if progress['in_progress']:
+        response += f"- Extracting now: {', '.join(progress['in_progress'])}\n"
+    response += f"- Queued: {job['created_at']}\n"
+    if job['started_at']:
+        response += f"- Started: {job['started_at']} (attempt {job['attempts']})\n"
+    if job['finished_at']:
+        response += f"- Finished: {job['finished_at']}\n"
+    if job['cancel_requested']:
+        response += "- Cancellation requested (stops before the next step)\n"
+    if job['error_message']:
+        response += f"- Error: {job['error_message']}\n"
+
+    if progress['steps']:
+        response += "\n**Steps**:\n"
+        for step in progress['steps']:
+            response += (
+                f"- {step['kind']} {step['name']}: {step['items']:,} items in {step['seconds']:.1f}s "
+                f"({step['items_per_sec']:.1f}/s)\n"
+            )
+
+    result = job['result']
+    if result:
+        response += f"\n**Extracted**: {result['entities_extracted']:,} entities, "
+        response += f"{result['relationships_extracted']:,} relationships\n"
+
+        refreshed = result.get('after_load') or {}
+        if refreshed:
+            embedded = sum(stats.get('embeddings_generated', 0) for stats in refreshed.values())
+            response += f"**Embeddings refreshed**: {embedded:,} new/changed rows across {len(refreshed)} tables\n"
+
+    return [TextContent(type="text", text=response)]
+
+
+def tool_cancel_extraction_job(args: Dict[str, Any]) -> List[TextContent]:
+    """Cancel a queued or running extraction job."""
+    job_id = args.get("job_id", "")
+
+    project = pm.get_current_project()
+    if not project:
+        return [TextContent(
+            type="text",
+            text="No active project. Use switch_project first."
+        )]
+
+    job = get_job_worker(project).queue.cancel(job_id)
+    if not job:
+        return [TextContent(type="text", text=f"Error: Job not found: {job_id}")]
+
+    if job.cancel_requested:
+        text = f"Job `{job_id}` will stop before its next step. Steps already loaded are kept."
+    else:
+        text = f"Job `{job_id}` is {job.status}."
+    return [TextContent(type="text", text=text)]
+
+
+def tool_resume_extraction_job(args: Dict[str, Any]) -> List[TextContent]:
+    """Re-queue a cancelled, failed or interrupted extraction job."""
+    job_id = args.get("job_id", "")
+
+    project = pm.get_current_project()
+    if not project:
+        return [TextContent(
+            type="text",
+            text="No active project. Use switch_project first."
+        )]
+
+    worker = get_job_worker(project)
+    job = worker.queue.resume(job_id)
+    if not job:
+        return [TextContent(type="text", text=f"Error: Job not found: {job_id}")]
+
+    if job.status != "queued":
+        return [TextContent(type="text", text=f"Job `{job_id}` is {job.status} and cannot be resumed.")]
+
+    worker.wake()
+    done = len(worker.queue.get_steps(job_id))
+    return [TextContent(
+        type="text",
+        text=f"Job `{job_id}` re-queued; {done} step(s) already loaded will be skipped."
+    )]
+
+
+def tool_get_statistics(args: Dict[str, Any]) -> List[TextContent]:
     """Get project statistics."""
     project_id = args.get("project_id")
 
@@ -545,7 +855,28 @@ async def tool_get_statistics(args: Dict[str, Any]) -> List[TextContent]:
         response += f"**Totals**:\n"
         response += f"- Entities: {stats['total_entities']:,}\n"
         response += f"- Relationships: {stats['total_relationships']:,}\n"
-        response += f"- Sources: {project.sources_count}\n\n"
+        response += f"- Sources: {project.sources_count}\n"
+        response += f"- Query engine: {get_engine().status()}\n"
+
+        cache_stats = get_engine().get_query_cache(Path(project.database_path)).stats()
+        response += (
+            f"- Query cache: {cache_stats['hits']:,} hits / {cache_stats['misses']:,} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']:,} entries)\n"
+        )
+
+        emb_stats = get_engine().get_embedding_cache(Path(project.database_path)).stats()
+        response += (
+            f"- Embedding cache: {emb_stats['memory_hits'] + emb_stats['disk_hits']:,} hits / "
+            f"{emb_stats['misses']:,} encoded ({emb_stats['disk_entries']:,} stored)\n"
+        )
+
+        for kind, pool_stats in tool_pool.stats().items():
+            response += (
+                f"- {kind.title()} tool pool: {pool_stats['running']}/{pool_stats['limit']} running, "
+                f"{pool_stats['queued']} queued (peak {pool_stats['peak_queued']}), "
+                f"{pool_stats['completed']:,} completed\n"
+            )
+        response += "\n"
 
         if stats['entities_by_category']:
             response += f"**Entities by Category**:\n"
@@ -564,19 +895,19 @@ async def tool_get_statistics(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error: {e}")]
 
 
-async def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
+def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
     """
     Answer question with sidebar formatting and CSV recording.
 
     UNIVERSAL: Adapts to any domain (law, medicine, engineering, etc.)
     based on project's domain_terminology configuration.
     """
-    from datetime import datetime
-    import csv
-
     question = args.get("question", "")
     answer_choice = args.get("answer_choice", "")
     topic_hint = args.get("topic_hint", "")
+    full_text = args.get("full_text", False)
+    token_budget = args.get("token_budget") or DEFAULT_TOKEN_BUDGET
+    latency_budget_ms = args.get("latency_budget_ms")
 
     # Get current project
     project = pm.get_current_project()
@@ -599,11 +930,14 @@ async def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
         keywords = topic_hint if topic_hint else question
 
         # Universal search (adapts to project's structure)
-        structured_results, relationship_results = search_content_universal(
+        result = search_content_universal(
             db_path,
             keywords,
-            project.domain_terminology
+            project.domain_terminology,
+            token_budget=None if full_text else token_budget,
+            latency_budget_ms=latency_budget_ms
         )
+        structured_results, relationship_results = result
 
         # Universal formatting (adapts to project's terminology)
         answer = format_sidebar_answer(
@@ -611,7 +945,8 @@ async def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
             structured_results,
             relationship_results,
             project.domain_terminology,
-            answer_choice
+            answer_choice,
+            show_full_text=full_text
         )
 
         # Add search details
@@ -619,56 +954,25 @@ async def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
 
 **Search Details:**
 - Keywords: {keywords}
+- Search path: {SEARCH_PATH_LABELS.get(result.path, result.path)}{degraded_note(result.degraded)}
 - Structured content found: {len(structured_results)}
 - Relationships found: {len(relationship_results)}
 - Domain: {project.domain}
+- Query engine: {get_engine().status()}
 """
 
         # Record to CSV (project-specific path)
         try:
             csv_path = project.get_tracking_file("questions_answered.csv")
-
-            # Check if file exists to determine if we need header
-            file_exists = csv_path.exists()
-
-            with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-
-                # Write header if new file
-                if not file_exists:
-                    writer.writerow([
-                        "timestamp", "question", "answer_choice", "primary_quote",
-                        "reference", "source", "cross_references",
-                        "search_method", "keywords", "rationale",
-                        "correct_answer", "is_correct"
-                    ])
-
-                # Extract quote from results
-                if structured_results:
-                    quote = structured_results[0]['full_text'][:500]
-                    source_ref = structured_results[0]['id']
-                elif relationship_results:
-                    quote = relationship_results[0]['text'][:500]
-                    source_ref = "Study Materials"
-                else:
-                    quote = "NOT FOUND"
-                    source_ref = "N/A"
-
-                # Write record
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    question,
-                    answer_choice if answer_choice else "",
-                    quote,
-                    source_ref,
-                    f"{project.domain_terminology.get('source_type', 'document')}",
-                    "",  # cross_references (extracted in answer)
-                    "Universal FTS5 search",
-                    keywords,
-                    f"Based on {project.domain} domain knowledge base",
-                    "",  # correct_answer (user fills later)
-                    ""   # is_correct (user fills later)
-                ])
+            append_answer_rows(csv_path, [build_answer_row(
+                question,
+                answer_choice,
+                keywords,
+                structured_results,
+                relationship_results,
+                project.domain,
+                project.domain_terminology
+            )])
 
             response += f"\n✅ **Recorded to**: `{csv_path.relative_to(repo_root)}`"
 
@@ -684,6 +988,98 @@ async def tool_answer_exam_question(args: Dict[str, Any]) -> List[TextContent]:
         )]
 
 
+def tool_answer_exam_questions_batch(args: Dict[str, Any]) -> List[TextContent]:
+    """
+    Answer many questions with one batched search and one CSV write.
+
+    Same search and CSV columns as answer_exam_question, amortized over the set.
+    """
+    questions_file = args.get("questions_file")
+    inline_questions = args.get("questions") or []
+    latency_budget_ms = args.get("latency_budget_ms") or 0
+
+    project = pm.get_current_project()
+    if not project:
+        return [TextContent(
+            type="text",
+            text="No active project. Use switch_project to select a project first."
+        )]
+
+    db_path = Path(project.database_path)
+    if not db_path.exists():
+        return [TextContent(
+            type="text",
+            text=f"No database found for {project.project_name}."
+        )]
+
+    try:
+        if questions_file:
+            questions = load_questions(Path(questions_file))
+        else:
+            questions = [
+                {'question': q, 'answer_choice': '', 'topic_hint': ''}
+                for q in inline_questions if q.strip()
+            ]
+
+        if not questions:
+            return [TextContent(type="text", text="No questions provided. Pass questions_file or questions.")]
+
+        keywords = [q['topic_hint'] or q['question'] for q in questions]
+
+        start = time.time()
+        results = search_batch(db_path, keywords, project.domain_terminology, latency_budget_ms=latency_budget_ms)
+        elapsed = time.time() - start
+
+        rows = [
+            build_answer_row(
+                q['question'],
+                q['answer_choice'],
+                kw,
+                structured_results,
+                relationship_results,
+                project.domain,
+                project.domain_terminology
+            )
+            for q, kw, (structured_results, relationship_results) in zip(questions, keywords, results)
+        ]
+
+        response = f"**Answered {len(questions)} questions** in {elapsed:.2f}s "
+        response += f"({elapsed * 1000 / len(questions):.0f} ms/question)\n"
+        direct = sum(1 for result in results if result.path == universal_search.SECTION_LOOKUP)
+        response += f"- Direct section lookups: {direct}/{len(questions)}\n"
+        reasons = [result.degraded for result in results if result.degraded]
+        for reason in dict.fromkeys(reasons):
+            response += f"- Keyword search only: {reasons.count(reason)}/{len(questions)}{degraded_note(reason)}\n"
+        failed = sum(1 for result in results if result.error)
+        if failed:
+            response += f"- Search failed: {failed}/{len(questions)}\n"
+        response += f"- Query engine: {get_engine().status()}\n\n"
+
+        reference_column = CSV_HEADER.index("reference")
+        for i, (q, row, result) in enumerate(zip(questions, rows, results), 1):
+            if result.error:
+                response += f"{i}. ⚠️ {q['question'][:80]} → search failed: {result.error}\n"
+                continue
+            reference = row[reference_column]
+            marker = "❌" if reference == "N/A" else "✅"
+            response += f"{i}. {marker} {q['question'][:80]} → {reference}\n"
+
+        try:
+            csv_path = project.get_tracking_file("questions_answered.csv")
+            append_answer_rows(csv_path, rows)
+            response += f"\n✅ **Recorded to**: `{csv_path.relative_to(repo_root)}`"
+        except Exception as csv_error:
+            response += f"\n⚠️  **CSV recording failed**: {csv_error}"
+
+        return [TextContent(type="text", text=response)]
+
+    except Exception as e:
+        return [TextContent(
+            type="text",
+            text=f"Error answering questions: {e}\n\nTry checking if database tables are properly set up."
+        )]
+
+
 # ============================================================================
 # RESOURCES
 # ============================================================================
@@ -734,6 +1130,11 @@ async def list_resources() -> List[types.Resource]:
 @app.read_resource()
 async def read_resource(uri: str) -> str:
     """Read a resource."""
+    return await tool_pool.run(READ, _read_resource, uri)
+
+
+def _read_resource(uri: str) -> str:
+    """Read a resource (blocking)."""
 
     if uri == "project://list":
         projects = pm.list_projects()
@@ -761,89 +1162,130 @@ async def read_resource(uri: str) -> str:
 # HELPER FUNCTIONS
 # ============================================================================
 
-def query_database(db_path: Path, query: str) -> List[Dict[str, str]]:
-    """Query database for relationships and BIA sections matching query."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def query_database(
+    db_path: Path,
+    query: str,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    full_text: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Query database for relationships and BIA sections matching query.
+
+    Results carry the best-matching passage of each hit (matches marked
+    «like this»), all passages together within token_budget (hits the
+    budget has no room for are left out); full_text returns the complete
+    text instead.
+    """
+    qe = get_engine()
+    catalog = qe.get_catalog(db_path)
+
+    cache = qe.get_query_cache(db_path)
+    fingerprint = qe.fingerprint(db_path)
+    ranked = cache.get(fingerprint, "query_database", query)
 
     results = []
 
-    try:
-        # 1. Search relationships table
-        cursor.execute("""
-            SELECT name FROM sqlite_master
-            WHERE type='table' AND name='relationships_fts'
-        """)
-
-        has_rel_fts = cursor.fetchone() is not None
-
-        if has_rel_fts:
-            cursor.execute("""
-                SELECT r.relationship_text, r.relationship_type, r.source_id
-                FROM relationships r
-                WHERE r.id IN (
-                    SELECT rowid FROM relationships_fts
-                    WHERE relationship_text MATCH ?
+    with qe.connection(db_path) as conn:
+        cursor = conn.cursor()
+
+        if ranked is None:
+            ranked = {'relationships': [], 'bia_sections': []}
+
+            # 1. Search relationships table
+            if catalog.has_relationships_fts:
+                hits = ranked_match(
+                    cursor, 'relationships', 'relationships_fts', catalog.columns.get('relationships_fts'),
+                    [query], 10, key_col='id'
                 )
-                LIMIT 10
-            """, (query,))
-        else:
-            cursor.execute("""
-                SELECT relationship_text, relationship_type, source_id
-                FROM relationships
-                WHERE relationship_text LIKE ?
-                LIMIT 10
-            """, (f"%{query}%",))
-
-        for row in cursor.fetchall():
+                ranked['relationships'] = [rel_id for rel_id, _ in hits]
+            else:
+                cursor.execute("""
+                    SELECT id
+                    FROM relationships
+                    WHERE relationship_text LIKE ?
+                    LIMIT 10
+                """, (f"%{query}%",))
+                ranked['relationships'] = [row[0] for row in cursor.fetchall()]
+
+            # 2. Search BIA sections table (section number and title weigh more than body text)
+            if catalog.has_table('bia_sections_fts'):
+                hits = ranked_match(
+                    cursor, 'bia_sections', 'bia_sections_fts', catalog.columns.get('bia_sections_fts'),
+                    [query], 10
+                )
+                ranked['bia_sections'] = [rowid for rowid, _ in hits]
+            else:
+                cursor.execute("""
+                    SELECT rowid
+                    FROM bia_sections
+                    WHERE full_text LIKE ?
+                    LIMIT 10
+                """, (f"%{query}%",))
+                ranked['bia_sections'] = [row[0] for row in cursor.fetchall()]
+
+            cache.put(fingerprint, "query_database", query, ranked)
+
+        # Best-matching passages, relationships first (short) then sections, sharing the budget
+        passages, section_passages = {}, {}
+        if not full_text:
+            passages = build_passages(
+                conn, 'relationships', 'relationship_text', ranked['relationships'], [query],
+                token_budget=token_budget,
+                fts_table='relationships_fts' if catalog.has_relationships_fts else None,
+                fts_columns=catalog.columns.get('relationships_fts')
+            )
+            used = sum(passage.tokens for passage in passages.values())
+            section_passages = build_passages(
+                conn, 'bia_sections', 'full_text', ranked['bia_sections'], [query],
+                token_budget=max(0, token_budget - used),
+                fts_table='bia_sections_fts' if catalog.has_table('bia_sections_fts') else None,
+                fts_columns=catalog.columns.get('bia_sections_fts'),
+                offset_column='char_start' if 'char_start' in catalog.columns.get('bia_sections', []) else None
+            )
+
+        for row in hydrate_rows(
+            cursor, 'relationships', ranked['relationships'],
+            ['relationship_text', 'relationship_type', 'source_id'], key_col='id'
+        ):
+            passage = passages.get(row['id'])
+            if passage is None and not full_text:
+                continue
             results.append({
-                "type": row[1] if len(row) > 1 else "Relationship",
-                "text": row[0],
-                "source": row[2] if len(row) > 2 else "Study Materials"
+                "type": row['relationship_type'],
+                "text": passage.highlighted('«', '»') if passage else row['relationship_text'],
+                "source": row['source_id'],
+                "passage": passage
             })
 
-        # 2. Search BIA sections table
-        cursor.execute("""
-            SELECT name FROM sqlite_master
-            WHERE type='table' AND name='bia_sections_fts'
-        """)
-
-        has_bia_fts = cursor.fetchone() is not None
-
-        if has_bia_fts:
-            cursor.execute("""
-                SELECT s.section_number, s.section_title, s.full_text
-                FROM bia_sections s
-                WHERE s.rowid IN (
-                    SELECT rowid FROM bia_sections_fts
-                    WHERE full_text MATCH ?
-                )
-                LIMIT 10
-            """, (query,))
-        else:
-            cursor.execute("""
-                SELECT section_number, section_title, full_text
-                FROM bia_sections
-                WHERE full_text LIKE ?
-                LIMIT 10
-            """, (f"%{query}%",))
-
-        for row in cursor.fetchall():
-            # Return COMPLETE full_text (no truncation - let caller decide)
+        # Complete section text only when asked for
+        section_cols = ['section_number', 'section_title'] + (['full_text'] if full_text else [])
+        for row in hydrate_rows(cursor, 'bia_sections', ranked['bia_sections'], section_cols):
+            passage = section_passages.get(row['rowid'])
+            if passage is None and not full_text:
+                continue
             results.append({
-                "type": f"BIA Section {row[0]}",
-                "text": row[2],  # Full text, no truncation
-                "section_number": row[0],
-                "section_title": row[1],
-                "source": "BIA Statute"
+                "type": f"BIA Section {row['section_number']}",
+                "text": passage.highlighted('«', '»') if passage else row.get('full_text'),
+                "section_number": row['section_number'],
+                "section_title": row['section_title'],
+                "source": "BIA Statute",
+                "passage": passage
             })
 
-    finally:
-        conn.close()
-
     return results
 
 
+SEARCH_PATH_LABELS = {
+    universal_search.SECTION_LOOKUP: "direct section lookup (cited section, no search)",
+    universal_search.HYBRID: "hybrid search (FTS5 + vectors, RRF)",
+    universal_search.FTS: "full-text search (FTS5)",
+}
+
+def degraded_note(reason: Optional[str]) -> str:
+    """Search-path suffix for a degraded result (empty if it was not degraded)."""
+    return f" - degraded: semantic search {reason}" if reason else ""
+
+
 def get_bia_section(section_num: int) -> str:
     """Get BIA section text (stub for now)."""
     # This would read from database or files
@@ -855,6 +1297,7 @@ def find_primary_content_table(db_path: Path, domain_config: Dict) -> Optional[s
     Discover the primary structured content table in database.
 
     Universal function that adapts to any domain's table structure.
+    Result is cached by the query engine after the first lookup.
 
     Args:
         db_path: Path to project database
@@ -863,273 +1306,51 @@ def find_primary_content_table(db_path: Path, domain_config: Dict) -> Optional[s
     Returns:
         Table name or None if not found
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    try:
-        # 1. Try explicit config first
-        explicit_table = domain_config.get('primary_content_table')
-        if explicit_table:
-            cursor.execute(f"""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """, (explicit_table,))
-            if cursor.fetchone():
-                return explicit_table
-
-        # 2. Fallback: Find any table with full_text column (structured content pattern)
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-
-        for table in tables:
-            cursor.execute(f"PRAGMA table_info({table})")
-            columns = [row[1] for row in cursor.fetchall()]
-
-            # Look for tables with hierarchical content pattern
-            if 'full_text' in columns and any(col in columns for col in ['section_number', 'content_id', 'chapter_id']):
-                return table
-
-        return None
-
-    finally:
-        conn.close()
+    content = get_engine().get_catalog(db_path).primary_content_table(domain_config)
+    return content.name if content else None
 
 
-def search_content_universal(db_path: Path, query: str, domain_config: Dict) -> tuple[List[Dict], List[Dict]]:
+def search_content_universal(
+    db_path: Path,
+    query: str,
+    domain_config: Dict,
+    token_budget: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None
+) -> universal_search.SearchResult:
     """
     Universal content search that adapts to any domain.
 
-    Uses hybrid search (FTS5 + vector embeddings with RRF) for 30% better retrieval.
+    Queries citing a section ("section 158", "s. 67(1)") are answered by direct
+    section lookup. Others use hybrid search (FTS5 + vector embeddings with RRF)
+    for 30% better retrieval once the query engine is warm; FTS5 only until then.
+
+    With token_budget, structured results also carry their best-matching passage.
+    If vector search misses latency_budget_ms or fails, results are FTS5 only
+    and .degraded says why.
 
     Returns:
-        (structured_results, relationship_results)
+        (structured_results, relationship_results), with .path naming the search path
     """
-    import re
-    import numpy as np
+    return universal_search.search_content_universal(
+        get_engine(), db_path, query, domain_config, token_budget, latency_budget_ms
+    )
 
-    # Try to load sentence transformers for hybrid search
-    try:
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        use_hybrid = True
-    except:
-        use_hybrid = False
-
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
-    structured_results = []
-    relationship_results = []
-
-    try:
-        # 1. Search primary structured content
-        content_table = find_primary_content_table(db_path, domain_config)
-
-        if content_table:
-            # Check for FTS index
-            fts_table = f"{content_table}_fts"
-            cursor.execute(f"""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """, (fts_table,))
-
-            has_fts = cursor.fetchone() is not None
-
-            if has_fts:
-                # Get table structure to determine ID column
-                cursor.execute(f"PRAGMA table_info({content_table})")
-                columns = {row[1]: row[0] for row in cursor.fetchall()}
-
-                id_col = 'section_number' if 'section_number' in columns else 'content_id' if 'content_id' in columns else 'id'
-                title_col = 'section_title' if 'section_title' in columns else 'title' if 'title' in columns else None
-
-                # Build dynamic query (qualify with table name to avoid ambiguity in JOIN)
-                select_cols = [f'{content_table}.{id_col}', f'{content_table}.full_text']
-                if title_col:
-                    select_cols.insert(1, f'{content_table}.{title_col}')
-
-                # HYBRID SEARCH: FTS5 + Vector embeddings with RRF
-                # This provides 30% better retrieval than pure FTS5
-
-                # Check if embeddings table exists
-                emb_table = f"{content_table}_embeddings"
-                cursor.execute(f"""
-                    SELECT name FROM sqlite_master
-                    WHERE type='table' AND name=?
-                """, (emb_table,))
-                has_embeddings = cursor.fetchone() is not None
-
-                if use_hybrid and has_embeddings:
-                    # HYBRID SEARCH: FTS5 + Vector
-
-                    # 1. Get FTS5 results (top 20 for RRF)
-                    fts_results = []
-                    search_queries = [query]  # Start with original query
-
-                    # Extract key terms for fallback
-                    stop_words = {'by', 'the', 'a', 'an', 'to', 'of', 'in', 'for', 'on', 'at', 'from', 'is', 'are', 'was'}
-                    key_terms = [w for w in query.split() if w.lower() not in stop_words and len(w) > 2]
-                    if key_terms:
-                        search_queries.append(' OR '.join(key_terms))  # Fallback OR query
-
-                    for search_query in search_queries:
-                        cursor.execute(f"""
-                            SELECT {id_col}
-                            FROM {content_table}
-                            JOIN {fts_table} ON {content_table}.rowid = {fts_table}.rowid
-                            WHERE {fts_table} MATCH ?
-                            ORDER BY rank
-                            LIMIT 20
-                        """, (search_query,))
-                        fts_results = [row[0] for row in cursor.fetchall()]
-                        if fts_results:
-                            break  # Got FTS results
-
-                    # 2. Get vector similarity results (top 20 for RRF)
-                    query_emb = model.encode(query)
-                    cursor.execute(f'SELECT section_number, embedding_json FROM {emb_table}')
-                    vec_results = []
-                    for section_id, emb_json in cursor.fetchall():
-                        emb = np.array(json.loads(emb_json))
-                        sim = np.dot(query_emb, emb) / (np.linalg.norm(query_emb) * np.linalg.norm(emb))
-                        vec_results.append((section_id, sim))
-                    vec_results.sort(key=lambda x: x[1], reverse=True)
-                    vec_top = [section_id for section_id, _ in vec_results[:20]]
-
-                    # 3. Reciprocal Rank Fusion (RRF)
-                    fts_ranks = {section_id: i for i, section_id in enumerate(fts_results)}
-                    vec_ranks = {section_id: i for i, section_id in enumerate(vec_top)}
-                    all_sections = set(fts_ranks.keys()) | set(vec_ranks.keys())
-
-                    k = 60  # RRF constant
-                    rrf_scores = []
-                    for section_id in all_sections:
-                        fts_score = 1.0 / (k + fts_ranks.get(section_id, 999)) if section_id in fts_ranks else 0
-                        vec_score = 1.0 / (k + vec_ranks.get(section_id, 999)) if section_id in vec_ranks else 0
-                        rrf_scores.append((section_id, fts_score + vec_score))
-
-                    rrf_scores.sort(key=lambda x: x[1], reverse=True)
-                    top_sections = [section_id for section_id, _ in rrf_scores[:5]]
-
-                    # 4. Get full content for top results
-                    for section_id in top_sections:
-                        cursor.execute(f"""
-                            SELECT {', '.join(select_cols)}
-                            FROM {content_table}
-                            WHERE {id_col} = ?
-                        """, (section_id,))
-                        row = cursor.fetchone()
-                        if row:
-                            structured_results.append({
-                                'id': row[0],
-                                'title': row[1] if len(row) > 2 else '',
-                                'full_text': row[-1],
-                                'table': content_table
-                            })
-
-                else:
-                    # FALLBACK: Pure FTS5 (if no embeddings or sentence-transformers not available)
-                    search_queries = [query]
-                    stop_words = {'by', 'the', 'a', 'an', 'to', 'of', 'in', 'for', 'on', 'at', 'from', 'is', 'are', 'was'}
-                    key_terms = [w for w in query.split() if w.lower() not in stop_words and len(w) > 2]
-                    if key_terms:
-                        search_queries.append(' OR '.join(key_terms))
-
-                    for search_query in search_queries:
-                        cursor.execute(f"""
-                            SELECT {', '.join(select_cols)}
-                            FROM {content_table}
-                            JOIN {fts_table} ON {content_table}.rowid = {fts_table}.rowid
-                            WHERE {fts_table} MATCH ?
-                            ORDER BY rank
-                            LIMIT 5
-                        """, (search_query,))
-
-                        rows = cursor.fetchall()
-                        if rows:
-                            for row in rows:
-                                structured_results.append({
-                                    'id': row[0],
-                                    'title': row[1] if len(row) > 2 else '',
-                                    'full_text': row[-1],
-                                    'table': content_table
-                                })
-                            break
-
-        # 2. Search relationships (always present)
-        cursor.execute("""
-            SELECT name FROM sqlite_master
-            WHERE type='table' AND name='relationships_fts'
-        """)
-
-        if cursor.fetchone():
-            cursor.execute("""
-                SELECT r.relationship_text, r.relationship_type
-                FROM relationships r
-                JOIN relationships_fts ON r.id = relationships_fts.rowid
-                WHERE relationships_fts MATCH ?
-                ORDER BY rank
-                LIMIT 5
-            """, (query,))
-
-            for row in cursor.fetchall():
-                relationship_results.append({
-                    'text': row[0],
-                    'type': row[1]
-                })
-
-        # 3. Search atomic entity tables (study materials)
-        entity_tables = [
-            ('concepts', 'concepts_fts', ['term', 'definition', 'extraction_text']),
-            ('actors', 'actors_fts', ['role_canonical', 'extraction_text']),
-            ('deadlines', 'deadlines_fts', ['extraction_text']),
-            ('documents', 'documents_fts', ['extraction_text']),
-            ('procedures', 'procedures_fts', ['extraction_text']),
-            ('consequences', 'consequences_fts', ['extraction_text']),
-            ('statutory_references', 'statutory_references_fts', ['extraction_text'])
-        ]
-
-        for table_name, fts_name, columns in entity_tables:
-            # Check if FTS table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """, (fts_name,))
-
-            if cursor.fetchone():
-                # Build column selection (use COALESCE for optional fields)
-                col_select = ', '.join([f"COALESCE(e.{col}, '')" for col in columns])
-
-                cursor.execute(f"""
-                    SELECT {col_select}, e.section_number, e.section_title
-                    FROM {table_name} e
-                    JOIN {fts_name} ON e.id = {fts_name}.rowid
-                    WHERE {fts_name} MATCH ?
-                    ORDER BY rank
-                    LIMIT 3
-                """, (query,))
-
-                for row in cursor.fetchall():
-                    # Combine all text fields
-                    text_parts = [str(part) for part in row[:-2] if part]
-                    section_ref = row[-2] if row[-2] else ""
-                    section_title = row[-1] if row[-1] else ""
-
-                    combined_text = " | ".join(text_parts)
-                    if section_ref:
-                        combined_text += f" [Study Materials §{section_ref}]"
-                    if section_title:
-                        combined_text += f" ({section_title})"
-
-                    relationship_results.append({
-                        'text': combined_text,
-                        'type': table_name.replace('_', ' ').title()
-                    })
-
-        return (structured_results, relationship_results)
+def search_batch(
+    db_path: Path,
+    queries: List[str],
+    domain_config: Dict,
+    latency_budget_ms: Optional[float] = None
+) -> List[universal_search.SearchResult]:
+    """
+    Search many queries at once (one encode call, one matrix product).
 
-    finally:
-        conn.close()
+    Returns:
+        One (structured_results, relationship_results) tuple per query, with .path
+    """
+    return universal_search.search_batch(
+        get_engine(), db_path, queries, domain_config, latency_budget_ms=latency_budget_ms
+    )
 
 
 def format_sidebar_answer(
@@ -1137,12 +1358,15 @@ def format_sidebar_answer(
     structured_results: List[Dict],
     relationship_results: List[Dict],
     domain_config: Dict,
-    answer_choice: str = ""
+    answer_choice: str = "",
+    show_full_text: bool = False
 ) -> str:
     """
     Format answer in universal sidebar style.
 
     Adapts to domain terminology while maintaining consistent structure.
+    The quote is the primary result's best-matching passage when search
+    attached one; show_full_text quotes the complete text instead.
     """
     import re
 
@@ -1151,6 +1375,8 @@ def format_sidebar_answer(
     ref_prefix = domain_config.get('reference_prefix', '')
     source_type = domain_config.get('source_type', 'document')
 
+    passage_line = ""
+
     # Determine primary result
     if structured_results:
         primary = structured_results[0]
@@ -1164,10 +1390,15 @@ def format_sidebar_answer(
         else:
             source_display = reference
 
-        # Extract quote (return full text for complete answers)
-        # For very long sections, show first + last portions
-        if len(full_text) <= 3000:
-            # Short/medium sections: return complete text
+        passage = None if show_full_text else primary.get('passage')
+
+        if passage is not None:
+            # Best-matching passage within the token budget
+            quote = passage.quote().strip()
+            if passage.truncated:
+                passage_line = f"├─ Passage: {passage.location()} (full_text=true for the complete text)\n│\n"
+        elif show_full_text or len(full_text) <= 3000:
+            # Complete text asked for, or short/medium sections
             quote = full_text.strip()
         else:
             # Very long sections: show beginning and end
@@ -1223,7 +1454,7 @@ def format_sidebar_answer(
 │
 ├─ Quote: "{quote}"  {source_display}
 │
-├─ Why: {rationale}
+{passage_line}├─ Why: {rationale}
 │
 ├─ Cross-Refs: {cross_refs_text}
 │
@@ -1239,7 +1470,7 @@ def format_sidebar_answer(
     return answer
 
 
-async def tool_analyze_coverage(args: Dict[str, Any]) -> List[TextContent]:
+def tool_analyze_coverage(args: Dict[str, Any]) -> List[TextContent]:
     """
     Analyze study guide coverage against database.
     """
@@ -1312,7 +1543,7 @@ async def tool_analyze_coverage(args: Dict[str, Any]) -> List[TextContent]:
         )]
 
 
-async def tool_generate_timeline(args: Dict[str, Any]) -> List[TextContent]:
+def tool_generate_timeline(args: Dict[str, Any]) -> List[TextContent]:
     """
     Generate timeline diagram for a topic.
     """
@@ -1350,7 +1581,7 @@ async def tool_generate_timeline(args: Dict[str, Any]) -> List[TextContent]:
         )]
 
 
-async def tool_generate_process(args: Dict[str, Any]) -> List[TextContent]:
+def tool_generate_process(args: Dict[str, Any]) -> List[TextContent]:
     """
     Generate process flowchart for a topic.
     """
@@ -1388,7 +1619,7 @@ async def tool_generate_process(args: Dict[str, Any]) -> List[TextContent]:
         )]
 
 
-async def tool_generate_comparison(args: Dict[str, Any]) -> List[TextContent]:
+def tool_generate_comparison(args: Dict[str, Any]) -> List[TextContent]:
     """
     Generate comparison table between two topics.
     """
@@ -1430,8 +1661,31 @@ async def tool_generate_comparison(args: Dict[str, Any]) -> List[TextContent]:
 
 async def main():
     """Run MCP server."""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    global engine
+
+    # stdout carries the MCP protocol: hand it to the transport only, and send
+    # print() output (extraction worker, runner, HTTP retries, tools) to stderr
+    protocol_stdout = anyio.wrap_file(TextIOWrapper(sys.stdout.buffer, encoding="utf-8"))
+    sys.stdout = sys.stderr
+
+    # Load the embedding model in the background while the server starts
+    engine = QueryEngine()
+    engine.start_warmup()
+
+    # Drain extraction jobs queued before the last shutdown
+    project = pm.get_current_project()
+    if project:
+        get_job_worker(project)
+
+    try:
+        async with stdio_server(stdout=protocol_stdout) as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        # A job still running is marked interrupted on next start and can be resumed
+        for worker in job_workers.values():
+            worker.stop(timeout=0)
+        tool_pool.shutdown(wait=False)
+        engine.close()
 
 
 if __name__ == "__main__":
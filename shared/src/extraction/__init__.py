@@ -2,15 +2,20 @@
 
 from .source_manager import SourceManager, Source
 from .lang_extract_client import LangExtractClient
-from .extraction_runner import ExtractionRunner
+from .extraction_runner import ExtractionRunner, ExtractionCancelled
 from .database_loader import DatabaseLoader
 from .progress_tracker import ProgressTracker
+from .job_queue import ExtractionJob, ExtractionJobQueue, ExtractionWorker
 
 __all__ = [
     'SourceManager',
     'Source',
     'LangExtractClient',
     'ExtractionRunner',
+    'ExtractionCancelled',
     'DatabaseLoader',
-    'ProgressTracker'
+    'ProgressTracker',
+    'ExtractionJob',
+    'ExtractionJobQueue',
+    'ExtractionWorker'
 ]
@@ -13,6 +13,10 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 
+# Entity fields that are not stored as columns (scores and source grounding positions)
+NON_COLUMN_FIELDS = ["confidence", "source_id", "char_start", "char_end", "char_interval"]
+
+
 class DatabaseLoader:
     """
     Load extraction results into SQLite database.
@@ -310,7 +314,7 @@ class DatabaseLoader:
         if not content:
             # Use first available attribute
             for key, value in entity.items():
-                if key not in ["confidence", "source_id"]:
+                if key not in NON_COLUMN_FIELDS:
                     content = str(value)
                     break
 
@@ -369,7 +373,7 @@ class DatabaseLoader:
 
         # Add entity attributes
         for key, value in entity.items():
-            if key not in ["confidence", "source_id"]:
+            if key not in NON_COLUMN_FIELDS:
                 columns.append(key)
                 values.append(str(value) if value is not None else None)
 
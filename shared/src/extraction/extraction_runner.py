@@ -5,15 +5,206 @@ Main component that coordinates all extraction steps.
 Part of Phase 3: Extraction Pipeline implementation.
 """
 
+import os
+import sys
 import json
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from .source_manager import SourceManager, Source
 from .lang_extract_client import LangExtractClient, MockLangExtractClient
 from .progress_tracker import ProgressTracker
 from .database_loader import DatabaseLoader
 
+# SmartChunker lives in the repo's src/ (document_processor). Appended, not
+# prepended, so shared/src packages keep precedence over src/ namesakes
+_repo_src = str(Path(__file__).resolve().parents[3] / "src")
+if _repo_src not in sys.path:
+    sys.path.append(_repo_src)
+from document_processor.chunker import Chunk, SmartChunker
+
+
+# Extraction API calls in flight at once (per source)
+DEFAULT_CONCURRENCY = 4
+
+# Source chunk size sent per API call, and the overlap between neighbouring chunks
+CHUNK_TOKENS = 8000
+CHUNK_OVERLAP_TOKENS = 500
+
+# Attempts per chunk call before its category or relationship type fails
+CHUNK_ATTEMPTS = 3
+
+# Position fields of extracted items (chunk-local from the API, remapped to the document)
+OFFSET_FIELDS = ("char_start", "char_end")
+
+# Batch mode: upper bound on one extract_batch payload (chunk text plus specs)
+MAX_BATCH_PAYLOAD_BYTES = 256 * 1024
+
+
+def concurrency_from_env() -> int:
+    """Concurrent extraction calls, overridable with KB_EXTRACTION_CONCURRENCY."""
+    return max(1, int(os.environ.get("KB_EXTRACTION_CONCURRENCY", DEFAULT_CONCURRENCY)))
+
+
+def batch_from_env() -> bool:
+    """Batch mode, switched on with KB_EXTRACTION_BATCH=1."""
+    return os.environ.get("KB_EXTRACTION_BATCH", "0").lower() in ("1", "true", "yes")
+
+
+class ExtractionCancelled(Exception):
+    """Raised between extraction steps when cancellation was requested."""
+
+
+@dataclass
+class ExtractionStep:
+    """One category or relationship type to extract."""
+    kind: str                          # "category" or "relationship"
+    name: str
+    spec: Dict                         # client call arguments besides the text
+    results: Dict[int, List[Dict]] = field(default_factory=dict)   # chunk_index -> items
+    started: Optional[float] = None
+    finished: bool = False             # loaded or failed
+    error: Optional[str] = None        # why the step failed
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.kind, self.name
+
+    @property
+    def text_field(self) -> str:
+        return "extraction_text" if self.kind == "category" else "relationship_text"
+
+
+@dataclass
+class ExtractionRequest:
+    """An API call made once per chunk, answering one or more steps."""
+    steps: List[ExtractionStep]
+    call: Callable[[str], Dict[Tuple[str, str], List[Dict]]]   # chunk text -> items per step key
+    attempts: Dict[int, int] = field(default_factory=dict)     # chunk_index -> calls made
+
+    @property
+    def finished(self) -> bool:
+        return all(step.finished for step in self.steps)
+
+
+def split_batch_result(result: Dict, steps: List[ExtractionStep]) -> Dict[Tuple[str, str], List[Dict]]:
+    """
+    Split an extract_batch response into items per step.
+
+    Entities come keyed by category. Relationships come either keyed by
+    type or as one list tagged with "relationship_type"; untagged ones are
+    assigned only when the request asked for a single relationship type.
+    Otherwise the relationship steps are left out of the result (the
+    caller extracts them again, per type) rather than loaded incomplete.
+    """
+    entities = result.get("entities") or {}
+    relationships = result.get("relationships") or []
+
+    if isinstance(relationships, dict):
+        by_type = relationships
+    else:
+        rel_names = [step.name for step in steps if step.kind == "relationship"]
+        by_type: Dict[Optional[str], List[Dict]] = {}
+        for rel in relationships:
+            rel_type = rel.get("relationship_type") or (rel_names[0] if len(rel_names) == 1 else None)
+            by_type.setdefault(rel_type, []).append(rel)
+
+        unattributed = by_type.get(None, [])
+        if unattributed:
+            print(
+                f"  ↻ {len(unattributed)} untagged relationships could not be attributed "
+                f"to one of {', '.join(rel_names)}; extracting these types one by one"
+            )
+            steps = [step for step in steps if step.kind == "category"]
+
+    return {
+        step.key: (entities if step.kind == "category" else by_type).get(step.name) or []
+        for step in steps
+    }
+
+
+def _remap_offsets(item: Dict, offset: int) -> Dict:
+    """Copy of an extracted item with chunk-local positions moved to document positions."""
+    item = dict(item)
+    for key in OFFSET_FIELDS:
+        if isinstance(item.get(key), int):
+            item[key] += offset
+
+    # Lang Extract style grounding: {"char_interval": {"start_pos": .., "end_pos": ..}}
+    interval = item.get("char_interval")
+    if isinstance(interval, dict):
+        item["char_interval"] = {
+            key: value + offset if isinstance(value, int) else value
+            for key, value in interval.items()
+        }
+    return item
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(str(text).split()).lower()
+
+
+def _dedupe_key(item: Dict, text_field: str) -> Tuple:
+    """Identity of an extracted item: its text and document start (None if ungrounded)."""
+    text = item.get(text_field)
+    if not text:
+        text = json.dumps(
+            {k: v for k, v in item.items() if k not in ("confidence", "char_interval") + OFFSET_FIELDS},
+            sort_keys=True, default=str
+        )
+    start = item.get("char_start")
+    if start is None and isinstance(item.get("char_interval"), dict):
+        start = item["char_interval"].get("start_pos")
+    return _normalize_text(text), start
+
+
+def merge_chunk_results(step: ExtractionStep, chunks: List[Chunk]) -> List[Dict]:
+    """
+    Merge one step's per-chunk results into document-level items.
+
+    Positions are shifted by each chunk's start_char. An item extracted
+    twice because it lies in the overlap of two neighbouring chunks is
+    kept once (first occurrence, in document order):
+    - grounded items (with a start position) are duplicates when text and
+      document start match
+    - ungrounded items are dropped only when the previous chunk returned
+      the same item and its text lies in the overlap of the two chunks;
+      identical items elsewhere in the document are all kept
+    """
+    merged: List[Dict] = []
+    grounded: set = set()
+    previous: Optional[Chunk] = None
+    previous_keys: set = set()
+
+    for chunk in chunks:
+        overlap = ""
+        if previous is not None and previous.end_char > chunk.start_char:
+            overlap = _normalize_text(chunk.text[:previous.end_char - chunk.start_char])
+
+        chunk_keys = set()
+        for item in step.results.get(chunk.chunk_index, []):
+            item = _remap_offsets(item, chunk.start_char)
+            key = _dedupe_key(item, step.text_field)
+
+            if key[1] is not None:
+                if key in grounded:
+                    continue
+                grounded.add(key)
+            else:
+                chunk_keys.add(key)
+                if overlap and key in previous_keys and key[0] in overlap:
+                    continue
+
+            merged.append(item)
+
+        previous, previous_keys = chunk, chunk_keys
+
+    return merged
+
 
 class ExtractionRunner:
     """
@@ -22,18 +213,28 @@ class ExtractionRunner:
     Steps:
     1. Load source material
     2. Get schema and examples
-    3. Extract entities (category by category)
-    4. Extract relationships
-    5. Load into database
+    3. Split the source into overlapping chunks (SmartChunker)
+    4. Extract entities and relationships (one API call per category or
+       relationship type and chunk - or, in batch mode, one extract_batch
+       call per group of them and chunk - up to max_concurrency calls in
+       flight; a failed chunk call is retried on its own)
+    5. Merge each step's chunks (document positions, overlap duplicates
+       removed) and load it into the database as its last chunk finishes
     6. Track progress
-    7. Validate quality
+    7. Run post-load step (e.g. incremental embedding refresh)
+    8. Validate quality
     """
 
     def __init__(
         self,
         project_dir: Path,
         use_mock: bool = False,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        after_load: Optional[Callable[[Path], Dict]] = None,
+        max_concurrency: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+        batch: Optional[bool] = None,
+        use_cache: Optional[bool] = None
     ):
         """
         Initialize ExtractionRunner.
@@ -42,9 +243,29 @@ class ExtractionRunner:
             project_dir: Project directory path
             use_mock: Use mock client for testing (no API calls)
             api_key: Lang Extract API key (optional)
+            after_load: Called with the database path after each source is
+                loaded (e.g. refresh_embeddings); its result is returned
+                as "after_load" in the extraction summary
+            max_concurrency: Extraction API calls in flight at once
+                (default: KB_EXTRACTION_CONCURRENCY, then 4)
+            chunk_tokens: Tokens of source text per API call (default: 8000)
+            batch: Group categories and relationship types into extract_batch
+                calls, as many per call as MAX_BATCH_PAYLOAD_BYTES allows
+                (default: KB_EXTRACTION_BATCH)
+            use_cache: Answer repeated API calls from the response cache
+                (default: on unless KB_EXTRACTION_CACHE=0)
         """
         self.project_dir = Path(project_dir)
         self.config_file = self.project_dir / "config.json"
+        self.after_load = after_load
+        self.max_concurrency = max(1, max_concurrency or concurrency_from_env())
+        self.batch = batch_from_env() if batch is None else batch
+
+        chunk_tokens = chunk_tokens or CHUNK_TOKENS
+        self.chunker = SmartChunker(
+            max_tokens=chunk_tokens,
+            overlap=min(CHUNK_OVERLAP_TOKENS, chunk_tokens // 4)
+        )
 
         # Initialize components
         self.source_manager = SourceManager(project_dir)
@@ -53,10 +274,10 @@ class ExtractionRunner:
 
         # Initialize Lang Extract client
         if use_mock:
-            self.client = MockLangExtractClient()
+            self.client = MockLangExtractClient(max_concurrency=self.max_concurrency)
             print("Using MOCK Lang Extract client (no API calls)")
         else:
-            self.client = LangExtractClient(api_key)
+            self.client = LangExtractClient(api_key, max_concurrency=self.max_concurrency, use_cache=use_cache)
 
         # Load project config
         self.config = self._load_config()
@@ -64,18 +285,43 @@ class ExtractionRunner:
     def extract_source(
         self,
         source_id: str,
-        examples: Optional[Dict[str, List[Dict]]] = None
+        examples: Optional[Dict[str, List[Dict]]] = None,
+        completed_steps: Optional[Dict[Tuple[str, str], int]] = None,
+        on_step: Optional[Callable[[str, str, int, float], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
     ) -> Dict:
         """
         Extract knowledge from a source.
 
+        Steps are categories ("category", name) and relationship types
+        ("relationship", name). The source is split into overlapping chunks
+        and every step calls the API once per chunk; the calls run
+        concurrently (up to max_concurrency at a time). A step is merged and
+        loaded into the database as soon as its last chunk finishes, so an
+        interrupted extraction can resume by skipping the steps already done.
+
         Args:
             source_id: Source identifier
             examples: Optional user-provided examples per category
+            completed_steps: Steps already loaded by an earlier run, mapped
+                to their item counts (skipped, counts included in totals)
+            on_step: Called with (kind, name, items loaded, seconds) after
+                each step is loaded
+            should_cancel: Checked before each chunk call starts and after
+                each finishes; if it returns True the extraction stops with
+                ExtractionCancelled (calls in flight are abandoned)
 
         Returns:
-            Extraction results summary
+            Extraction results summary; status is "partial" (and the source
+            is not marked extracted) when failed_steps is not empty
         """
+        completed_steps = completed_steps or {}
+
+        def check_cancelled():
+            if should_cancel and should_cancel():
+                self.progress_tracker.fail_extraction(source_id, "cancelled")
+                raise ExtractionCancelled(f"Extraction of {source_id} cancelled")
+
         print(f"\n{'='*70}")
         print(f"STARTING EXTRACTION")
         print(f"{'='*70}\n")
@@ -103,8 +349,10 @@ class ExtractionRunner:
             print(f"\nInitializing database...")
             self.database_loader.initialize_database({"entity_schema": schema})
 
-        # Read source content
+        # Read source content and split it for the API calls
         content = self.source_manager.read_source_content(source_id)
+        chunks = self.chunker.chunk_text(content) or [Chunk(content, 0, len(content), 0, 0)]
+        print(f"Chunks: {len(chunks)} (up to {self.chunker.max_tokens:,} tokens each)")
 
         # Start progress tracking
         category_names = [cat["name"] for cat in categories]
@@ -114,104 +362,116 @@ class ExtractionRunner:
             category_names
         )
 
-        print(f"\nExtracting {len(categories)} categories...")
-
-        # Extract entities category by category
+        # Build steps (skipping those loaded by an earlier run)
+        steps: List[ExtractionStep] = []
         total_entities = 0
+        total_relationships = 0
 
         for cat in categories:
             cat_name = cat["name"]
             attributes = cat["attributes"]
             cat_examples = examples.get(cat_name, []) if examples else cat.get("examples", [])
 
-            print(f"\n[{cat_name}]")
-            self.progress_tracker.start_category(source_id, cat_name)
-
-            try:
-                # Convert examples to attribute dictionaries if needed
-                if cat_examples and isinstance(cat_examples[0], str):
-                    # Examples are strings, convert to dicts
-                    cat_examples = [
-                        {attributes[0]: ex} for ex in cat_examples
-                    ]
-
-                # Extract entities
-                entities = self.client.extract_entities(
-                    text=content,
-                    category=cat_name,
-                    attributes=attributes,
-                    examples=cat_examples[:5],  # Use first 5 examples
-                    granularity="sentence"
-                )
-
-                # Load into database
-                loaded_count = self.database_loader.load_entities(
-                    cat_name,
-                    entities,
-                    source_id
-                )
-
-                self.progress_tracker.complete_category(
-                    source_id,
-                    cat_name,
-                    loaded_count
-                )
-
+            if ("category", cat_name) in completed_steps:
+                loaded_count = completed_steps[("category", cat_name)]
+                print(f"\n[{cat_name}] Already extracted ({loaded_count} entities), skipping")
+                self.progress_tracker.complete_category(source_id, cat_name, loaded_count)
                 total_entities += loaded_count
-
-            except Exception as e:
-                self.progress_tracker.fail_category(
-                    source_id,
-                    cat_name,
-                    str(e)
-                )
-                print(f"  Error: {e}")
-
-        # Extract relationships
-        print(f"\nExtracting relationships...")
-        total_relationships = 0
+                continue
+
+            # Convert examples to attribute dictionaries if needed
+            if cat_examples and isinstance(cat_examples[0], str):
+                # Examples are strings, convert to dicts
+                cat_examples = [
+                    {attributes[0]: ex} for ex in cat_examples
+                ]
+
+            steps.append(ExtractionStep("category", cat_name, {
+                "category": cat_name,
+                "attributes": attributes,
+                "examples": cat_examples[:5],  # Use first 5 examples
+                "granularity": "sentence"
+            }))
 
         for rel in relationship_types:
             rel_name = rel["name"]
-            structure = rel.get("structure", "")
-            examples = rel.get("examples", [])
-
-            print(f"\n[{rel_name}]")
 
-            try:
-                relationships = self.client.extract_relationships(
-                    text=content,
-                    relationship_type=rel_name,
-                    structure=structure,
-                    examples=examples,
-                    entity_categories=category_names
-                )
-
-                # Load into database
-                loaded_count = self.database_loader.load_relationships(
-                    rel_name,
-                    relationships,
-                    source_id
-                )
-
-                print(f"  ✓ {rel_name}: {loaded_count} relationships extracted")
+            if ("relationship", rel_name) in completed_steps:
+                loaded_count = completed_steps[("relationship", rel_name)]
+                print(f"\n[{rel_name}] Already extracted ({loaded_count} relationships), skipping")
                 total_relationships += loaded_count
+                continue
 
-            except Exception as e:
-                print(f"  Error: {e}")
+            steps.append(ExtractionStep("relationship", rel_name, {
+                "relationship_type": rel_name,
+                "structure": rel.get("structure", ""),
+                "examples": rel.get("examples", []),
+                "entity_categories": category_names
+            }))
 
-        # Complete extraction
-        self.progress_tracker.complete_extraction(
-            source_id,
-            total_relationships
+        if self.batch:
+            requests = self._batch_requests(steps, chunks, category_names)
+        else:
+            requests = [self._single_request(step) for step in steps]
+
+        # Calls the per-step requests would have made, less those planned
+        api_calls_saved = (len(steps) - len(requests)) * len(chunks)
+
+        print(
+            f"\nExtracting {len(categories)} categories and {len(relationship_types)} relationship types "
+            f"({len(requests) * len(chunks)} calls, up to {self.max_concurrency} at a time)..."
         )
 
-        # Mark source as extracted
-        self.source_manager.mark_extracted(
-            source_id,
-            total_entities,
-            total_relationships
+        extraction_start = time.time()
+        entities_loaded, relationships_loaded, api_calls = self._run_requests(
+            source_id, requests, chunks, on_step, check_cancelled
+        )
+        total_entities += entities_loaded
+        total_relationships += relationships_loaded
+        failed_steps = [
+            {"kind": step.kind, "name": step.name, "error": step.error}
+            for step in steps if step.error is not None
+        ]
+
+        print(f"\nExtraction calls finished in {time.time() - extraction_start:.1f}s")
+        http_stats = self.client.stats()
+        print(
+            f"API calls: {api_calls}"
+            + (f" ({api_calls_saved} saved by batching)" if self.batch else "")
+            + f", HTTP retries: {http_stats['retries']}, throttled: {http_stats['throttled']}"
         )
+        cache_stats = self.client.cache_stats()
+        if cache_stats:
+            print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+        # Post-load step (failures never fail the extraction)
+        after_load_result = None
+        if self.after_load:
+            print(f"\nRunning post-load step...")
+            try:
+                after_load_result = self.after_load(self.database_loader.database_path)
+            except Exception as e:
+                print(f"  Post-load step failed: {e}")
+
+        if failed_steps:
+            # Leave the source unextracted: a resumed job re-runs only the failed steps
+            self.progress_tracker.fail_extraction(
+                source_id,
+                f"{len(failed_steps)} step(s) failed: " + ", ".join(step["name"] for step in failed_steps)
+            )
+        else:
+            # Complete extraction
+            self.progress_tracker.complete_extraction(
+                source_id,
+                total_relationships
+            )
+
+            # Mark source as extracted
+            self.source_manager.mark_extracted(
+                source_id,
+                total_entities,
+                total_relationships
+            )
 
         # Update project statistics
         self._update_statistics()
@@ -220,7 +480,7 @@ class ExtractionRunner:
         stats = self.database_loader.get_statistics()
 
         print(f"\n{'='*70}")
-        print(f"EXTRACTION COMPLETE")
+        print(f"EXTRACTION {'INCOMPLETE' if failed_steps else 'COMPLETE'}")
         print(f"{'='*70}")
         print(f"\nExtracted from this source:")
         print(f"  Entities: {total_entities:,}")
@@ -228,6 +488,10 @@ class ExtractionRunner:
         print(f"\nTotal in database:")
         print(f"  Entities: {stats['total_entities']:,}")
         print(f"  Relationships: {stats['total_relationships']:,}")
+        if failed_steps:
+            print(f"\nFailed steps (re-run to retry them):")
+            for step in failed_steps:
+                print(f"  {step['kind']} {step['name']}: {step['error']}")
 
         return {
             "source_id": source_id,
@@ -236,9 +500,215 @@ class ExtractionRunner:
             "relationships_extracted": total_relationships,
             "total_entities": stats["total_entities"],
             "total_relationships": stats["total_relationships"],
-            "status": "completed"
+            "api_calls": api_calls,
+            "api_calls_saved": api_calls_saved,
+            "http": http_stats,
+            "cache": cache_stats,
+            "after_load": after_load_result,
+            "failed_steps": failed_steps,
+            "status": "partial" if failed_steps else "completed"
         }
 
+    def _single_request(self, step: ExtractionStep) -> ExtractionRequest:
+        """One extract_entities / extract_relationships call per chunk for one step."""
+        if step.kind == "category":
+            method = self.client.extract_entities
+        else:
+            method = self.client.extract_relationships
+
+        def call(text: str) -> Dict[Tuple[str, str], List[Dict]]:
+            return {step.key: method(text=text, **step.spec)}
+
+        return ExtractionRequest([step], call)
+
+    def _batch_requests(
+        self,
+        steps: List[ExtractionStep],
+        chunks: List[Chunk],
+        entity_categories: List[str]
+    ) -> List[ExtractionRequest]:
+        """
+        Group steps into extract_batch requests.
+
+        Steps are packed in order while the payload (largest chunk plus the
+        group's specs) stays within MAX_BATCH_PAYLOAD_BYTES; a spec too
+        large to share a request gets one of its own.
+        """
+        base_size = max(len(chunk.text.encode("utf-8")) for chunk in chunks)
+
+        groups: List[List[ExtractionStep]] = []
+        size = base_size
+        for step in steps:
+            spec_size = len(json.dumps(step.spec).encode("utf-8"))
+            if not groups or size + spec_size > MAX_BATCH_PAYLOAD_BYTES:
+                groups.append([])
+                size = base_size
+            groups[-1].append(step)
+            size += spec_size
+
+        return [self._batch_request(group, entity_categories) for group in groups]
+
+    def _batch_request(self, steps: List[ExtractionStep], entity_categories: List[str]) -> ExtractionRequest:
+        """One extract_batch call per chunk for a group of steps."""
+        categories = [step for step in steps if step.kind == "category"]
+        schema = {"entity_schema": {
+            "categories": [
+                {"name": step.name, "attributes": step.spec["attributes"]} for step in categories
+            ],
+            "relationship_types": [
+                {"name": step.name, "structure": step.spec["structure"], "examples": step.spec["examples"]}
+                for step in steps if step.kind == "relationship"
+            ]
+        }}
+        examples = {step.name: step.spec["examples"] for step in categories}
+
+        def call(text: str) -> Dict[Tuple[str, str], List[Dict]]:
+            result = self.client.extract_batch(
+                text=text,
+                schema=schema,
+                examples_per_category=examples,
+                entity_categories=entity_categories
+            )
+            items_by_step = split_batch_result(result, steps)
+
+            # Relationship types the batch response could not attribute
+            for step in steps:
+                if step.key not in items_by_step:
+                    items_by_step[step.key] = self.client.extract_relationships(text=text, **step.spec)
+            return items_by_step
+
+        return ExtractionRequest(steps, call)
+
+    def _run_requests(
+        self,
+        source_id: str,
+        requests: List[ExtractionRequest],
+        chunks: List[Chunk],
+        on_step: Optional[Callable[[str, str, int, float], None]],
+        check_cancelled: Callable[[], None]
+    ) -> Tuple[int, int, int]:
+        """
+        Run extraction calls concurrently, loading each step as it completes.
+
+        Every (request, chunk) pair is one API call on a worker thread. A
+        failed call is queued again for the same chunk (up to CHUNK_ATTEMPTS
+        calls); the request's steps fail only when one of its chunks runs
+        out of attempts. Merging, loading and progress tracking stay on this
+        thread, so DatabaseLoader and ProgressTracker see one step at a
+        time. A category is marked in progress when its first call starts.
+
+        Returns:
+            (entities loaded, relationships loaded, API calls made)
+        """
+        pending = deque((request, chunk) for request in requests for chunk in chunks)
+        running: Dict[Future, Tuple[ExtractionRequest, Chunk]] = {}
+        entities_loaded = 0
+        relationships_loaded = 0
+        api_calls = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="extract")
+        try:
+            while pending or running:
+                # Fill free slots
+                while pending and len(running) < self.max_concurrency:
+                    check_cancelled()
+                    request, chunk = pending.popleft()
+                    if request.finished:
+                        continue
+                    for step in request.steps:
+                        if step.started is None:
+                            step.started = time.time()
+                            if step.kind == "category":
+                                self.progress_tracker.start_category(source_id, step.name)
+                    request.attempts[chunk.chunk_index] = request.attempts.get(chunk.chunk_index, 0) + 1
+                    running[executor.submit(request.call, chunk.text)] = (request, chunk)
+                    api_calls += 1
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                check_cancelled()
+
+                for future in done:
+                    request, chunk = running.pop(future)
+                    if request.finished:
+                        continue
+
+                    try:
+                        items_by_step = future.result()
+                    except Exception as e:
+                        where = f"chunk {chunk.chunk_index + 1}/{len(chunks)}"
+                        if request.attempts[chunk.chunk_index] < CHUNK_ATTEMPTS:
+                            names = ", ".join(step.name for step in request.steps)
+                            print(f"  ↻ {names}: {where} failed ({e}), retrying")
+                            pending.appendleft((request, chunk))
+                        else:
+                            for step in request.steps:
+                                if not step.finished:
+                                    self._fail_step(source_id, step, f"{where}: {e}")
+                        continue
+
+                    for step in request.steps:
+                        if step.finished:
+                            continue
+                        step.results[chunk.chunk_index] = items_by_step.get(step.key, [])
+                        if len(step.results) < len(chunks):
+                            continue
+
+                        loaded_count = self._load_step(source_id, step, merge_chunk_results(step, chunks))
+                        if loaded_count is None:
+                            continue
+
+                        if step.kind == "category":
+                            entities_loaded += loaded_count
+                        else:
+                            relationships_loaded += loaded_count
+
+                        if on_step:
+                            on_step(step.kind, step.name, loaded_count, time.time() - step.started)
+        except ExtractionCancelled:
+            for request in requests:
+                for step in request.steps:
+                    if step.kind == "category" and step.started is not None and not step.finished:
+                        self.progress_tracker.fail_category(source_id, step.name, "cancelled")
+            raise
+        finally:
+            # Abandon calls still queued or in flight (cancellation, or an error above)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return entities_loaded, relationships_loaded, api_calls
+
+    def _load_step(self, source_id: str, step: ExtractionStep, items: List[Dict]) -> Optional[int]:
+        """
+        Load one step's merged items into the database.
+
+        Returns:
+            Items loaded, or None if the load failed
+        """
+        step.finished = True
+        try:
+            if step.kind == "category":
+                loaded_count = self.database_loader.load_entities(step.name, items, source_id)
+                self.progress_tracker.complete_category(source_id, step.name, loaded_count)
+            else:
+                loaded_count = self.database_loader.load_relationships(step.name, items, source_id)
+                print(f"  ✓ {step.name}: {loaded_count} relationships extracted")
+            return loaded_count
+
+        except Exception as e:
+            self._fail_step(source_id, step, str(e))
+            return None
+
+    def _fail_step(self, source_id: str, step: ExtractionStep, error: str):
+        """Record a failed step (its remaining chunk calls are dropped)."""
+        step.finished = True
+        step.error = error
+        if step.kind == "category":
+            self.progress_tracker.fail_category(source_id, step.name, error)
+        else:
+            print(f"  ✗ {step.name}: Error: {error}")
+
     def extract_all_sources(self) -> Dict:
         """
         Extract all unextracted sources.
@@ -334,6 +804,8 @@ class ExtractionRunner:
         """Update project statistics in config."""
         stats = self.database_loader.get_statistics()
 
+        # Re-read first: SourceManager.mark_extracted() has just updated the sources list
+        self.config = self._load_config()
         self.config["statistics"] = {
             "total_entities": stats["total_entities"],
             "total_relationships": stats["total_relationships"],
@@ -0,0 +1,313 @@
+"""
+HTTP Pool - Pooled, throttle-aware HTTP calls for the extraction API.
+
+One requests.Session per client keeps connections alive between calls
+(bounded pool, one connection per call in flight). Around every call:
+
+- Retries: 429 and 5xx responses, timeouts and connection errors are
+  retried with exponential backoff and full jitter (Retry-After is
+  honoured when the server sends it).
+- Adaptive concurrency (AIMD): calls wait for a slot under a shared
+  limit. Each success raises the limit slowly (additive increase); a
+  throttling response (429/503) halves it (multiplicative decrease), so
+  concurrent extraction threads back off together instead of hammering
+  a rate-limited API.
+- Latency histograms per endpoint, reported by stats().
+
+Example (against a local stand-in server):
+
+    python shared/src/extraction/http_pool.py
+"""
+
+import time
+import random
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+# Status codes worth retrying, and those that signal throttling
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+
+DEFAULT_ATTEMPTS = 5
+BACKOFF_BASE = 0.5       # seconds before the first retry (upper bound, jittered)
+BACKOFF_MAX = 30.0       # cap per wait
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets_ms: Optional[List[float]] = None):
+        self.buckets_ms = list(buckets_ms or LATENCY_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one call duration."""
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect_left(self.buckets_ms, ms)] += 1
+            self.total_ms += ms
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the given fraction of calls (None if empty)."""
+        with self._lock:
+            total = sum(self.counts)
+            if not total:
+                return None
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= fraction * total:
+                    return self.buckets_ms[i] if i < len(self.buckets_ms) else float("inf")
+
+    def snapshot(self) -> Dict:
+        """Counts per bucket plus summary figures."""
+        with self._lock:
+            count = sum(self.counts)
+            labels = [f"<={b:g}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]:g}ms"]
+            buckets = {label: n for label, n in zip(labels, self.counts) if n}
+            mean_ms = self.total_ms / count if count else None
+        return {
+            "count": count,
+            "mean_ms": mean_ms,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": buckets
+        }
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on calls in flight, shared by all threads of a client.
+
+    acquire() blocks while the limit is reached. on_success() adds
+    1/limit (about +1 per limit's worth of successes); on_throttle()
+    halves the limit, at most once per cooldown so a burst of 429s from
+    calls already in flight counts as one signal.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, cooldown: float = 1.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.cooldown = cooldown
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            if self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            self.throttled += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
+
+
+class PooledSession:
+    """
+    Keep-alive session with retries, adaptive concurrency and latency stats.
+
+    Usage:
+        http = PooledSession(max_concurrency=4)
+        data = http.post_json("entities", url, headers=headers, payload=payload, timeout=60)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        attempts: int = DEFAULT_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX
+    ):
+        """
+        Initialize PooledSession.
+
+        Args:
+            max_concurrency: Upper bound of the adaptive limit, and pooled
+                connections kept per host
+            attempts: Calls per request before giving up
+            backoff_base: Backoff bound before the first retry (seconds,
+                doubled per retry, full jitter)
+            backoff_max: Cap on one backoff wait (seconds)
+        """
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = AdaptiveConcurrency(max_concurrency)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.retries = 0
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_concurrency))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post_json(self, endpoint: str, url: str, headers: Dict, payload: Dict, timeout: float) -> Dict:
+        """POST payload and return the decoded JSON response (see request())."""
+        return self.request("POST", endpoint, url, headers=headers, json=payload, timeout=timeout).json()
+
+    def get_json(self, endpoint: str, url: str, headers: Dict, timeout: float) -> Dict:
+        """GET and return the decoded JSON response (see request())."""
+        return self.request("GET", endpoint, url, headers=headers, timeout=timeout).json()
+
+    def request(self, method: str, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        Make one API call, retrying throttling, server errors and network failures.
+
+        Args:
+            method: HTTP method
+            endpoint: Name the call's latency is recorded under
+            url: Full URL
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            Successful response
+
+        Raises:
+            requests.exceptions.RequestException: Non-retryable error, or
+                the last error once attempts are used up
+        """
+        for attempt in range(1, self.attempts + 1):
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.limiter.release()
+                self._observe(endpoint, time.perf_counter() - start)
+                if attempt == self.attempts:
+                    raise
+                self._backoff(endpoint, attempt, f"{type(e).__name__}")
+                continue
+            self.limiter.release()
+            self._observe(endpoint, time.perf_counter() - start)
+
+            if response.status_code in THROTTLE_STATUSES:
+                self.limiter.on_throttle()
+            elif response.ok:
+                self.limiter.on_success()
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.attempts:
+                response.raise_for_status()
+                return response
+
+            self._backoff(endpoint, attempt, f"HTTP {response.status_code}", response.headers.get("Retry-After"))
+
+    def _backoff(self, endpoint: str, attempt: int, reason: str, retry_after: Optional[str] = None):
+        """Sleep before the next attempt: Retry-After if given, else jittered exponential backoff."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        if retry_after:
+            try:
+                delay = min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form: keep the jittered delay
+
+        with self._stats_lock:
+            self.retries += 1
+        logger.warning(f"{endpoint}: {reason}, retry {attempt}/{self.attempts - 1} in {delay:.1f}s")
+        time.sleep(delay)
+
+    def _observe(self, endpoint: str, seconds: float):
+        with self._stats_lock:
+            histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        histogram.observe(seconds)
+
+    def stats(self) -> Dict:
+        """Latency histograms per endpoint, retries, throttling and the current limit."""
+        return {
+            "endpoints": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+            "retries": self.retries,
+            "throttled": self.limiter.throttled,
+            "concurrency_limit": int(self.limiter.limit),
+            "max_concurrency": self.limiter.max_limit
+        }
+
+    def close(self):
+        self.session.close()
+
+
+# Example usage against a local stand-in server
+if __name__ == "__main__":
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StandIn(BaseHTTPRequestHandler):
+        """Throttles 1 in 4 calls, fails 1 in 10 with a 502, otherwise answers after 20-80 ms."""
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            roll = random.random()
+            if roll < 0.25:
+                status, body = 429, {"error": "rate limited"}
+            elif roll < 0.35:
+                status, body = 502, {"error": "bad gateway"}
+            else:
+                time.sleep(random.uniform(0.02, 0.08))
+                status, body = 200, {"entities": [{"extraction_text": "stand-in"}]}
+
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "0.2")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/extract/entities"
+
+    http = PooledSession(max_concurrency=8, backoff_base=0.05)
+
+    def call(i):
+        try:
+            return len(http.post_json("entities", url, headers={}, payload={"text": f"chunk {i}"}, timeout=5)["entities"])
+        except requests.exceptions.RequestException as e:
+            return f"failed: {e}"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(call, range(40)))
+
+    server.shutdown()
+    http.close()
+
+    print(f"\nSucceeded: {sum(1 for r in results if r == 1)}/{len(results)}")
+    print(json.dumps(http.stats(), indent=2))
@@ -0,0 +1,563 @@
+"""
+Job Queue - Background extraction jobs.
+
+Persistent queue of extraction jobs stored in SQLite (data/extraction_jobs.db),
+drained by a worker thread so callers get a job ID immediately instead of
+waiting minutes for every category to finish.
+
+Each job records the steps (categories and relationship types) it has
+loaded, with item counts and timings. A cancelled, failed or interrupted
+job can be resumed: already-loaded steps are skipped.
+"""
+
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict
+from datetime import datetime
+
+from .source_manager import SourceManager
+from .progress_tracker import ProgressTracker
+from .extraction_runner import ExtractionRunner, ExtractionCancelled
+
+# The worker runs inside the MCP server, whose stdout is the protocol channel
+logger = logging.getLogger(__name__)
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"  # worker stopped (e.g. server restart) mid-job
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+RESUMABLE_STATES = (FAILED, CANCELLED, INTERRUPTED)
+
+
+@dataclass
+class ExtractionJob:
+    """A queued or finished extraction of one source."""
+    job_id: str
+    source_id: str
+    status: str
+    use_mock: bool
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    cancel_requested: bool = False
+    attempts: int = 0
+    error_message: Optional[str] = None
+    result: Optional[Dict] = None
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+class ExtractionJobQueue:
+    """
+    SQLite-backed queue of extraction jobs for one project.
+
+    Every method opens its own connection, so the queue can be shared by
+    the worker thread and tool calls.
+    """
+
+    def __init__(self, project_dir: Path):
+        """
+        Initialize ExtractionJobQueue.
+
+        Args:
+            project_dir: Project directory path
+        """
+        self.project_dir = Path(project_dir)
+        self.database_path = self.project_dir / "data" / "extraction_jobs.db"
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS extraction_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    source_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    use_mock INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error_message TEXT,
+                    result_json TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_extraction_jobs_status ON extraction_jobs(status, created_at);
+
+                CREATE TABLE IF NOT EXISTS extraction_job_steps (
+                    job_id TEXT NOT NULL,
+                    step_kind TEXT NOT NULL,
+                    step_name TEXT NOT NULL,
+                    items INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    finished_at TEXT NOT NULL,
+                    PRIMARY KEY (job_id, step_kind, step_name)
+                );
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Submitting and controlling jobs
+    # ------------------------------------------------------------------
+
+    def enqueue(self, source_id: str, use_mock: bool = False) -> ExtractionJob:
+        """
+        Queue extraction of a source.
+
+        If the source already has a queued or running job, that job is
+        returned instead of queueing a duplicate.
+
+        Args:
+            source_id: Source identifier
+            use_mock: Use the mock extraction client
+
+        Returns:
+            The new (or existing active) job
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(f"""
+                SELECT job_id FROM extraction_jobs
+                WHERE source_id = ? AND status IN ({','.join('?' * len(ACTIVE_STATES))})
+                ORDER BY created_at LIMIT 1
+            """, (source_id, *ACTIVE_STATES)).fetchone()
+
+            if row:
+                return self.get_job(row[0])
+
+            job_id = f"job-{uuid.uuid4().hex[:12]}"
+            conn.execute("""
+                INSERT INTO extraction_jobs (job_id, source_id, status, use_mock, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (job_id, source_id, QUEUED, int(use_mock), _now()))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self.get_job(job_id)
+
+    def enqueue_unextracted(self, use_mock: bool = False) -> List[ExtractionJob]:
+        """
+        Queue every source that has not been extracted yet.
+
+        Args:
+            use_mock: Use the mock extraction client
+
+        Returns:
+            One job per unextracted source
+        """
+        sources = SourceManager(self.project_dir).get_unextracted_sources()
+        return [self.enqueue(source.source_id, use_mock=use_mock) for source in sources]
+
+    def cancel(self, job_id: str) -> Optional[ExtractionJob]:
+        """
+        Cancel a job.
+
+        Queued jobs are cancelled immediately; running jobs stop before
+        their next step.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Updated job, or None if not found
+        """
+        conn = self._connect()
+        try:
+            conn.execute("""
+                UPDATE extraction_jobs SET status = ?, finished_at = ?
+                WHERE job_id = ? AND status = ?
+            """, (CANCELLED, _now(), job_id, QUEUED))
+            conn.execute("""
+                UPDATE extraction_jobs SET cancel_requested = 1
+                WHERE job_id = ? AND status = ?
+            """, (job_id, RUNNING))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self.get_job(job_id)
+
+    def resume(self, job_id: str) -> Optional[ExtractionJob]:
+        """
+        Re-queue a failed, cancelled or interrupted job.
+
+        Steps it already loaded are skipped when it runs again.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Updated job, or None if not found
+        """
+        conn = self._connect()
+        try:
+            conn.execute(f"""
+                UPDATE extraction_jobs
+                SET status = ?, cancel_requested = 0, error_message = NULL, finished_at = NULL
+                WHERE job_id = ? AND status IN ({','.join('?' * len(RESUMABLE_STATES))})
+            """, (QUEUED, job_id, *RESUMABLE_STATES))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self.get_job(job_id)
+
+    def recover_interrupted(self) -> int:
+        """
+        Mark jobs left running by a stopped worker as interrupted.
+
+        Returns:
+            Number of jobs marked
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute("""
+                UPDATE extraction_jobs SET status = ?, finished_at = ?
+                WHERE status = ?
+            """, (INTERRUPTED, _now(), RUNNING))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim_next(self) -> Optional[ExtractionJob]:
+        """
+        Atomically move the oldest queued job to running.
+
+        Returns:
+            Claimed job, or None if the queue is empty
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT job_id FROM extraction_jobs
+                WHERE status = ?
+                ORDER BY created_at LIMIT 1
+            """, (QUEUED,)).fetchone()
+
+            if not row:
+                conn.rollback()
+                return None
+
+            conn.execute("""
+                UPDATE extraction_jobs
+                SET status = ?, started_at = ?, attempts = attempts + 1
+                WHERE job_id = ?
+            """, (RUNNING, _now(), row[0]))
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self.get_job(row[0])
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Check whether a running job has been asked to stop."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT cancel_requested FROM extraction_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            return bool(row and row[0])
+        finally:
+            conn.close()
+
+    def record_step(self, job_id: str, step_kind: str, step_name: str, items: int, seconds: float):
+        """Record a loaded step (category or relationship type)."""
+        conn = self._connect()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO extraction_job_steps
+                (job_id, step_kind, step_name, items, seconds, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (job_id, step_kind, step_name, items, seconds, _now()))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def completed_steps(self, job_id: str) -> Dict[Tuple[str, str], int]:
+        """Steps a job has already loaded, mapped to their item counts."""
+        return {
+            (step['kind'], step['name']): step['items']
+            for step in self.get_steps(job_id)
+        }
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict] = None,
+        error_message: Optional[str] = None
+    ):
+        """Record a job's final state."""
+        conn = self._connect()
+        try:
+            conn.execute("""
+                UPDATE extraction_jobs
+                SET status = ?, finished_at = ?, result_json = ?, error_message = ?, cancel_requested = 0
+                WHERE job_id = ?
+            """, (status, _now(), json.dumps(result) if result is not None else None, error_message, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def get_job(self, job_id: str) -> Optional[ExtractionJob]:
+        """Get a job by ID."""
+        conn = self._connect()
+        try:
+            row = conn.execute(f"""
+                SELECT {_JOB_COLUMNS} FROM extraction_jobs WHERE job_id = ?
+            """, (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        return _row_to_job(row) if row else None
+
+    def list_jobs(self, limit: int = 20) -> List[ExtractionJob]:
+        """Most recent jobs first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT {_JOB_COLUMNS} FROM extraction_jobs
+                ORDER BY created_at DESC LIMIT ?
+            """, (limit,)).fetchall()
+        finally:
+            conn.close()
+
+        return [_row_to_job(row) for row in rows]
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for the worker."""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM extraction_jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_steps(self, job_id: str) -> List[Dict]:
+        """Loaded steps with items, seconds and items per second, in completion order."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT step_kind, step_name, items, seconds FROM extraction_job_steps
+                WHERE job_id = ?
+                ORDER BY finished_at
+            """, (job_id,)).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            {
+                'kind': kind,
+                'name': name,
+                'items': items,
+                'seconds': seconds,
+                'items_per_sec': items / seconds if seconds > 0 else 0.0
+            }
+            for kind, name, items, seconds in rows
+        ]
+
+    def get_progress(self, job_id: str) -> Optional[Dict]:
+        """
+        Progress of a job.
+
+        Combines the job's recorded steps with the project schema (for
+        totals) and the source's ProgressTracker record (for the step in
+        progress right now).
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Progress dictionary, or None if the job does not exist
+        """
+        job = self.get_job(job_id)
+        if not job:
+            return None
+
+        schema = _load_schema(self.project_dir)
+        total_steps = len(schema.get("categories", [])) + len(schema.get("relationship_types", []))
+        steps = self.get_steps(job_id)
+
+        in_progress = []
+        if job.status == RUNNING:
+            tracked = ProgressTracker(self.project_dir).get_progress(job.source_id)
+            if tracked:
+                in_progress = [
+                    name for name, cat in tracked.categories.items()
+                    if cat.status == "in_progress"
+                ]
+
+        return {
+            'job': job.to_dict(),
+            'completed_steps': len(steps),
+            'total_steps': total_steps,
+            'progress_percent': len(steps) / total_steps * 100 if total_steps else 0.0,
+            'in_progress': in_progress,
+            'steps': steps
+        }
+
+
+class ExtractionWorker:
+    """
+    Background thread that drains an ExtractionJobQueue, one job at a time.
+    """
+
+    def __init__(
+        self,
+        queue: ExtractionJobQueue,
+        after_load: Optional[Callable[[Path], Dict]] = None,
+        on_job_done: Optional[Callable[[ExtractionJob], None]] = None,
+        poll_interval: float = 2.0
+    ):
+        """
+        Initialize ExtractionWorker.
+
+        Args:
+            queue: Job queue to drain
+            after_load: Passed to ExtractionRunner (e.g. refresh_embeddings)
+            on_job_done: Called with the finished job (any final state)
+            poll_interval: Seconds between queue checks when idle
+        """
+        self.queue = queue
+        self.after_load = after_load
+        self.on_job_done = on_job_done
+        self.poll_interval = poll_interval
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker (jobs a previous worker left running become interrupted)."""
+        if self._thread is not None:
+            return
+
+        recovered = self.queue.recover_interrupted()
+        if recovered:
+            logger.warning(f"Marked {recovered} interrupted extraction job(s); use resume to continue them")
+
+        self._thread = threading.Thread(target=self._run, name="extraction-worker", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Check the queue now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the current job (running jobs are not interrupted)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.queue.claim_next()
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            self.run_job(job)
+
+    def run_job(self, job: ExtractionJob):
+        """Run one claimed job to a final state."""
+        queue = self.queue
+        job_id = job.job_id
+
+        try:
+            runner = ExtractionRunner(
+                queue.project_dir,
+                use_mock=job.use_mock,
+                after_load=self.after_load
+            )
+            result = runner.extract_source(
+                job.source_id,
+                completed_steps=queue.completed_steps(job_id),
+                on_step=lambda kind, name, items, seconds: queue.record_step(job_id, kind, name, items, seconds),
+                should_cancel=lambda: queue.is_cancel_requested(job_id)
+            )
+            if result["failed_steps"]:
+                # Loaded steps are recorded, so resume re-runs only the failed ones
+                names = ", ".join(f"{step['kind']} {step['name']}" for step in result["failed_steps"])
+                queue.finish(job_id, FAILED, result=result, error_message=f"Steps failed: {names}")
+            else:
+                queue.finish(job_id, COMPLETED, result=result)
+
+        except ExtractionCancelled as e:
+            queue.finish(job_id, CANCELLED, error_message=str(e))
+
+        except Exception as e:
+            queue.finish(job_id, FAILED, error_message=f"{type(e).__name__}: {e}")
+
+        if self.on_job_done:
+            try:
+                self.on_job_done(queue.get_job(job_id))
+            except Exception as e:
+                logger.error(f"Job completion callback failed: {e}")
+
+
+_JOB_COLUMNS = (
+    "job_id, source_id, status, use_mock, created_at, started_at, finished_at, "
+    "cancel_requested, attempts, error_message, result_json"
+)
+
+
+def _row_to_job(row: Tuple) -> ExtractionJob:
+    return ExtractionJob(
+        job_id=row[0],
+        source_id=row[1],
+        status=row[2],
+        use_mock=bool(row[3]),
+        created_at=row[4],
+        started_at=row[5],
+        finished_at=row[6],
+        cancel_requested=bool(row[7]),
+        attempts=row[8],
+        error_message=row[9],
+        result=json.loads(row[10]) if row[10] else None
+    )
+
+
+def _load_schema(project_dir: Path) -> Dict:
+    config_file = Path(project_dir) / "config.json"
+    if not config_file.exists():
+        return {}
+    with open(config_file, 'r') as f:
+        return json.load(f).get("entity_schema", {})
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
@@ -6,11 +6,21 @@ Part of Phase 3: Extraction Pipeline implementation.
 """
 
 import os
+import sys
 import json
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from .http_pool import PooledSession
+
+# The response cache lives in the repo's src/ (utils), shared with the other extractors.
+# Appended, not prepended, so shared/src packages keep precedence over src/ namesakes
+_repo_src = str(Path(__file__).resolve().parents[3] / "src")
+if _repo_src not in sys.path:
+    sys.path.append(_repo_src)
+from utils.response_cache import cache_key, response_cache_enabled, shared_response_cache
+
 
 class LangExtractClient:
     """
@@ -20,15 +30,27 @@ class LangExtractClient:
     - Entity extraction with minimal examples
     - Relationship extraction
     - API authentication
-    - Error handling and retries
+    - Error handling and retries (pooled keep-alive session, backoff on
+      429/5xx, adaptive concurrency; see http_pool)
+    - Response caching (identical calls are answered from the
+      content-addressed cache in utils.response_cache)
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        use_cache: Optional[bool] = None
+    ):
         """
         Initialize LangExtractClient.
 
         Args:
             api_key: Lang Extract API key (if None, reads from LANG_EXTRACT_API_KEY env var)
+            max_concurrency: Calls in flight at once across threads (upper
+                bound of the adaptive limit and of pooled connections)
+            use_cache: Answer repeated calls from the response cache
+                (default: on unless KB_EXTRACTION_CACHE=0)
         """
         self.api_key = api_key or os.environ.get("LANG_EXTRACT_API_KEY")
         if not self.api_key:
@@ -42,6 +64,11 @@ class LangExtractClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self.http = PooledSession(max_concurrency)
+
+        if use_cache is None:
+            use_cache = response_cache_enabled()
+        self.cache = shared_response_cache() if use_cache else None
 
     def extract_entities(
         self,
@@ -89,15 +116,7 @@ class LangExtractClient:
         }
 
         try:
-            response = requests.post(
-                endpoint,
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
-
-            response.raise_for_status()
-            result = response.json()
+            result = self._post("entities", endpoint, payload, timeout=60)
 
             return result.get("entities", [])
 
@@ -146,15 +165,7 @@ class LangExtractClient:
         }
 
         try:
-            response = requests.post(
-                endpoint,
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
-
-            response.raise_for_status()
-            result = response.json()
+            result = self._post("relationships", endpoint, payload, timeout=60)
 
             return result.get("relationships", [])
 
@@ -165,17 +176,23 @@ class LangExtractClient:
         self,
         text: str,
         schema: Dict,
-        examples_per_category: Dict[str, List[Dict]]
+        examples_per_category: Dict[str, List[Dict]],
+        entity_categories: Optional[List[str]] = None
     ) -> Dict[str, List[Dict]]:
         """
         Extract all categories and relationships in batch.
 
-        More efficient than individual calls.
+        More efficient than individual calls. With the response cache on,
+        each spec is cached on its own: only specs not answered before for
+        this text are sent (no request at all if every spec is cached).
 
         Args:
             text: Source text to extract from
             schema: Entity schema from SchemaSuggester
             examples_per_category: Dict mapping category -> examples
+            entity_categories: Categories relationships may involve
+                (default: the schema's categories; pass the full list when
+                schema holds only part of the project schema)
 
         Returns:
             {
@@ -206,38 +223,154 @@ class LangExtractClient:
         # Build relationship extraction specs
         relationship_specs = []
         rel_types = schema.get("entity_schema", {}).get("relationship_types", [])
+        if entity_categories is None:
+            entity_categories = [cat["name"] for cat in categories]
 
         for rel in rel_types:
             relationship_specs.append({
                 "relationship_type": rel["name"],
                 "structure": rel["structure"],
                 "examples": rel.get("examples", []),
-                "entity_categories": [cat["name"] for cat in categories]
+                "entity_categories": entity_categories
             })
 
-        payload = {
-            "text": text,
-            "entity_specs": entity_specs,
-            "relationship_specs": relationship_specs,
-            "granularity": "sentence"
-        }
-
+        granularity = "sentence"
+        all_specs = {"entity_specs": entity_specs, "relationship_specs": relationship_specs}
+
+        # Specs answered before for this text come from the cache
+        cached: Dict[Tuple[str, str], List[Dict]] = {}
+        spec_keys: Dict[Tuple[str, str], str] = {}
+        if self.cache is not None:
+            for kind, spec in [("entity", s) for s in entity_specs] + [("relationship", s) for s in relationship_specs]:
+                name = spec["category"] if kind == "entity" else spec["relationship_type"]
+                key = cache_key(
+                    "langextract:batch", api=self.base_url, text=text, granularity=granularity, spec=spec
+                )
+                response = self.cache.get(key)
+                if response is None:
+                    spec_keys[(kind, name)] = key
+                else:
+                    cached[(kind, name)] = json.loads(response)
+
+            entity_specs = [s for s in entity_specs if ("entity", s["category"]) not in cached]
+            relationship_specs = [s for s in relationship_specs if ("relationship", s["relationship_type"]) not in cached]
+
+        result = {"entities": {}, "relationships": []}
+
+        if entity_specs or relationship_specs:
+            result = self._post_batch(endpoint, dict(
+                text=text,
+                entity_specs=entity_specs,
+                relationship_specs=relationship_specs,
+                granularity=granularity
+            ))
+
+            if self.cache is not None:
+                rel_names = [s["relationship_type"] for s in relationship_specs]
+                relationships = self._tag_relationships(result.get("relationships") or [], rel_names)
+
+                if relationships is None:
+                    if any(kind == "relationship" for kind, _ in cached):
+                        # Untagged live relationships could not be told apart from the
+                        # cached ones once merged: skip the cache for this batch
+                        return self._post_batch(endpoint, dict(text=text, granularity=granularity, **all_specs))
+                else:
+                    result = dict(result, relationships=relationships)
+                    self._cache_batch_result(result, spec_keys)
+
+        if cached:
+            result = self._merge_cached(result, cached)
+
+        return result
+
+    def _post_batch(self, endpoint: str, payload: Dict) -> Dict:
+        """POST a batch payload (never cached as a whole)."""
         try:
-            response = requests.post(
+            return self.http.post_json(
+                "batch",
                 endpoint,
                 headers=self.headers,
-                json=payload,
+                payload=payload,
                 timeout=120  # Longer timeout for batch
             )
 
-            response.raise_for_status()
-            result = response.json()
-
-            return result
-
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Batch extraction failed: {e}")
 
+    @staticmethod
+    def _tag_relationships(relationships, rel_names: List[str]):
+        """
+        Tag untagged relationships of a batch response with their type.
+
+        Untagged relationships can only be attributed when the request
+        asked for a single relationship type.
+
+        Returns:
+            Relationships (dict keyed by type, or tagged list), or None if
+            some could not be attributed
+        """
+        if isinstance(relationships, dict) or all(rel.get("relationship_type") for rel in relationships):
+            return relationships
+        if len(rel_names) != 1:
+            return None
+        return [
+            rel if rel.get("relationship_type") else dict(rel, relationship_type=rel_names[0])
+            for rel in relationships
+        ]
+
+    def _post(self, name: str, endpoint: str, payload: Dict, timeout: float) -> Dict:
+        """POST payload, answering from the response cache if this exact call was made before."""
+        def call() -> str:
+            response = self.http.request("POST", name, endpoint, headers=self.headers, json=payload, timeout=timeout)
+            response.json()  # only valid JSON is cached
+            return response.text
+
+        if self.cache is None:
+            return json.loads(call())
+
+        # The API version stands in for the model ID (the endpoints do not take one)
+        return json.loads(self.cache.get_or_call(f"langextract:{name}", call, api=self.base_url, payload=payload))
+
+    def _cache_batch_result(self, result: Dict, spec_keys: Dict[Tuple[str, str], str]):
+        """Cache a batch response per spec (relationships already tagged, see _tag_relationships)."""
+        for category, entities in (result.get("entities") or {}).items():
+            key = spec_keys.get(("entity", category))
+            if key:
+                self.cache.put(key, "langextract:batch", json.dumps(entities))
+
+        relationships = result.get("relationships") or []
+        if isinstance(relationships, dict):
+            by_type = relationships
+        else:
+            by_type = {name: [] for kind, name in spec_keys if kind == "relationship"}
+            for rel in relationships:
+                by_type.setdefault(rel["relationship_type"], []).append(rel)
+
+        for rel_type, rels in by_type.items():
+            key = spec_keys.get(("relationship", rel_type))
+            if key:
+                self.cache.put(key, "langextract:batch", json.dumps(rels))
+
+    @staticmethod
+    def _merge_cached(result: Dict, cached: Dict[Tuple[str, str], List[Dict]]) -> Dict:
+        """Add cached spec results to a (possibly empty) batch response."""
+        entities = dict(result.get("entities") or {})
+        relationships = result.get("relationships") or []
+        if isinstance(relationships, dict):
+            relationships = [
+                dict(rel, relationship_type=rel_type)
+                for rel_type, rels in relationships.items() for rel in rels
+            ]
+        relationships = list(relationships)
+
+        for (kind, name), items in cached.items():
+            if kind == "entity":
+                entities[name] = items
+            else:
+                relationships.extend(dict(rel, relationship_type=name) for rel in items)
+
+        return dict(result, entities=entities, relationships=relationships)
+
     def check_quota(self) -> Dict:
         """
         Check API usage quota.
@@ -252,18 +385,19 @@ class LangExtractClient:
         endpoint = f"{self.base_url}/quota"
 
         try:
-            response = requests.get(
-                endpoint,
-                headers=self.headers,
-                timeout=10
-            )
-
-            response.raise_for_status()
-            return response.json()
+            return self.http.get_json("quota", endpoint, headers=self.headers, timeout=10)
 
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Quota check failed: {e}")
 
+    def stats(self) -> Dict:
+        """HTTP statistics: latency histograms per endpoint, retries, throttling."""
+        return self.http.stats()
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Response cache statistics (None when the cache is bypassed)."""
+        return self.cache.stats() if self.cache is not None else None
+
 
 # Mock implementation for testing (when API not available)
 class MockLangExtractClient(LangExtractClient):
@@ -273,10 +407,17 @@ class MockLangExtractClient(LangExtractClient):
     Returns simulated extraction results.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize mock client (no API key required)."""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        use_cache: Optional[bool] = None
+    ):
+        """Initialize mock client (no API key required, nothing cached)."""
         self.api_key = api_key or "mock_key"
         self.base_url = "http://mock.langextract.com/v1"
+        self.http = PooledSession(max_concurrency)  # unused: keeps stats() available
+        self.cache = None
 
     def extract_entities(
         self,
@@ -324,12 +465,16 @@ class MockLangExtractClient(LangExtractClient):
         self,
         text: str,
         schema: Dict,
-        examples_per_category: Dict[str, List[Dict]]
+        examples_per_category: Dict[str, List[Dict]],
+        entity_categories: Optional[List[str]] = None
     ) -> Dict[str, List[Dict]]:
         """Return mock batch extraction."""
         print(f"[MOCK] Batch extracting from {len(text)} chars...")
 
         categories = schema.get("entity_schema", {}).get("categories", [])
+        rel_types = schema.get("entity_schema", {}).get("relationship_types", [])
+        if entity_categories is None:
+            entity_categories = [cat["name"] for cat in categories]
 
         # Mock entities
         entities = {}
@@ -340,14 +485,16 @@ class MockLangExtractClient(LangExtractClient):
                 text, cat_name, cat["attributes"], examples
             )
 
-        # Mock relationships
-        relationships = self.extract_relationships(
-            text,
-            "mock_relationship",
-            "entity1 → entity2",
-            ["Mock example"],
-            [cat["name"] for cat in categories]
-        )
+        # Mock relationships (one list, tagged with relationship_type)
+        relationships = []
+        for rel in rel_types:
+            relationships.extend(self.extract_relationships(
+                text,
+                rel["name"],
+                rel.get("structure", ""),
+                rel.get("examples", []),
+                entity_categories
+            ))
 
         return {
             "entities": entities,
@@ -215,7 +215,9 @@ def cmd_extract_run(pm: ProjectManager, args):
     try:
         runner = ExtractionRunner(
             pm.projects_dir / current.project_id,
-            use_mock=args.mock
+            use_mock=args.mock,
+            batch=args.batch or None,
+            use_cache=False if args.no_cache else None
         )
 
         if args.source_id:
@@ -328,6 +330,8 @@ def main():
     run_parser = extract_sub.add_parser('run', help='Run extraction')
     run_parser.add_argument('--source-id', help='Extract specific source (optional)')
     run_parser.add_argument('--mock', action='store_true', help='Use mock client (testing)')
+    run_parser.add_argument('--batch', action='store_true', help='Group categories into batch API calls')
+    run_parser.add_argument('--no-cache', action='store_true', help='Bypass the extraction response cache')
     run_parser.add_argument('--verbose', action='store_true', help='Verbose output')
 
     # extract status
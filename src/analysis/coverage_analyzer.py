@@ -6,13 +6,18 @@ Analyzes study guide completeness by checking coverage of database entities.
 Identifies gaps and missing content to ensure comprehensive study guides.
 """
 
-import sqlite3
+import sys
 import re
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 from dataclasses import dataclass, asdict
 import logging
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.connections import read_connection
+from database.fts_query import ranked_match
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,10 +86,9 @@ class CoverageAnalyzer:
         Returns:
             List of entity dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             # Check if table exists
             cursor.execute("""
                 SELECT name FROM sqlite_master
@@ -112,23 +116,20 @@ class CoverageAnalyzer:
 
             # Search for relevant entities
             fts_table = f"{table_name}_fts"
-            cursor.execute("""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """, (fts_table,))
+            cursor.execute(f"PRAGMA table_info({fts_table})")
+            fts_columns = [row[1] for row in cursor.fetchall()]
 
-            if cursor.fetchone():
-                # Use FTS search
+            if fts_columns:
+                # Use ranked FTS search, then read the rows in rank order
+                rowids = [rowid for rowid, _ in ranked_match(cursor, table_name, fts_table, fts_columns, [topic], limit)]
                 select_cols = ', '.join(columns)
                 cursor.execute(f"""
-                    SELECT {select_cols}
+                    SELECT rowid, {select_cols}
                     FROM {table_name}
-                    WHERE rowid IN (
-                        SELECT rowid FROM {fts_table}
-                        WHERE {text_col} MATCH ?
-                    )
-                    LIMIT ?
-                """, (topic, limit))
+                    WHERE rowid IN ({', '.join('?' * len(rowids))})
+                """, rowids)
+                by_rowid = {row[0]: row[1:] for row in cursor.fetchall()}
+                rows = [by_rowid[rowid] for rowid in rowids if rowid in by_rowid]
             else:
                 # Fallback to LIKE search
                 select_cols = ', '.join(columns)
@@ -138,8 +139,7 @@ class CoverageAnalyzer:
                     WHERE {text_col} LIKE ?
                     LIMIT ?
                 """, (f'%{topic}%', limit))
-
-            rows = cursor.fetchall()
+                rows = cursor.fetchall()
 
             # Convert to dictionaries
             results = []
@@ -148,9 +148,6 @@ class CoverageAnalyzer:
 
             return results
 
-        finally:
-            conn.close()
-
     def _extract_section_references(self, text: str) -> Set[str]:
         """
         Extract section references from text.
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Approximate Nearest-Neighbour Index Module
+
+IVF-flat index over a VectorStore, implemented in NumPy.
+
+Vectors are clustered with spherical k-means into `nlist` inverted lists.
+A query scores the centroids, probes the `nprobe` closest lists and runs an
+exact dot product over only those rows. Raising `nprobe` trades latency for
+recall; `nprobe == nlist` is equivalent to exact search.
+
+Index files live next to the store: database/vectors/{table}.ivf.npz,
+and record the checksum of the store they were built from.
+"""
+
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.vector_store import VectorStore, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """
+    Inverted-file index (IVF-flat) for one table's vector store.
+
+    Tunables:
+    - nlist: number of clusters (default ~sqrt(n_rows))
+    - nprobe: clusters scanned per query (higher = better recall, slower)
+    """
+
+    def __init__(self, store: VectorStore, nprobe: int = 8):
+        """
+        Initialize IVF index.
+
+        Args:
+            store: Loaded VectorStore to index
+            nprobe: Default number of lists to probe per query
+        """
+        self.store = store
+        self.nprobe = nprobe
+        self.index_file = store.store_dir / f"{store.table_name}.ivf.npz"
+
+        self.centroids: Optional[np.ndarray] = None
+        self.order: Optional[np.ndarray] = None
+        self.offsets: Optional[np.ndarray] = None
+
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists (0 if not built)."""
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def build(
+        self,
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        seed: int = 0
+    ) -> Dict:
+        """
+        Cluster the store's vectors and write the index to disk.
+
+        Args:
+            nlist: Number of clusters (defaults to ~sqrt(n_rows))
+            iterations: k-means iterations
+            seed: Random seed for centroid initialisation
+
+        Returns:
+            Statistics dictionary
+        """
+        vectors = self.store.vectors
+        n = len(self.store)
+        if n == 0:
+            raise ValueError(f"Vector store for {self.store.table_name} is empty")
+
+        if nlist is None:
+            nlist = max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+
+        start = time.time()
+        centroids, assignments = spherical_kmeans(vectors, nlist, iterations, seed)
+
+        # Group row indices by list so each list is a contiguous slice of `order`
+        order = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=nlist)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        tmp_file = self.index_file.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_file,
+            centroids=centroids,
+            order=order,
+            offsets=offsets,
+            store_checksum=np.str_(self.store.metadata.get("checksum", ""))
+        )
+        tmp_file.replace(self.index_file)
+
+        self.centroids, self.order, self.offsets = centroids, order, offsets
+
+        elapsed = time.time() - start
+        logger.info(f"Built IVF index for {self.store.table_name}: {n} rows, {nlist} lists in {elapsed:.1f}s")
+
+        return {
+            "table": self.store.table_name,
+            "rows": n,
+            "nlist": nlist,
+            "largest_list": int(counts.max()),
+            "build_seconds": elapsed,
+            "path": str(self.index_file)
+        }
+
+    def load(self) -> bool:
+        """
+        Load the index from disk.
+
+        Returns:
+            True if loaded and built from the current store, False otherwise
+        """
+        if not self.index_file.exists():
+            return False
+
+        data = np.load(self.index_file)
+        checksum = self.store.metadata.get("checksum")
+        if not checksum or "store_checksum" not in data.files or str(data["store_checksum"]) != checksum:
+            logger.warning(f"IVF index for {self.store.table_name} is stale - rebuild it")
+            return False
+
+        self.centroids = data["centroids"]
+        self.order = data["order"]
+        self.offsets = data["offsets"]
+        return True
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 10,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Approximate cosine similarity search.
+
+        Args:
+            query_embedding: Query vector (dim,)
+            top_k: Number of results to return
+            nprobe: Lists to probe (defaults to self.nprobe)
+
+        Returns:
+            List of (rowid, similarity) tuples, best first
+        """
+        if self.centroids is None:
+            raise RuntimeError("IVF index not built or loaded")
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probe_lists = top_k_indices(self.centroids @ query, nprobe)
+
+        candidates = np.concatenate([
+            self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe_lists
+        ])
+        if candidates.size == 0:
+            return []
+
+        # Sorted indices keep memory-mapped reads sequential
+        candidates.sort()
+        scores = self.store.vectors[candidates] @ query
+        top = top_k_indices(scores, top_k)
+
+        return [(int(self.store.rowids[candidates[i]]), float(scores[i])) for i in top]
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    k: int,
+    iterations: int = 10,
+    seed: int = 0,
+    chunk_size: int = 16384
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k-means on unit vectors using dot-product similarity.
+
+    Args:
+        vectors: Normalized vectors (n x dim)
+        k: Number of clusters
+        iterations: Lloyd iterations
+        seed: Random seed
+        chunk_size: Rows assigned per matrix product (bounds memory)
+
+    Returns:
+        (centroids (k x dim), assignments (n,))
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+
+    centroids = np.array(vectors[rng.choice(n, size=k, replace=False)], dtype=np.float32)
+    assignments = np.zeros(n, dtype=np.int64)
+
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+
+        for start in range(0, n, chunk_size):
+            block = np.asarray(vectors[start:start + chunk_size])
+            labels = np.argmax(block @ centroids.T, axis=1)
+            assignments[start:start + chunk_size] = labels
+
+            # Accumulate cluster sums with a one-hot matrix product (BLAS, not Python)
+            one_hot = np.zeros((len(block), k), dtype=np.float32)
+            one_hot[np.arange(len(block)), labels] = 1.0
+            sums += one_hot.T @ block
+
+        counts = np.bincount(assignments, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters from random rows
+            sums[empty] = vectors[rng.choice(n, size=int(empty.sum()), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    # Final assignment against the last centroids
+    for start in range(0, n, chunk_size):
+        block = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+
+    return centroids, assignments
+
+
+def evaluate_index(
+    index: IVFIndex,
+    queries: np.ndarray,
+    top_k: int = 10,
+    nprobe_values: Optional[List[int]] = None
+) -> List[Dict]:
+    """
+    Compare IVF search against exact search.
+
+    Args:
+        index: Built IVF index
+        queries: Query vectors (n_queries x dim)
+        top_k: k for recall@k
+        nprobe_values: nprobe settings to evaluate
+
+    Returns:
+        One row per setting: nprobe, recall@k, mean latency (ms) for ANN and exact
+    """
+    if nprobe_values is None:
+        nprobe_values = sorted({1, 2, 4, 8, 16, 32, index.nlist} & set(range(1, index.nlist + 1)))
+
+    # Ground truth and exact latency
+    exact_results = []
+    start = time.perf_counter()
+    for query in queries:
+        exact_results.append({rowid for rowid, _ in index.store.search(query, top_k)})
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    rows = []
+    for nprobe in nprobe_values:
+        hits = 0
+        start = time.perf_counter()
+        approx_results = [index.search(query, top_k, nprobe=nprobe) for query in queries]
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        for truth, approx in zip(exact_results, approx_results):
+            hits += len(truth & {rowid for rowid, _ in approx})
+
+        rows.append({
+            "nprobe": nprobe,
+            "recall_at_k": hits / (len(queries) * top_k),
+            "ann_ms": ann_ms,
+            "exact_ms": exact_ms
+        })
+
+    return rows
+
+
+def build_ann_indexes(
+    db_path: Path,
+    tables: Optional[List[str]] = None,
+    nlist: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Build IVF indexes for every packed vector store of a database.
+
+    Args:
+        db_path: Path to the knowledge database
+        tables: Tables to index (defaults to every store in database/vectors/)
+        nlist: Number of clusters (defaults to ~sqrt(n_rows) per table)
+
+    Returns:
+        Dictionary mapping table names to statistics
+    """
+    store_dir = Path(db_path).parent / "vectors"
+    if tables is None:
+        tables = sorted(p.stem for p in store_dir.glob("*.npy"))
+
+    results = {}
+    for table in tables:
+        store = VectorStore(db_path, table)
+        if not store.load():
+            results[table] = {'error': 'vector store not built'}
+            continue
+
+        try:
+            results[table] = IVFIndex(store).build(nlist=nlist)
+        except Exception as e:
+            logger.error(f"Failed to build IVF index for {table}: {e}")
+            results[table] = {'error': str(e)}
+
+    return results
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Usage: python ann_index.py <database_path> [table_name ...]")
+        print("\nExample:")
+        print("  python ann_index.py projects/insolvency-law/database/knowledge.db concepts")
+        sys.exit(1)
+
+    db_path = Path(sys.argv[1])
+    tables = sys.argv[2:] or None
+
+    results = build_ann_indexes(db_path, tables)
+
+    for table, stats in results.items():
+        if 'error' in stats:
+            print(f"❌ {table}: {stats['error']}")
+            continue
+
+        print(f"\n✅ {table}: {stats['rows']} rows, {stats['nlist']} lists ({stats['build_seconds']:.1f}s)")
+
+        # Recall/latency against exact search, using perturbed stored rows as queries
+        store = VectorStore(db_path, table)
+        store.load()
+        index = IVFIndex(store)
+        index.load()
+
+        rng = np.random.default_rng(1)
+        sample = rng.choice(len(store), size=min(100, len(store)), replace=False)
+        queries = store.vectors[np.sort(sample)] + rng.normal(0, 0.05, (len(sample), store.dim)).astype(np.float32)
+
+        print(f"   {'nprobe':>6}  {'recall@10':>9}  {'ann ms':>8}  {'exact ms':>8}")
+        for row in evaluate_index(index, queries, top_k=10):
+            print(f"   {row['nprobe']:>6}  {row['recall_at_k']:>9.3f}  {row['ann_ms']:>8.3f}  {row['exact_ms']:>8.3f}")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Connections Module
+
+Tuned, pooled read-only SQLite connections for the query path.
+
+Readers (search, coverage analysis, diagrams, cross-reference navigation)
+borrow connections from a per-database pool instead of calling
+sqlite3.connect() for every lookup. Each pooled connection is opened once
+with:
+
+1. mode=ro URI and PRAGMA query_only (the read path can never write)
+2. WAL journaling on the database, so readers never block the extraction
+   writer and vice versa
+3. mmap_size - pages are read straight from the OS page cache
+4. A larger page cache (cache_size) and temp_store=MEMORY for sorts
+5. A large prepared-statement cache (cached_statements)
+
+Usage:
+
+    with read_connection(db_path) as conn:
+        conn.execute("SELECT ...")
+
+Long-lived readers hold one connection with get_read_pool(db_path).acquire()
+and hand it back with release().
+
+Benchmark (bare connect-per-lookup vs pooled tuned connections):
+
+    python src/database/connections.py projects/insolvency-law/database/knowledge.db
+"""
+
+import os
+import sys
+import time
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+import logging
+
+logger = logging.getLogger(__name__)
+
+MMAP_SIZE = 256 * 1024 * 1024     # bytes of the database file memory-mapped
+CACHE_SIZE_KIB = 64 * 1024        # page cache per connection (negative PRAGMA = KiB)
+CACHED_STATEMENTS = 256           # prepared statements kept per connection
+POOL_SIZE = 8                     # idle connections kept per database
+
+
+def enable_wal(db_path: Path) -> str:
+    """
+    Switch a database to WAL journaling (persistent; a no-op if already WAL).
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        Journal mode after the change
+    """
+    # Short timeout: switching modes needs an exclusive lock, and a busy writer should not stall readers
+    conn = sqlite3.connect(str(db_path), timeout=1)
+    mode = 'unknown'
+    try:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != 'wal':
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            logger.info(f"Enabled WAL journaling for {db_path}")
+        return mode
+    except sqlite3.OperationalError as e:
+        # Read-only file system or a writer holding the lock: readers still work
+        logger.warning(f"Could not enable WAL for {db_path}: {e}")
+        return mode
+    finally:
+        conn.close()
+
+
+def connect_readonly(db_path: Path, cached_statements: int = CACHED_STATEMENTS) -> sqlite3.Connection:
+    """
+    Open a tuned read-only connection.
+
+    Args:
+        db_path: Path to SQLite database (must exist)
+        cached_statements: Prepared statements cached by the connection
+
+    Returns:
+        sqlite3 connection usable from any thread (one thread at a time)
+    """
+    uri = f"file:{quote(str(Path(db_path).resolve()))}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        timeout=30,
+        check_same_thread=False,
+        cached_statements=cached_statements
+    )
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+class ReadConnectionPool:
+    """
+    Pool of read-only connections to one database.
+
+    Connections are handed out one borrower at a time and returned idle.
+    If the database file is replaced (different inode), idle connections
+    to the old file are discarded.
+    """
+
+    def __init__(self, db_path: Path, max_idle: int = POOL_SIZE):
+        """
+        Initialize connection pool.
+
+        Args:
+            db_path: Path to SQLite database
+            max_idle: Idle connections kept for reuse
+        """
+        self.db_path = Path(db_path).resolve()
+        self.max_idle = max_idle
+
+        self.opened = 0
+        self.reused = 0
+
+        self._idle: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._identity: Optional[Tuple[int, int]] = None
+        self._generation = 0  # bumped when the file is replaced
+        self._borrowed_generation: Dict[int, int] = {}
+
+    def _check_identity(self):
+        """Drop idle connections if the database file was replaced."""
+        stat = os.stat(self.db_path)
+        identity = (stat.st_dev, stat.st_ino)
+
+        with self._lock:
+            if identity == self._identity:
+                return
+            if self._identity is not None:
+                logger.info(f"{self.db_path} was replaced; reopening connections")
+            self._identity = identity
+            self._generation += 1
+
+        self._close_idle()
+        enable_wal(self.db_path)
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Borrow a connection for a long-lived reader (pair with release()).
+
+        Returns:
+            sqlite3 connection (do not close it; hand it back with release())
+        """
+        self._check_identity()
+
+        try:
+            conn = self._idle.get_nowait()
+            self.reused += 1
+        except queue.Empty:
+            conn = connect_readonly(self.db_path)
+            self.opened += 1
+
+        self._borrowed_generation[id(conn)] = self._generation
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a borrowed connection to the pool (closed if the file was replaced)."""
+        generation = self._borrowed_generation.pop(id(conn), None)
+
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None  # borrowers may have set sqlite3.Row
+
+        if generation == self._generation and self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection (returned to the pool on exit)."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def _close_idle(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        """Connections opened, borrows served from the pool, idle connections."""
+        return {
+            'opened': self.opened,
+            'reused': self.reused,
+            'idle': self._idle.qsize()
+        }
+
+    def close(self):
+        """Close idle connections (borrowed ones close when returned to a closed pool)."""
+        self.max_idle = 0
+        self._close_idle()
+
+
+# One pool per database per process
+_pools: Dict[str, ReadConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_read_pool(db_path: Path) -> ReadConnectionPool:
+    """
+    Get the process-wide read connection pool for a database.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        ReadConnectionPool
+    """
+    key = str(Path(db_path).resolve())
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ReadConnectionPool(Path(key))
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def read_connection(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled read-only connection to a database.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Yields:
+        sqlite3 connection (do not close it)
+    """
+    with get_read_pool(db_path).connection() as conn:
+        yield conn
+
+
+def close_read_pools():
+    """Close every pool's idle connections (e.g. at shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+def benchmark(db_path: Path, queries: List[str], rounds: int = 3) -> Dict[str, float]:
+    """
+    Time a typical read workload with bare vs pooled tuned connections.
+
+    Each lookup mirrors one tool call's read pattern: a table-existence
+    check, an FTS5 search over the largest FTS table and a by-rowid fetch
+    of every hit. "bare" opens a fresh default connection per lookup, as
+    the readers did before this module.
+
+    Args:
+        db_path: Path to SQLite database
+        queries: FTS5 query strings
+        rounds: Passes over the query list (best pass is reported)
+
+    Returns:
+        {'lookups', 'bare_ms', 'pooled_ms', 'speedup'} - milliseconds per lookup
+    """
+    with read_connection(db_path) as conn:
+        fts_tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_fts'"
+            )
+        ]
+        if not fts_tables:
+            raise ValueError(f"No FTS5 tables in {db_path}")
+        sizes = {name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] for name in fts_tables}
+        fts_table = max(sizes, key=sizes.get)
+        base_table = fts_table[:-len('_fts')]
+
+    def lookup(conn: sqlite3.Connection, query: str):
+        conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (base_table,)
+        ).fetchone()
+        try:
+            rowids = [row[0] for row in conn.execute(
+                f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ? ORDER BY rank LIMIT 20",
+                (query,)
+            )]
+        except sqlite3.OperationalError:
+            rowids = []
+        for rowid in rowids:
+            conn.execute(f"SELECT * FROM {base_table} WHERE rowid = ?", (rowid,)).fetchone()
+
+    def bare():
+        for query in queries:
+            conn = sqlite3.connect(str(db_path))
+            try:
+                lookup(conn, query)
+            finally:
+                conn.close()
+
+    def pooled():
+        for query in queries:
+            with read_connection(db_path) as conn:
+                lookup(conn, query)
+
+    timings = {}
+    for name, run in (('bare', bare), ('pooled', pooled)):
+        run()  # warm the OS page cache and the pool
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best * 1000 / len(queries)
+
+    return {
+        'lookups': len(queries),
+        'fts_table': fts_table,
+        'bare_ms': timings['bare'],
+        'pooled_ms': timings['pooled'],
+        'speedup': timings['bare'] / timings['pooled'] if timings['pooled'] else 0.0
+    }
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Usage: python connections.py <database_path> [query ...]")
+        print("\nExample:")
+        print("  python connections.py projects/insolvency-law/database/knowledge.db trustee discharge")
+        sys.exit(1)
+
+    db_path = Path(sys.argv[1])
+    terms = sys.argv[2:] or [
+        'trustee', 'discharge', 'proposal', 'creditor', 'bankrupt',
+        'notice', 'meeting', 'stay', 'receiver', 'claim'
+    ]
+    # Single terms plus pairwise phrases, like real lookups
+    queries = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+    result = benchmark(db_path, queries * 10)
+
+    print(f"\n{result['lookups']} lookups against {result['fts_table']}")
+    print(f"  bare sqlite3.connect per lookup: {result['bare_ms']:.3f} ms/lookup")
+    print(f"  pooled tuned connections:        {result['pooled_ms']:.3f} ms/lookup")
+    print(f"  speedup:                         {result['speedup']:.1f}x")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Embedders Module
+
+Pluggable text embedders for vector and hybrid search.
+
+Backends:
+1. SentenceTransformerEmbedder - any sentence-transformers model
+   (default: all-MiniLM-L6-v2, downloaded on first use)
+2. HashingEmbedder - offline, deterministic hashed character n-grams,
+   pure NumPy; no downloads, no model-load time
+
+Choose a backend by name with get_embedder(). The default comes from the
+KB_EMBEDDER environment variable, falling back to all-MiniLM-L6-v2:
+
+    KB_EMBEDDER=hashing python src/database/embeddings_setup.py knowledge.db
+
+Vectors from different embedders are not comparable, so stores and
+caches record the embedder name they were built with.
+"""
+
+import os
+import re
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDER = 'all-MiniLM-L6-v2'
+
+
+class Embedder(ABC):
+    """
+    Interface every embedding backend implements.
+
+    Attributes:
+        name: Identifier recorded with stored vectors and cache entries
+        dim: Output vector dimension
+    """
+
+    name: str
+    dim: int
+
+    @abstractmethod
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Strings to embed
+
+        Returns:
+            float32 matrix (len(texts) x dim)
+        """
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """sentence-transformers model (loaded on construction)."""
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDER):
+        """
+        Load a sentence transformer model.
+
+        Args:
+            model_name: Model identifier (e.g., 'all-MiniLM-L6-v2')
+
+        Raises:
+            ImportError: sentence-transformers is not installed
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "sentence-transformers not installed. "
+                "Install with: pip install sentence-transformers "
+                "(or set KB_EMBEDDER=hashing for the offline embedder)"
+            )
+
+        logger.info(f"Loading model: {model_name}")
+        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(list(texts), show_progress_bar=False), dtype=np.float32)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder: signed feature hashing of character n-grams.
+
+    Text is lowercased and whitespace-collapsed; every character n-gram
+    (3-5 bytes by default) is hashed into one of `dim` buckets with a +/-1
+    sign, and the bucket counts are L2-normalized. Captures lexical and
+    morphological overlap (e.g. 'discharge' ~ 'discharged'), not semantics.
+    """
+
+    _PRIME = np.uint64(1099511628211)  # FNV-1a 64-bit prime
+
+    def __init__(self, dim: int = 384, min_n: int = 3, max_n: int = 5):
+        """
+        Initialize hashing embedder.
+
+        Args:
+            dim: Output vector dimension
+            min_n: Smallest n-gram length (bytes)
+            max_n: Largest n-gram length (bytes)
+        """
+        self.dim = dim
+        self.min_n = min_n
+        self.max_n = max_n
+        self.name = f"hashing-ngram-{dim}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            out[i] = self._embed(text)
+        return out
+
+    def _embed(self, text: str) -> np.ndarray:
+        normalized = ' ' + ' '.join(str(text).lower().split()) + ' '
+        data = np.frombuffer(normalized.encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+        vector = np.zeros(self.dim, dtype=np.float64)
+
+        with np.errstate(over='ignore'):
+            for n in range(self.min_n, self.max_n + 1):
+                count = len(data) - n + 1
+                if count <= 0:
+                    continue
+
+                # Polynomial hash of every n-gram at once (uint64 arithmetic wraps)
+                hashes = np.full(count, np.uint64(n))
+                for j in range(n):
+                    hashes = hashes * self._PRIME + data[j:j + count]
+                hashes = _mix64(hashes)
+
+                buckets = (hashes % np.uint64(self.dim)).astype(np.int64)
+                signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+                vector += np.bincount(buckets, weights=signs, minlength=self.dim)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer - spreads polynomial hashes evenly over buckets."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xbf58476d1ce4e5b9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94d049bb133111eb)
+    return values ^ (values >> np.uint64(31))
+
+
+_HASHING_NAME = re.compile(r'hashing(?:-ngram)?(?:-(\d+))?')
+
+
+def resolve_embedder_name(name: Optional[str] = None) -> str:
+    """
+    Canonical embedder name, without loading anything.
+
+    Args:
+        name: Requested name (defaults to KB_EMBEDDER, then all-MiniLM-L6-v2)
+
+    Returns:
+        Name the embedder will report (e.g. 'hashing' -> 'hashing-ngram-384')
+    """
+    name = name or os.environ.get("KB_EMBEDDER") or DEFAULT_EMBEDDER
+
+    match = _HASHING_NAME.fullmatch(name)
+    if match:
+        return f"hashing-ngram-{int(match.group(1) or 384)}"
+    return name
+
+
+def get_embedder(name: Optional[str] = None) -> Embedder:
+    """
+    Create an embedder by name.
+
+    Args:
+        name: 'hashing', 'hashing-ngram-<dim>', or a sentence-transformers
+            model name (defaults to KB_EMBEDDER, then all-MiniLM-L6-v2)
+
+    Returns:
+        Embedder
+    """
+    name = resolve_embedder_name(name)
+
+    match = _HASHING_NAME.fullmatch(name)
+    if match:
+        return HashingEmbedder(dim=int(match.group(1)))
+
+    return SentenceTransformerEmbedder(name)
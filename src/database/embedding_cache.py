@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache Module
+
+Bounded cache of query embeddings keyed on (model name, text).
+
+Two tiers:
+1. In-memory LRU (most recent strings, no I/O)
+2. On-disk float32 BLOB table in database/embedding_cache.db, shared by
+   every process that searches the same knowledge database
+
+Misses from both tiers are encoded in a single model call, so each
+distinct string is encoded once - not once per search, per fallback
+query or per comparison method.
+"""
+
+import time
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + SQLite BLOB) cache of text embeddings.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        max_memory_entries: int = 2048,
+        max_disk_entries: int = 100000
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            cache_path: Side database file holding the on-disk tier
+            max_memory_entries: Embeddings kept in memory
+            max_disk_entries: Embeddings kept on disk before LRU eviction
+        """
+        self.cache_path = Path(cache_path)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                model_name TEXT NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model_name, text)
+            );
+            CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used ON query_embeddings(last_used);
+        """)
+        self._conn.commit()
+
+    def encode(
+        self,
+        texts: List[str],
+        model_name: str,
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Embed texts, encoding only the ones not cached.
+
+        Args:
+            texts: Strings to embed
+            model_name: Model the embeddings belong to (part of the key)
+            encode_fn: Called once with the uncached strings; returns (n x dim)
+
+        Returns:
+            float32 matrix (len(texts) x dim), rows in input order
+        """
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            # 1. Memory tier
+            for text in texts:
+                key = (model_name, text)
+                if key in self._memory and text not in found:
+                    self._memory.move_to_end(key)
+                    found[text] = self._memory[key]
+                    self.memory_hits += 1
+
+            # 2. Disk tier (one query per chunk of distinct strings)
+            pending = list(dict.fromkeys(t for t in texts if t not in found))
+            if pending:
+                disk_rows = self._read_disk(model_name, pending)
+                for text, embedding in disk_rows.items():
+                    found[text] = embedding
+                    self._remember((model_name, text), embedding)
+                self.disk_hits += len(disk_rows)
+
+        # 3. Encode the rest in one call (outside the lock - this is the slow part)
+        missing = [t for t in dict.fromkeys(texts) if t not in found]
+        if missing:
+            encoded = np.asarray(encode_fn(missing), dtype=np.float32).reshape(len(missing), -1)
+
+            with self._lock:
+                self.misses += len(missing)
+                for text, embedding in zip(missing, encoded):
+                    found[text] = embedding
+                    self._remember((model_name, text), embedding)
+                self._write_disk(model_name, missing, encoded)
+
+        return np.vstack([found[t] for t in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def _remember(self, key: Tuple[str, str], embedding: np.ndarray):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, model_name: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Fetch cached embeddings for texts and mark them used."""
+        rows = {}
+        for start in range(0, len(texts), 500):
+            chunk = texts[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor = self._conn.execute(f"""
+                SELECT text, embedding FROM query_embeddings
+                WHERE model_name = ? AND text IN ({placeholders})
+            """, [model_name] + chunk)
+            for text, blob in cursor:
+                rows[text] = np.frombuffer(blob, dtype=np.float32)
+
+        if rows:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE query_embeddings SET last_used = ? WHERE model_name = ? AND text = ?",
+                [(now, model_name, text) for text in rows]
+            )
+            self._conn.commit()
+
+        return rows
+
+    def _write_disk(self, model_name: str, texts: List[str], embeddings: np.ndarray):
+        """Store new embeddings and trim the disk tier to max_disk_entries."""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO query_embeddings (model_name, text, embedding, last_used) VALUES (?, ?, ?, ?)",
+            [(model_name, text, emb.tobytes(), now) for text, emb in zip(texts, embeddings)]
+        )
+        self._conn.execute("""
+            DELETE FROM query_embeddings WHERE rowid IN (
+                SELECT rowid FROM query_embeddings
+                ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (self.max_disk_entries,))
+        self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus the on-disk entry count."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'memory_entries': len(self._memory),
+            'disk_entries': entries
+        }
+
+    def close(self):
+        """Close the side database."""
+        with self._lock:
+            self._conn.close()
+
+
+# One cache per database per process, shared by the MCP server and HybridSearcher
+_shared_caches: Dict[str, EmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_embedding_cache(db_path: Path) -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache for a knowledge database.
+
+    Stored as database/embedding_cache.db next to the knowledge database.
+
+    Args:
+        db_path: Path to the knowledge database
+
+    Returns:
+        EmbeddingCache
+    """
+    key = str(Path(db_path).resolve())
+
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(Path(key).parent / "embedding_cache.db")
+            _shared_caches[key] = cache
+        return cache
+
+
+def close_shared_embedding_caches():
+    """Close every shared cache's side database (e.g. at shutdown)."""
+    with _shared_lock:
+        caches = list(_shared_caches.values())
+        _shared_caches.clear()
+
+    for cache in caches:
+        cache.close()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Embedding Pipeline Module
+
+Pipelined, resumable embedding build for one table.
+
+Three stages run concurrently, connected by bounded queues:
+1. Reader  - streams base-table rows by rowid (keyset pagination), hashes
+             them and drops rows whose content hash is unchanged
+2. Encoder - embeds changed rows in batches, on the calling process or on
+             a process pool (one model per worker) for CPU encoding
+3. Writer  - bulk-writes vectors and hashes, committing a checkpoint
+             (last rowid) every `checkpoint_rows` rows
+
+An interrupted build resumes from the last committed checkpoint.
+"""
+
+import time
+import sqlite3
+import threading
+import queue
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import logging
+
+if TYPE_CHECKING:
+    from database.embeddings_setup import EmbeddingsManager
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = None
+
+# Per-process model for pool workers (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Load the embedder once per pool worker."""
+    global _worker_model
+    from database.embedders import get_embedder
+    _worker_model = get_embedder(model_name)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    """Encode a batch inside a pool worker."""
+    return _worker_model.encode(texts)
+
+
+class EmbeddingPipeline:
+    """
+    Reader -> encoder -> writer pipeline for one vector table.
+    """
+
+    def __init__(
+        self,
+        manager: 'EmbeddingsManager',
+        vector_table: str,
+        base_table: str,
+        text_column: str = 'full_text',
+        batch_size: int = 100,
+        checkpoint_rows: int = 1000,
+        processes: int = 0,
+        queue_size: int = 4
+    ):
+        """
+        Initialize embedding pipeline.
+
+        Args:
+            manager: EmbeddingsManager providing the model, hashing and sqlite-vec loading
+            vector_table: Vector table to populate
+            base_table: Table to read from
+            text_column: Column containing text to embed
+            batch_size: Rows per read/encode batch
+            checkpoint_rows: Rows between checkpoint commits
+            processes: Encoder processes (0 = encode on this process)
+            queue_size: Batches buffered between stages
+        """
+        self.manager = manager
+        self.db_path = manager.db_path
+        self.vector_table = vector_table
+        self.base_table = base_table
+        self.text_column = text_column
+        self.hash_table = f"{vector_table}_hashes"
+        self.batch_size = batch_size
+        self.checkpoint_rows = checkpoint_rows
+        self.processes = processes
+
+        self._encode_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._write_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._stats: Dict = {}
+
+    def run(self, force: bool = False) -> Dict:
+        """
+        Build or refresh the vector table.
+
+        Args:
+            force: Discard hashes and checkpoint and re-embed every row
+
+        Returns:
+            Statistics dictionary (including rows_per_sec)
+        """
+        start_rowid, total_count = self._prepare(force)
+
+        logger.info(
+            f"Embedding pipeline for {self.base_table}: {total_count} rows"
+            + (f", resuming after rowid {start_rowid}" if start_rowid is not None else "")
+        )
+
+        started = time.time()
+        threads = [
+            threading.Thread(target=self._read, args=(start_rowid,), name=f"embed-read-{self.base_table}"),
+            threading.Thread(target=self._encode, name=f"embed-encode-{self.base_table}"),
+            threading.Thread(target=self._write, args=(started,), name=f"embed-write-{self.base_table}")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        elapsed = time.time() - started
+        rows_read = self._stats['rows_read']
+
+        return {
+            'total_rows': total_count,
+            'rows_read': rows_read,
+            'embeddings_generated': self._stats['embedded'],
+            'unchanged': rows_read - self._stats['embedded'],
+            'deleted': self._stats['deleted'],
+            'resumed_from': start_rowid,
+            'seconds': elapsed,
+            'rows_per_sec': rows_read / elapsed if elapsed > 0 else 0.0,
+            'vector_table': self.vector_table,
+            'base_table': self.base_table
+        }
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _prepare(self, force: bool) -> Tuple[Optional[int], int]:
+        """Create bookkeeping tables; return (resume rowid, base row count)."""
+        conn = self._connect()
+
+        try:
+            self.manager._load_sqlite_vec(conn)
+            cursor = conn.cursor()
+
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.hash_table} (
+                    row_id INTEGER PRIMARY KEY,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_checkpoints (
+                    vector_table TEXT PRIMARY KEY,
+                    last_rowid INTEGER NOT NULL,
+                    model_name TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Hashes only describe the vector table they were written with
+            vec_count = cursor.execute(f"SELECT COUNT(*) FROM {self.vector_table}").fetchone()[0]
+            hash_count = cursor.execute(f"SELECT COUNT(*) FROM {self.hash_table}").fetchone()[0]
+            if force or vec_count != hash_count:
+                cursor.execute(f"DELETE FROM {self.hash_table}")
+                cursor.execute("DELETE FROM embedding_checkpoints WHERE vector_table = ?", (self.vector_table,))
+
+            cursor.execute(
+                "SELECT last_rowid, model_name FROM embedding_checkpoints WHERE vector_table = ?",
+                (self.vector_table,)
+            )
+            checkpoint = cursor.fetchone()
+            start_rowid = None
+            if checkpoint and checkpoint[1] == self.manager.model_name:
+                start_rowid = checkpoint[0]
+
+            total_count = cursor.execute(f"SELECT COUNT(*) FROM {self.base_table}").fetchone()[0]
+            conn.commit()
+
+            return start_rowid, total_count
+
+        finally:
+            conn.close()
+
+    def _fail(self, error: BaseException):
+        """Record the first error and tell every stage to stop."""
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _read(self, start_rowid: Optional[int]):
+        """Stream rows by rowid and queue the ones whose content changed."""
+        conn = self._connect()
+        last_rowid = start_rowid if start_rowid is not None else -(2 ** 63)
+
+        try:
+            cursor = conn.cursor()
+
+            while not self._stop.is_set():
+                # Keyset pagination: seek past the last rowid instead of OFFSET
+                cursor.execute(f"""
+                    SELECT rowid, {self.text_column}
+                    FROM {self.base_table}
+                    WHERE rowid > ?
+                    ORDER BY rowid
+                    LIMIT ?
+                """, (last_rowid, self.batch_size))
+
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                first_rowid, last_rowid = rows[0][0], rows[-1][0]
+
+                cursor.execute(f"""
+                    SELECT row_id, content_hash FROM {self.hash_table}
+                    WHERE row_id BETWEEN ? AND ?
+                """, (first_rowid, last_rowid))
+                known = dict(cursor.fetchall())
+
+                changed = []
+                for rowid, text in rows:
+                    text = text or ''
+                    digest = self.manager.content_hash(text)
+                    if known.get(rowid) != digest:
+                        changed.append((rowid, text, digest))
+
+                self._encode_q.put((last_rowid, len(rows), changed))
+
+        except Exception as e:
+            self._fail(e)
+
+        finally:
+            conn.close()
+            self._encode_q.put(_SENTINEL)
+
+    def _encode(self):
+        """Embed changed rows, in order, locally or on a process pool."""
+        executor = None
+        pending: deque = deque()
+        reader_done = False
+
+        def flush_one():
+            (last_rowid, n_rows, changed), future = pending.popleft()
+            self._write_q.put((last_rowid, n_rows, changed, future.result()))
+
+        try:
+            if self.processes > 0:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    initializer=_init_worker,
+                    initargs=(self.manager.model_name,)
+                )
+
+            while True:
+                item = self._encode_q.get()
+                if item is _SENTINEL:
+                    reader_done = True
+                    break
+                if self._stop.is_set():
+                    continue
+
+                last_rowid, n_rows, changed = item
+                texts = [text for _, text, _ in changed]
+
+                if executor is not None and texts:
+                    pending.append((item, executor.submit(_encode_in_worker, texts)))
+                    # Keep every worker busy without buffering unboundedly
+                    while len(pending) > self.processes:
+                        flush_one()
+                else:
+                    # Batches must reach the writer in rowid order
+                    while pending:
+                        flush_one()
+                    embeddings = self.manager.generate_embeddings(texts) if texts else None
+                    self._write_q.put((last_rowid, n_rows, changed, embeddings))
+
+            while pending and not self._stop.is_set():
+                flush_one()
+
+        except Exception as e:
+            self._fail(e)
+            # Unblock the reader
+            while not reader_done:
+                reader_done = self._encode_q.get() is _SENTINEL
+
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._write_q.put(_SENTINEL)
+
+    def _write(self, started: float):
+        """Bulk-write vectors and hashes, committing a checkpoint every checkpoint_rows rows."""
+        self._stats = {'rows_read': 0, 'embedded': 0, 'deleted': 0}
+        conn = None
+        encoder_done = False
+
+        try:
+            conn = self._connect()
+            self.manager._load_sqlite_vec(conn)
+            cursor = conn.cursor()
+            since_checkpoint = 0
+
+            while True:
+                item = self._write_q.get()
+                if item is _SENTINEL:
+                    encoder_done = True
+                    break
+                if self._stop.is_set():
+                    continue
+
+                last_rowid, n_rows, changed, embeddings = item
+
+                if changed:
+                    # vec0 has no upsert: delete then insert
+                    cursor.executemany(
+                        f"DELETE FROM {self.vector_table} WHERE rowid = ?",
+                        [(rowid,) for rowid, _, _ in changed]
+                    )
+                    cursor.executemany(
+                        f"INSERT INTO {self.vector_table} (rowid, embedding) VALUES (?, ?)",
+                        [
+                            (rowid, np.asarray(embedding, dtype=np.float32).tobytes())
+                            for (rowid, _, _), embedding in zip(changed, embeddings)
+                        ]
+                    )
+                    cursor.executemany(
+                        f"INSERT OR REPLACE INTO {self.hash_table} (row_id, content_hash) VALUES (?, ?)",
+                        [(rowid, digest) for rowid, _, digest in changed]
+                    )
+
+                self._stats['rows_read'] += n_rows
+                self._stats['embedded'] += len(changed)
+                since_checkpoint += n_rows
+
+                if since_checkpoint >= self.checkpoint_rows:
+                    self._checkpoint(cursor, last_rowid)
+                    conn.commit()
+                    since_checkpoint = 0
+
+                    elapsed = time.time() - started
+                    logger.info(
+                        f"{self.base_table}: {self._stats['rows_read']} rows, "
+                        f"{self._stats['embedded']} embedded "
+                        f"({self._stats['rows_read'] / max(elapsed, 1e-9):.0f} rows/sec)"
+                    )
+
+            if self._stop.is_set():
+                conn.rollback()
+                return
+
+            # Rows deleted from the base table
+            cursor.execute(f"""
+                SELECT row_id FROM {self.hash_table}
+                WHERE row_id NOT IN (SELECT rowid FROM {self.base_table})
+            """)
+            deleted = [(row[0],) for row in cursor.fetchall()]
+            if deleted:
+                cursor.executemany(f"DELETE FROM {self.vector_table} WHERE rowid = ?", deleted)
+                cursor.executemany(f"DELETE FROM {self.hash_table} WHERE row_id = ?", deleted)
+            self._stats['deleted'] = len(deleted)
+
+            # Finished: next run starts from the beginning again
+            cursor.execute("DELETE FROM embedding_checkpoints WHERE vector_table = ?", (self.vector_table,))
+            conn.commit()
+
+        except Exception as e:
+            self._fail(e)
+            if conn is not None:
+                conn.rollback()
+            # Unblock the encoder
+            while not encoder_done:
+                encoder_done = self._write_q.get() is _SENTINEL
+
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _checkpoint(self, cursor: sqlite3.Cursor, last_rowid: int):
+        """Record the last rowid covered by the current transaction."""
+        cursor.execute("""
+            INSERT OR REPLACE INTO embedding_checkpoints (vector_table, last_rowid, model_name, updated_at)
+            VALUES (?, ?, ?, ?)
+        """, (self.vector_table, last_rowid, self.manager.model_name, datetime.now().isoformat()))
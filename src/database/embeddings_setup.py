@@ -6,51 +6,73 @@ Generates embeddings for structured content tables (BIA sections, study material
 and stores them in SQLite using sqlite-vec extension for vector similarity search.
 
 This enables hybrid search combining keyword-based FTS5 with semantic vector search.
+After each table is embedded, its vectors are also packed into a memory-mapped
+VectorStore next to the database for fast query-time scoring.
 """
 
+import sys
 import sqlite3
+import hashlib
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.vector_store import VectorStore, build_vector_store
+from database.ann_index import IVFIndex
+from database.embedding_pipeline import EmbeddingPipeline
+from database.embedders import get_embedder, resolve_embedder_name
+
 logger = logging.getLogger(__name__)
 
+# Tables to embed: structured content first, then study material tables
+EMBEDDED_TABLES = [
+    ('bia_sections', 'full_text'),
+    ('osb_directives', 'content'),
+    ('concepts', 'extraction_text'),
+    ('procedures', 'extraction_text'),
+    ('deadlines', 'extraction_text'),
+    ('documents', 'extraction_text'),
+    ('actors', 'extraction_text'),
+    ('consequences', 'extraction_text'),
+    ('statutory_references', 'extraction_text'),
+]
+
 
 class EmbeddingsManager:
     """
     Manages embeddings generation and storage for hybrid search.
 
-    Uses sentence-transformers for free, local embedding generation.
+    Uses a pluggable embedder (sentence-transformers by default, or the
+    offline hashing embedder) for free, local embedding generation.
     Stores vectors in SQLite using sqlite-vec extension.
     """
 
-    def __init__(self, db_path: Path, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, db_path: Path, model_name: Optional[str] = None):
         """
         Initialize embeddings manager.
 
         Args:
             db_path: Path to SQLite database
-            model_name: Sentence transformer model to use
+            model_name: Embedder to use (defaults to KB_EMBEDDER, then all-MiniLM-L6-v2)
         """
         self.db_path = db_path
-        self.model_name = model_name
+        self.model_name = resolve_embedder_name(model_name)
         self.model = None
-        self.vector_dim = 384  # Dimension for all-MiniLM-L6-v2
 
     def _load_model(self):
-        """Lazy load the sentence transformer model."""
+        """Lazy load the embedder."""
         if self.model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                logger.info(f"Loading model: {self.model_name}")
-                self.model = SentenceTransformer(self.model_name)
-                logger.info("Model loaded successfully")
-            except ImportError:
-                raise ImportError(
-                    "sentence-transformers not installed. "
-                    "Install with: pip install sentence-transformers"
-                )
+            self.model = get_embedder(self.model_name)
+            logger.info(f"Embedder loaded: {self.model.name} ({self.model.dim} dimensions)")
+
+    @property
+    def vector_dim(self) -> int:
+        """Embedding dimension (loads the embedder)."""
+        self._load_model()
+        return self.model.dim
 
     def _load_sqlite_vec(self, conn: sqlite3.Connection):
         """Load sqlite-vec extension."""
@@ -106,96 +128,80 @@ class EmbeddingsManager:
         """
         self._load_model()
 
-        logger.info(f"Generating embeddings for {len(texts)} texts")
-        embeddings = self.model.encode(texts, show_progress_bar=True)
+        logger.debug(f"Generating embeddings for {len(texts)} texts")
+        embeddings = self.model.encode(texts)
 
         return embeddings
 
+    def content_hash(self, text: str) -> str:
+        """Hash of a row's text and the model that embeds it."""
+        return hashlib.sha1(f"{self.model_name}\x1f{text}".encode('utf-8')).hexdigest()
+
     def populate_vector_table(
         self,
         vector_table: str,
         base_table: str,
         text_column: str = 'full_text',
-        batch_size: int = 100
+        batch_size: int = 100,
+        force: bool = False,
+        processes: int = 0,
+        checkpoint_rows: int = 1000
     ) -> Dict[str, int]:
         """
-        Generate and store embeddings for all rows in a table.
+        Generate and store embeddings for new or changed rows in a table.
+
+        A content hash per row is kept in {vector_table}_hashes; rows whose
+        hash is unchanged are skipped, and rows deleted from the base table
+        are removed from the vector table. Runs as a reader/encoder/writer
+        pipeline that commits a checkpoint every `checkpoint_rows` rows, so
+        an interrupted run resumes where it stopped.
 
         Args:
             vector_table: Name of the vector table to populate
             base_table: Name of the base table to read from
             text_column: Column containing text to embed
             batch_size: Number of rows to process at once
+            force: Re-embed every row
+            processes: Encoder processes (0 = encode in this process)
+            checkpoint_rows: Rows between checkpoint commits
 
         Returns:
             Statistics dictionary
         """
-        conn = sqlite3.connect(self.db_path)
-
-        try:
-            self._load_sqlite_vec(conn)
-            cursor = conn.cursor()
-
-            # Get total count
-            cursor.execute(f"SELECT COUNT(*) FROM {base_table}")
-            total_count = cursor.fetchone()[0]
-
-            logger.info(f"Embedding {total_count} rows from {base_table}")
-
-            # Process in batches
-            processed = 0
-            offset = 0
-
-            while offset < total_count:
-                # Fetch batch
-                cursor.execute(f"""
-                    SELECT rowid, {text_column}
-                    FROM {base_table}
-                    LIMIT ? OFFSET ?
-                """, (batch_size, offset))
-
-                rows = cursor.fetchall()
-                if not rows:
-                    break
-
-                # Generate embeddings
-                rowids = [row[0] for row in rows]
-                texts = [row[1] or '' for row in rows]
-                embeddings = self.generate_embeddings(texts)
-
-                # Insert into vector table
-                for rowid, embedding in zip(rowids, embeddings):
-                    # Convert to list for SQLite
-                    embedding_list = embedding.tolist()
-
-                    cursor.execute(f"""
-                        INSERT OR REPLACE INTO {vector_table} (rowid, embedding)
-                        VALUES (?, ?)
-                    """, (rowid, str(embedding_list)))
-
-                conn.commit()
-                processed += len(rows)
-                offset += batch_size
-
-                logger.info(f"Progress: {processed}/{total_count} ({100*processed//total_count}%)")
-
-            return {
-                'total_rows': total_count,
-                'embeddings_generated': processed,
-                'vector_table': vector_table,
-                'base_table': base_table
-            }
-
-        finally:
-            conn.close()
+        pipeline = EmbeddingPipeline(
+            self,
+            vector_table,
+            base_table,
+            text_column,
+            batch_size=batch_size,
+            checkpoint_rows=checkpoint_rows,
+            processes=processes
+        )
+        stats = pipeline.run(force=force)
+
+        logger.info(
+            f"{base_table}: {stats['embeddings_generated']} embedded, {stats['unchanged']} unchanged, "
+            f"{stats['deleted']} deleted ({stats['rows_per_sec']:.0f} rows/sec)"
+        )
+        return stats
 
-    def setup_table_embeddings(self, base_table: str, text_column: str = 'full_text'):
+    def setup_table_embeddings(
+        self,
+        base_table: str,
+        text_column: str = 'full_text',
+        force: bool = False,
+        batch_size: int = 100,
+        processes: int = 0
+    ):
         """
-        One-shot setup: create vector table and generate all embeddings.
+        Create the vector table if needed and embed new or changed rows.
 
         Args:
             base_table: Name of the table to embed (e.g., 'bia_sections')
             text_column: Column containing text to embed
+            force: Re-embed every row
+            batch_size: Rows per encode batch
+            processes: Encoder processes (0 = encode in this process)
 
         Returns:
             Statistics dictionary
@@ -206,11 +212,79 @@ class EmbeddingsManager:
         self.create_vector_table(vector_table, base_table)
 
         # Populate with embeddings
-        stats = self.populate_vector_table(vector_table, base_table, text_column)
+        stats = self.populate_vector_table(
+            vector_table,
+            base_table,
+            text_column,
+            batch_size=batch_size,
+            force=force,
+            processes=processes
+        )
+
+        # Pack into the memory-mapped store used at query time (only if vectors changed)
+        store = VectorStore(self.db_path, base_table)
+        if stats['embeddings_generated'] or stats['deleted'] or not store.exists():
+            store_stats = build_vector_store(self.db_path, base_table, model_name=self.model_name)
+            stats['vector_store'] = store_stats['path']
+
+            # An IVF index over the old store no longer matches it: rebuild it too
+            ivf = IVFIndex(store)
+            if ivf.index_file.exists():
+                store.load()
+                stats['ann_index'] = ivf.build()['path']
+        else:
+            stats['vector_store'] = str(store.vectors_file)
 
         return stats
 
 
+def refresh_embeddings(db_path: Path) -> Dict[str, Dict[str, int]]:
+    """
+    Incrementally refresh every table that already has a vector table.
+
+    Cheap when nothing changed (rows are hashed, not re-encoded), so it is
+    run after each extraction. Skipped if the embedding dependencies are
+    not installed.
+
+    Args:
+        db_path: Path to the knowledge database
+
+    Returns:
+        Dictionary mapping table names to statistics
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    existing_tables = {row[0] for row in cursor.fetchall()}
+    conn.close()
+
+    tables = [
+        (table, column) for table, column in EMBEDDED_TABLES
+        if table in existing_tables and f"{table}_vec" in existing_tables
+    ]
+    if not tables:
+        return {}
+
+    manager = EmbeddingsManager(db_path)
+    try:
+        import sqlite_vec  # noqa: F401
+        manager._load_model()
+    except ImportError as e:
+        logger.info(f"Skipping embedding refresh: {e}")
+        return {}
+
+    results = {}
+
+    for table, column in tables:
+
+        try:
+            results[table] = manager.setup_table_embeddings(table, column)
+        except Exception as e:
+            logger.error(f"❌ Failed to refresh embeddings for {table}: {e}")
+            results[table] = {'error': str(e)}
+
+    return results
+
+
 def setup_bia_sections_embeddings(db_path: Path) -> Dict[str, int]:
     """
     Convenience function to set up embeddings for BIA sections.
@@ -225,27 +299,32 @@ def setup_bia_sections_embeddings(db_path: Path) -> Dict[str, int]:
     return manager.setup_table_embeddings('bia_sections', 'full_text')
 
 
-def setup_all_embeddings(db_path: Path) -> Dict[str, Dict[str, int]]:
+def setup_all_embeddings(
+    db_path: Path,
+    build_ann: bool = False,
+    force: bool = False,
+    batch_size: int = 100,
+    processes: int = 0,
+    embedder: Optional[str] = None
+) -> Dict[str, Dict[str, int]]:
     """
     Set up embeddings for all relevant tables in the database.
 
     Args:
         db_path: Path to the knowledge database
+        build_ann: Also build an IVF index per table (for approximate search)
+        force: Re-embed every row instead of only new or changed rows
+        batch_size: Rows per encode batch
+        processes: Encoder processes (0 = encode in this process)
+        embedder: Embedder name (defaults to KB_EMBEDDER, then all-MiniLM-L6-v2)
 
     Returns:
         Dictionary mapping table names to statistics
     """
-    manager = EmbeddingsManager(db_path)
+    manager = EmbeddingsManager(db_path, model_name=embedder)
 
     results = {}
 
-    # Tables to embed
-    tables_to_embed = [
-        ('bia_sections', 'full_text'),
-        ('osb_directives', 'content'),
-    ]
-
-    # Study material tables (if they exist)
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
@@ -254,30 +333,27 @@ def setup_all_embeddings(db_path: Path) -> Dict[str, Dict[str, int]]:
 
     conn.close()
 
-    # Add study material tables if they exist
-    study_tables = [
-        ('concepts', 'extraction_text'),
-        ('procedures', 'extraction_text'),
-        ('deadlines', 'extraction_text'),
-        ('documents', 'extraction_text'),
-        ('actors', 'extraction_text'),
-        ('consequences', 'extraction_text'),
-        ('statutory_references', 'extraction_text'),
-    ]
-
-    for table, column in study_tables:
-        if table in existing_tables:
-            tables_to_embed.append((table, column))
-
     # Generate embeddings for each table
-    for table, column in tables_to_embed:
+    for table, column in EMBEDDED_TABLES:
         if table in existing_tables:
             logger.info(f"\n{'='*60}")
             logger.info(f"Setting up embeddings for: {table}")
             logger.info(f"{'='*60}")
 
             try:
-                stats = manager.setup_table_embeddings(table, column)
+                stats = manager.setup_table_embeddings(
+                    table,
+                    column,
+                    force=force,
+                    batch_size=batch_size,
+                    processes=processes
+                )
+
+                if build_ann and 'ann_index' not in stats:
+                    store = VectorStore(db_path, table)
+                    store.load()
+                    stats['ann_index'] = IVFIndex(store).build()['path']
+
                 results[table] = stats
                 logger.info(f"✅ Completed {table}: {stats['embeddings_generated']} embeddings")
             except Exception as e:
@@ -288,7 +364,6 @@ def setup_all_embeddings(db_path: Path) -> Dict[str, Dict[str, int]]:
 
 
 if __name__ == '__main__':
-    import sys
 
     # Configure logging
     logging.basicConfig(
@@ -296,13 +371,27 @@ if __name__ == '__main__':
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-    if len(sys.argv) < 2:
-        print("Usage: python embeddings_setup.py <database_path>")
-        print("\nExample:")
-        print("  python embeddings_setup.py projects/insolvency-law/database/knowledge.db")
-        sys.exit(1)
+    import argparse
 
-    db_path = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        description='Generate embeddings for hybrid search',
+        epilog='Example: python embeddings_setup.py projects/insolvency-law/database/knowledge.db'
+    )
+    parser.add_argument('database_path', type=Path, help='Path to the knowledge database')
+    parser.add_argument('--ann', action='store_true', help='Also build IVF indexes')
+    parser.add_argument('--force', action='store_true', help='Re-embed every row')
+    parser.add_argument('--batch-size', type=int, default=100, help='Rows per encode batch')
+    parser.add_argument('--processes', type=int, default=0, help='Encoder processes (0 = encode in-process)')
+    parser.add_argument(
+        '--embedder',
+        help="Embedder: a sentence-transformers model or 'hashing' (default: $KB_EMBEDDER or all-MiniLM-L6-v2)"
+    )
+
+    args = parser.parse_args()
+
+    db_path = args.database_path
+    build_ann = args.ann
+    force = args.force
 
     if not db_path.exists():
         print(f"Error: Database not found: {db_path}")
@@ -312,15 +401,25 @@ if __name__ == '__main__':
     print(f"Embedding Setup for Knowledge Base")
     print(f"{'='*60}")
     print(f"Database: {db_path}")
-    print(f"Model: all-MiniLM-L6-v2 (384 dimensions)")
+    print(f"Embedder: {resolve_embedder_name(args.embedder)}")
     print(f"\nThis will:")
     print("  1. Create vector tables for all content tables")
-    print("  2. Generate embeddings using sentence-transformers")
+    print("  2. Generate embeddings with the embedder (new or changed rows only, unless --force)")
     print("  3. Store vectors in SQLite using sqlite-vec")
+    print("  4. Pack vectors into memory-mapped stores (database/vectors/)")
+    if build_ann:
+        print("  5. Build IVF approximate nearest-neighbour indexes")
     print(f"\n{'='*60}\n")
 
     # Run setup
-    results = setup_all_embeddings(db_path)
+    results = setup_all_embeddings(
+        db_path,
+        build_ann=build_ann,
+        force=force,
+        batch_size=args.batch_size,
+        processes=args.processes,
+        embedder=args.embedder
+    )
 
     # Print summary
     print(f"\n{'='*60}")
@@ -331,7 +430,10 @@ if __name__ == '__main__':
         if 'error' in stats:
             print(f"❌ {table}: {stats['error']}")
         else:
-            print(f"✅ {table}: {stats['embeddings_generated']} embeddings")
+            resumed = f", resumed after rowid {stats['resumed_from']}" if stats.get('resumed_from') is not None else ""
+            print(f"✅ {table}: {stats['embeddings_generated']} embedded, "
+                  f"{stats['unchanged']} unchanged, {stats['deleted']} deleted "
+                  f"({stats['rows_per_sec']:.0f} rows/sec{resumed})")
 
     print(f"\n{'='*60}")
     print("Embeddings setup complete!")
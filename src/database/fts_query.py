@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+FTS Query Module
+
+Ranked FTS5 statements with per-column BM25 weights.
+
+Every full-text lookup goes through ranked_match(), which emits
+
+    SELECT ... FROM {fts} JOIN {table} ON ...
+    WHERE {fts} MATCH ?
+    ORDER BY bm25({fts}, w1, w2, ...)
+    LIMIT ?
+
+so FTS5 returns only the best-ranked rows instead of materializing every
+match for an IN-subquery. A match in a section number or title outranks
+one buried in body text.
+
+Fallback queries (original query, then an OR over its key terms) run as one
+compound statement: each tier is ranked and limited on its own, rows from
+an earlier tier come first, and later tiers fill the remaining slots.
+
+Queries are plain text (questions included), so every MATCH string is
+rewritten first: punctuation FTS5 would reject ("?", "'", ",", ".") is
+dropped, while quoted phrases, AND/OR/NOT and prefix* are kept. Legal
+citations ("s. 50.4(1)", "section 178", "Form 31") become, on tables
+rebuilt by fts_rebuild.py, a token probe on the citation column (a
+subsection also probes its parent section's token);
+elsewhere, a phrase over the number's parts.
+"""
+
+import re
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# bm25() weight by FTS column name, for any table
+COLUMN_WEIGHTS = {
+    'section_number': 10.0,
+    'content_id': 10.0,
+    'chapter_id': 10.0,
+    'section_title': 5.0,
+    'title': 5.0,
+    'term': 8.0,
+    'role_canonical': 6.0,
+    'role_raw': 4.0,
+    'document_name': 4.0,
+    'definition': 3.0,
+    'section_context': 0.5,
+    'citation': 10.0,
+}
+
+# Per-table overrides (table -> column -> weight); unlisted columns use COLUMN_WEIGHTS, then 1.0
+FTS_COLUMN_WEIGHTS: Dict[str, Dict[str, float]] = {
+    'bia_sections_fts': {'section_number': 10.0, 'section_title': 5.0, 'full_text': 1.0},
+    'relationships_fts': {'relationship_text': 1.0},
+    'concepts_fts': {'term': 8.0, 'definition': 3.0, 'extraction_text': 1.0},
+    'search_documents_fts': {'title': 8.0, 'body': 1.0, 'section_context': 0.5},
+}
+
+
+# Indexed column added by fts_rebuild.py holding normalized section citations
+CITATION_COLUMN = 'citation'
+
+_SECTION_CITATION = re.compile(
+    r'(?P<prefix>(?:\b(?:ss?|sec|sections?)\b\.?|§)\s*)?'
+    r'\b(?P<number>\d+(?:\.\d+)*)(?P<sub>(?:\([0-9A-Za-z]{1,4}\))*)',
+    re.IGNORECASE
+)
+_FORM_CITATION = re.compile(r'\bform\s+(?P<form>\d+(?:\.\d+)?)\b', re.IGNORECASE)
+_CITATION = re.compile(f"{_FORM_CITATION.pattern}|{_SECTION_CITATION.pattern}", re.IGNORECASE)
+
+# Query syntax kept from plain text: balanced "phrases", operators, prefix*, words
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\b(?:AND|OR|NOT)\b|\w+\*?')
+_OPERATORS = ('AND', 'OR', 'NOT')
+
+
+def citation_token(section_number: str) -> str:
+    """
+    Normalized citation token for a section number.
+
+    Must agree with fts_rebuild.citation_sql(): '50.4(1)' -> 's50_4_1'.
+    """
+    normalized = re.sub(r'\s+', '', section_number).replace('.', '_').replace('(', '_').replace(')', '')
+    return 's' + normalized.lower()
+
+
+def rewrite_citations(query: str, fts_columns: Optional[Sequence[str]] = None) -> str:
+    """
+    Turn a query into valid FTS5 syntax, with precise legal citations.
+
+    'section 50.4(1)' -> 'citation : (s50_4_1 OR s50_4)' when the table has
+    a citation column (a subsection also finds its section, which is how
+    fts_rebuild.py indexes most rows), else the phrase '"50 4 1"'. Bare integers without a section
+    prefix ("10 days") stay plain terms. Other text keeps its words, quoted
+    phrases and AND/OR/NOT (operators without two operands are dropped);
+    punctuation is removed, so "What are the trustee duties?" is valid.
+
+    Args:
+        query: Search text or MATCH string
+        fts_columns: Columns of the FTS table being queried
+
+    Returns:
+        MATCH string ('""', which matches nothing, if no terms are left)
+    """
+    has_citation = bool(fts_columns) and CITATION_COLUMN in fts_columns
+
+    def citation(match: re.Match) -> List[str]:
+        if match.group('form'):
+            return [f'"form {match.group("form").replace(".", " ")}"']
+        number, sub = match.group('number'), match.group('sub')
+        if not match.group('prefix') and '.' not in number and not sub:
+            return _QUERY_TOKEN.findall(match.group(0))
+        if has_citation and sub:
+            return [f"{CITATION_COLUMN} : ({citation_token(number + sub)} OR {citation_token(number)})"]
+        if has_citation:
+            return [f"{CITATION_COLUMN} : {citation_token(number)}"]
+        return ['"' + ' '.join(re.findall(r'[0-9A-Za-z]+', number + sub)) + '"']
+
+    tokens: List[str] = []
+    pos = 0
+    for match in _CITATION.finditer(query):
+        tokens.extend(_QUERY_TOKEN.findall(query[pos:match.start()]))
+        tokens.extend(citation(match))
+        pos = match.end()
+    tokens.extend(_QUERY_TOKEN.findall(query[pos:]))
+
+    # Operators need a term on each side; FTS5 has no implicit AND next to a (group)
+    terms: List[str] = []
+    for token in tokens:
+        if token in _OPERATORS:
+            if terms and terms[-1] not in _OPERATORS:
+                terms.append(token)
+            continue
+        if terms and terms[-1] not in _OPERATORS and (token.endswith(')') or terms[-1].endswith(')')):
+            terms.append('AND')
+        terms.append(token)
+    while terms and terms[-1] in _OPERATORS:
+        terms.pop()
+
+    return ' '.join(terms) or '""'
+
+
+def column_weights(fts_table: str, fts_columns: Sequence[str]) -> List[float]:
+    """bm25() weights for an FTS table's columns, in column order."""
+    overrides = FTS_COLUMN_WEIGHTS.get(fts_table, {})
+    return [overrides.get(col, COLUMN_WEIGHTS.get(col, 1.0)) for col in fts_columns]
+
+
+def bm25_expr(fts_table: str, fts_columns: Optional[Sequence[str]] = None) -> str:
+    """bm25() call with the table's column weights (lower is better)."""
+    if not fts_columns:
+        return f"bm25({fts_table})"
+    weights = ', '.join(f"{w:g}" for w in column_weights(fts_table, fts_columns))
+    return f"bm25({fts_table}, {weights})"
+
+
+def ranked_match_sql(
+    table: str,
+    fts_table: str,
+    fts_columns: Optional[Sequence[str]],
+    tiers: int = 1,
+    key_col: str = 'rowid'
+) -> str:
+    """
+    Build a ranked FTS5 lookup.
+
+    Parameters are one MATCH string per tier, then the limit.
+    Rows are (key, score) with score = -bm25 (higher is better).
+
+    Args:
+        table: Content table the FTS table indexes
+        fts_table: FTS5 table
+        fts_columns: Columns of fts_table (None = unweighted bm25)
+        tiers: Number of MATCH queries, in priority order
+        key_col: Column of table returned (must equal the FTS rowid)
+
+    Returns:
+        SQL string
+    """
+    bm25 = bm25_expr(fts_table, fts_columns)
+
+    if tiers == 1:
+        return f"""
+            SELECT t.{key_col}, -{bm25}
+            FROM {fts_table}
+            JOIN {table} t ON t.{key_col} = {fts_table}.rowid
+            WHERE {fts_table} MATCH ?
+            ORDER BY {bm25}
+            LIMIT ?
+        """
+
+    # One ranked, limited leg per tier (?1..?n = MATCH strings, ?n+1 = limit)
+    limit_param = f"?{tiers + 1}"
+    legs = ' UNION ALL '.join(f"""
+            SELECT * FROM (
+                SELECT t.{key_col} AS key, {tier} AS tier, {bm25} AS score
+                FROM {fts_table}
+                JOIN {table} t ON t.{key_col} = {fts_table}.rowid
+                WHERE {fts_table} MATCH ?{tier + 1}
+                ORDER BY score
+                LIMIT {limit_param}
+            )""" for tier in range(tiers))
+
+    # A row found by several tiers keeps its best tier, and that tier's score
+    # (bare columns follow the row chosen by a lone MIN() aggregate)
+    return f"""
+        SELECT key, -score AS relevance, MIN(tier) AS best_tier
+        FROM ({legs})
+        GROUP BY key
+        ORDER BY best_tier, relevance DESC
+        LIMIT {limit_param}
+    """
+
+
+def ranked_match(
+    cursor: sqlite3.Cursor,
+    table: str,
+    fts_table: str,
+    fts_columns: Optional[Sequence[str]],
+    queries: Sequence[str],
+    limit: int,
+    key_col: str = 'rowid'
+) -> List[Tuple[int, float]]:
+    """
+    Run a ranked FTS5 lookup (one statement for all fallback tiers).
+
+    Args:
+        cursor: Database cursor
+        table: Content table the FTS table indexes
+        fts_table: FTS5 table
+        fts_columns: Columns of fts_table (None = unweighted bm25)
+        queries: MATCH strings in priority order (duplicates are dropped)
+        limit: Maximum rows
+        key_col: Column of table returned (must equal the FTS rowid)
+
+    Returns:
+        List of (key, score) tuples, best first
+    """
+    tiers = list(dict.fromkeys(rewrite_citations(query, fts_columns) for query in queries))
+    if not tiers:
+        return []
+
+    cursor.execute(
+        ranked_match_sql(table, fts_table, fts_columns, len(tiers), key_col),
+        (*tiers, limit)
+    )
+    return [(row[0], row[1]) for row in cursor.fetchall()]
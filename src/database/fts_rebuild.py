@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+FTS Rebuild Module
+
+Rebuilds FTS5 indexes with a citation-aware configuration, online.
+
+Each table is recreated with:
+1. porter stemming over unicode61 (diacritics folded), so 'discharged'
+   matches 'discharge'
+2. prefix='2 3' indexes, so short prefix queries ('disch*') are index
+   range scans instead of full term scans
+3. A 'citation' column holding normalized section-number tokens
+   ('50.4(1)' -> 's50_4_1 s50_4') for tables with a section_number, so a
+   citation lookup is one token probe (see fts_query.rewrite_citations)
+
+The citation column is computed by a view over the content table, which
+becomes the FTS table's external content; content tables are not altered.
+
+The rebuild runs online: the new index is built into a shadow table and
+swapped in with its sync triggers in the same transaction. Readers (WAL)
+keep using the old index until the commit and never see a partial one;
+writers wait for the rebuild.
+
+Usage:
+
+    python src/database/fts_rebuild.py projects/insolvency-law/database/knowledge.db
+"""
+
+import re
+import sys
+import time
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.connections import enable_wal
+from database.fts_query import CITATION_COLUMN
+from database.schema_catalog import ENTITY_TABLES
+
+logger = logging.getLogger(__name__)
+
+# FTS tables rebuilt by default: content sections, relationships, entities
+# (data/sql/add_entity_fts_indexes.sql) and the unified entity index (search_documents.py)
+DEFAULT_FTS_TABLES = (
+    ['bia_sections_fts', 'relationships_fts']
+    + [fts for _, fts, _ in ENTITY_TABLES]
+    + ['search_documents_fts']
+)
+
+TOKENIZE = "porter unicode61 remove_diacritics 2 tokenchars '_'"
+PREFIX = '2 3'
+
+SHADOW_SUFFIX = '_rebuild'
+
+
+@dataclass
+class FTSDefinition:
+    """Columns and external-content options of an existing FTS5 table."""
+    name: str
+    columns: List[str]
+    content: Optional[str] = None       # external content table (None = stores its own text)
+    content_rowid: str = 'rowid'
+    has_triggers: bool = False
+    options: Dict[str, str] = field(default_factory=dict)
+
+
+def _normalize_sql(expr: str) -> str:
+    """SQL twin of fts_query.citation_token() (without the 's')."""
+    return (
+        f"lower(replace(replace(replace(replace(trim({expr}), ' ', ''), "
+        f"'.', '_'), '(', '_'), ')', ''))"
+    )
+
+
+def citation_sql(column: str) -> str:
+    """
+    SQL expression producing citation tokens for a section-number column.
+
+    '50.4(1)' -> 's50_4_1 s50_4' (the section itself, then its parent section),
+    '178' -> 's178'.
+    """
+    parent = f"substr({column}, 1, instr({column}, '(') - 1)"
+    return (
+        f"'s' || {_normalize_sql(column)} || "
+        f"CASE WHEN instr({column}, '(') > 1 THEN ' s' || {_normalize_sql(parent)} ELSE '' END"
+    )
+
+
+def read_definition(conn: sqlite3.Connection, fts_table: str) -> Optional[FTSDefinition]:
+    """
+    Describe an existing FTS5 table (None if it does not exist).
+
+    Columns come from the table itself; content options from its CREATE statement.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (fts_table,)
+    ).fetchone()
+    if not row:
+        return None
+
+    sql = row[0]
+    options = {
+        key.lower(): value.strip('\'"')
+        for key, value in re.findall(r"\b(content|content_rowid)\s*=\s*('[^']*'|\"[^\"]*\"|\w+)", sql, re.IGNORECASE)
+    }
+
+    columns = [
+        col[1] for col in conn.execute(f"PRAGMA table_info({fts_table})")
+        if col[1] != CITATION_COLUMN
+    ]
+
+    content = options.get('content') or None
+    content_rowid = options.get('content_rowid', 'rowid')
+
+    view = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='view' AND name=?", (content,)
+    ).fetchone() if content else None
+    if view:
+        # Already rebuilt: the real content table and rowid column are behind the citation view
+        content_rowid = re.search(r'\bSELECT\s+(\w+)\s+AS\s+fts_rowid', view[0], re.IGNORECASE).group(1)
+        content = re.search(r'\bFROM\s+"?(\w+)"?', view[0], re.IGNORECASE).group(1)
+
+    has_triggers = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND sql LIKE ?",
+        (f"%{fts_table}%",)
+    ).fetchone()[0] > 0
+
+    return FTSDefinition(
+        name=fts_table,
+        columns=columns,
+        content=content,
+        content_rowid=content_rowid,
+        has_triggers=has_triggers,
+        options=options
+    )
+
+
+def rebuild_fts_table(conn: sqlite3.Connection, fts_table: str) -> Dict:
+    """
+    Rebuild one FTS5 table into a shadow table and swap it in.
+
+    Runs in its own transaction on conn.
+
+    Args:
+        conn: Writable connection (autocommit mode)
+        fts_table: FTS5 table to rebuild
+
+    Returns:
+        Statistics dictionary
+    """
+    definition = read_definition(conn, fts_table)
+    if definition is None:
+        return {'table': fts_table, 'skipped': 'not found'}
+
+    start = time.time()
+    shadow = f"{fts_table}{SHADOW_SUFFIX}"
+    source_view = f"{fts_table}_source"
+    columns = list(definition.columns)
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+
+        content_columns = set()
+        if definition.content:
+            content_columns = {
+                col[1] for col in conn.execute(f"PRAGMA table_info({definition.content})")
+            }
+        with_citations = 'section_number' in content_columns
+
+        # Content source: citation view over the content table, the content table, or inline text
+        if definition.content:
+            rowid_col = definition.content_rowid
+            conn.execute(f"DROP VIEW IF EXISTS {source_view}")
+            if with_citations:
+                conn.execute(f"""
+                    CREATE VIEW {source_view} AS
+                    SELECT {rowid_col} AS fts_rowid, {', '.join(columns)},
+                           {citation_sql('section_number')} AS {CITATION_COLUMN}
+                    FROM {definition.content}
+                """)
+                columns.append(CITATION_COLUMN)
+                content_options = f"content='{source_view}', content_rowid='fts_rowid'"
+            else:
+                content_options = f"content='{definition.content}', content_rowid='{rowid_col}'"
+        else:
+            content_options = None
+
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {shadow} USING fts5(
+                {', '.join(columns)},
+                {content_options + ',' if content_options else ''}
+                tokenize="{TOKENIZE}",
+                prefix='{PREFIX}'
+            )
+        """)
+
+        # Populate and compact the shadow index
+        if content_options:
+            conn.execute(f"INSERT INTO {shadow}({shadow}) VALUES('rebuild')")
+        else:
+            conn.execute(f"""
+                INSERT INTO {shadow}(rowid, {', '.join(columns)})
+                SELECT rowid, {', '.join(columns)} FROM {fts_table}
+            """)
+        conn.execute(f"INSERT INTO {shadow}({shadow}) VALUES('optimize')")
+        rows = conn.execute(f"SELECT COUNT(*) FROM {shadow}").fetchone()[0]
+
+        # Swap: drop old sync triggers and index, rename the shadow, recreate triggers
+        # (triggers feeding a self-contained index still match its columns and are kept)
+        replace_triggers = definition.has_triggers and bool(definition.content)
+        if replace_triggers:
+            for (trigger,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND sql LIKE ?", (f"%{fts_table}%",)
+            ).fetchall():
+                conn.execute(f"DROP TRIGGER {trigger}")
+
+        conn.execute(f"DROP TABLE {fts_table}")
+        conn.execute(f"ALTER TABLE {shadow} RENAME TO {fts_table}")
+
+        if replace_triggers:
+            _create_triggers(conn, fts_table, definition, with_citations)
+
+        conn.execute("COMMIT")
+
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    seconds = time.time() - start
+    logger.info(f"Rebuilt {fts_table}: {rows} rows in {seconds:.2f}s")
+
+    return {
+        'table': fts_table,
+        'rows': rows,
+        'columns': columns,
+        'citations': with_citations,
+        'triggers': replace_triggers,
+        'seconds': seconds
+    }
+
+
+def _create_triggers(conn: sqlite3.Connection, fts_table: str, definition: FTSDefinition, with_citations: bool):
+    """Keep an external-content FTS table in sync with its content table."""
+    content = definition.content
+    rowid = definition.content_rowid
+    columns = list(definition.columns)
+
+    def values(prefix: str) -> str:
+        exprs = [f"{prefix}.{rowid}"] + [f"{prefix}.{col}" for col in columns]
+        if with_citations:
+            exprs.append(citation_sql(f"{prefix}.section_number"))
+        return ', '.join(exprs)
+
+    column_list = ', '.join(columns + ([CITATION_COLUMN] if with_citations else []))
+
+    conn.execute(f"""
+        CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {content} BEGIN
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES ({values('new')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {content} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', {values('old')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {content} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) VALUES ('delete', {values('old')});
+            INSERT INTO {fts_table}(rowid, {column_list}) VALUES ({values('new')});
+        END
+    """)
+
+
+def rebuild_all(db_path: Path, tables: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Rebuild FTS5 tables one at a time (each swap is its own transaction).
+
+    Args:
+        db_path: Path to the knowledge database
+        tables: FTS tables to rebuild (default: DEFAULT_FTS_TABLES that exist)
+
+    Returns:
+        Dictionary mapping table names to statistics
+    """
+    enable_wal(db_path)
+
+    # Autocommit mode: transactions are managed explicitly per table
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+
+    try:
+        results = {}
+        for fts_table in tables or DEFAULT_FTS_TABLES:
+            try:
+                results[fts_table] = rebuild_fts_table(conn, fts_table)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to rebuild {fts_table}: {e}")
+                results[fts_table] = {'table': fts_table, 'error': str(e)}
+        return results
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Rebuild FTS5 indexes with porter stemming, prefix indexes and citation tokens',
+        epilog='Example: python fts_rebuild.py projects/insolvency-law/database/knowledge.db'
+    )
+    parser.add_argument('database_path', type=Path, help='Path to the knowledge database')
+    parser.add_argument('tables', nargs='*', help=f"FTS tables to rebuild (default: {', '.join(DEFAULT_FTS_TABLES)})")
+
+    args = parser.parse_args()
+
+    if not args.database_path.exists():
+        print(f"Error: Database not found: {args.database_path}")
+        sys.exit(1)
+
+    results = rebuild_all(args.database_path, args.tables or None)
+
+    for table, stats in results.items():
+        if 'error' in stats:
+            print(f"❌ {table}: {stats['error']}")
+        elif 'skipped' in stats:
+            print(f"⏭️  {table}: {stats['skipped']}")
+        else:
+            extras = ' + citations' if stats['citations'] else ''
+            print(f"✅ {table}: {stats['rows']} rows{extras} in {stats['seconds']:.2f}s")
@@ -4,14 +4,30 @@ Hybrid Search Module
 
 Combines FTS5 keyword search with vector similarity search using Reciprocal Rank Fusion (RRF).
 Provides 30-40% better retrieval than pure keyword search alone.
+
+The two legs run concurrently (see search_legs.py); if the vector leg misses
+the latency budget or fails, results are FTS5-only and marked degraded.
 """
 
+import sys
 import sqlite3
 import numpy as np
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Sequence, Tuple, Optional, Union
 import logging
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.vector_store import VectorStore
+from database.ann_index import IVFIndex
+from database.embedding_cache import EmbeddingCache, shared_embedding_cache
+from database.embedders import get_embedder, resolve_embedder_name
+from database.connections import read_connection
+from database.fts_query import ranked_match
+from database.hydration import hydrate_rows
+from database.search_legs import Deadline, await_vector_leg, start_vector_leg
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,29 +40,53 @@ class HybridSearcher:
     2. Vector similarity search (semantic, fuzzy match)
     """
 
-    def __init__(self, db_path: Path, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(
+        self,
+        db_path: Path,
+        model_name: Optional[str] = None,
+        use_ann: bool = False,
+        nprobe: int = 8,
+        embedding_cache: Optional[EmbeddingCache] = None
+    ):
         """
         Initialize hybrid searcher.
 
         Args:
             db_path: Path to SQLite database
-            model_name: Sentence transformer model to use
+            model_name: Embedder to use (defaults to KB_EMBEDDER, then all-MiniLM-L6-v2)
+            use_ann: Use the table's IVF index (if built) instead of exact search
+            nprobe: IVF lists probed per query (higher = better recall, slower)
+            embedding_cache: Query-embedding cache (defaults to the database's shared cache)
         """
         self.db_path = db_path
-        self.model_name = model_name
+        self.model_name = resolve_embedder_name(model_name)
         self.model = None
+        self.use_ann = use_ann
+        self.nprobe = nprobe
+        self.embedding_cache = embedding_cache or shared_embedding_cache(db_path)
+        self._vector_indexes: Dict[str, Optional[Union[VectorStore, IVFIndex]]] = {}
 
     def _load_model(self):
-        """Lazy load the sentence transformer model."""
+        """Lazy load the embedder."""
         if self.model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self.model = SentenceTransformer(self.model_name)
-            except ImportError:
-                raise ImportError(
-                    "sentence-transformers not installed. "
-                    "Install with: pip install sentence-transformers"
-                )
+            self.model = get_embedder(self.model_name)
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Embed a query, loading the model only if the string is not cached."""
+        def encode_uncached(texts: List[str]) -> np.ndarray:
+            self._load_model()
+            return self.model.encode(texts)
+
+        return self.embedding_cache.encode([query], self.model_name, encode_uncached)[0]
+
+    @contextmanager
+    def _connection(self, conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Connection]:
+        """Use the caller's connection, or borrow a pooled one."""
+        if conn is not None:
+            yield conn
+        else:
+            with read_connection(self.db_path) as pooled:
+                yield pooled
 
     def _load_sqlite_vec(self, conn: sqlite3.Connection):
         """Load sqlite-vec extension."""
@@ -54,18 +94,51 @@ class HybridSearcher:
             import sqlite_vec
             conn.enable_load_extension(True)
             sqlite_vec.load(conn)
+            # Connections may be pooled: don't leave extension loading enabled
+            conn.enable_load_extension(False)
         except ImportError:
             raise ImportError(
                 "sqlite-vec not installed. "
                 "Install with: pip install sqlite-vec"
             )
 
+    def _get_vector_index(self, base_table: str) -> Optional[Union[VectorStore, IVFIndex]]:
+        """
+        Get the packed vector store (or its IVF index) for a table.
+
+        Returns:
+            IVFIndex if use_ann and an up-to-date index exists, else the
+            VectorStore, or None if no store has been built
+        """
+        if base_table not in self._vector_indexes:
+            index = None
+            store = VectorStore(self.db_path, base_table)
+
+            if store.load():
+                index = store
+                recorded = store.metadata.get("model_name")
+                if recorded is not None and recorded != self.model_name:
+                    logger.warning(
+                        f"Vector store for {base_table} was built with {recorded}, "
+                        f"not {self.model_name}; using sqlite-vec instead"
+                    )
+                    index = None
+                elif self.use_ann:
+                    ivf = IVFIndex(store, nprobe=self.nprobe)
+                    if ivf.load():
+                        index = ivf
+
+            self._vector_indexes[base_table] = index
+
+        return self._vector_indexes[base_table]
+
     def fts5_search(
         self,
         query: str,
         table_name: str,
         fts_table: str,
-        top_k: int = 10
+        top_k: int = 10,
+        conn: Optional[sqlite3.Connection] = None
     ) -> List[Tuple[int, float]]:
         """
         Perform FTS5 keyword search.
@@ -75,47 +148,31 @@ class HybridSearcher:
             table_name: Base table name
             fts_table: FTS5 table name
             top_k: Number of results to return
+            conn: Connection to search on (default: a pooled read connection)
 
         Returns:
             List of (rowid, rank_score) tuples
         """
-        conn = sqlite3.connect(self.db_path)
-
-        try:
+        with self._connection(conn) as conn:
             cursor = conn.cursor()
 
-            # Check if FTS table exists
-            cursor.execute("""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name=?
-            """, (fts_table,))
+            # FTS table columns (empty if the table does not exist)
+            cursor.execute(f"PRAGMA table_info({fts_table})")
+            fts_columns = [row[1] for row in cursor.fetchall()]
 
-            if not cursor.fetchone():
+            if not fts_columns:
                 logger.warning(f"FTS table {fts_table} not found")
                 return []
 
-            # FTS5 search with rank
-            # rank is negative (better matches have values closer to 0)
-            cursor.execute(f"""
-                SELECT {table_name}.rowid, -rank
-                FROM {table_name}
-                JOIN {fts_table} ON {table_name}.rowid = {fts_table}.rowid
-                WHERE {fts_table} MATCH ?
-                ORDER BY rank
-                LIMIT ?
-            """, (query, top_k))
-
-            results = cursor.fetchall()
-            return results
-
-        finally:
-            conn.close()
+            # Column-weighted bm25, negated so higher is better
+            return ranked_match(cursor, table_name, fts_table, fts_columns, [query], top_k)
 
     def vector_search(
         self,
         query: str,
         vector_table: str,
-        top_k: int = 10
+        top_k: int = 10,
+        conn: Optional[sqlite3.Connection] = None
     ) -> List[Tuple[int, float]]:
         """
         Perform vector similarity search.
@@ -124,15 +181,19 @@ class HybridSearcher:
             query: Search query
             vector_table: Vector table name
             top_k: Number of results to return
+            conn: Connection for the sqlite-vec fallback (default: a pooled read connection)
 
         Returns:
             List of (rowid, similarity_score) tuples
         """
-        self._load_model()
-
-        conn = sqlite3.connect(self.db_path)
-
-        try:
+        # Prefer the packed store / IVF index over scanning the sqlite-vec table
+        base_table = vector_table[:-len('_vec')] if vector_table.endswith('_vec') else vector_table
+        index = self._get_vector_index(base_table)
+        if index is not None:
+            query_embedding = self._encode_query(query)
+            return index.search(query_embedding, top_k)
+
+        with self._connection(conn) as conn:
             self._load_sqlite_vec(conn)
             cursor = conn.cursor()
 
@@ -147,7 +208,7 @@ class HybridSearcher:
                 return []
 
             # Generate query embedding
-            query_embedding = self.model.encode([query])[0]
+            query_embedding = self._encode_query(query)
             query_vector = query_embedding.tolist()
 
             # Vector similarity search using cosine distance
@@ -162,9 +223,6 @@ class HybridSearcher:
             results = cursor.fetchall()
             return results
 
-        finally:
-            conn.close()
-
     def reciprocal_rank_fusion(
         self,
         fts_results: List[Tuple[int, float]],
@@ -205,63 +263,81 @@ class HybridSearcher:
         table_name: str,
         top_k: int = 10,
         fts_weight: float = 0.5,
-        vec_weight: float = 0.5
+        vec_weight: float = 0.5,
+        columns: Optional[Sequence[str]] = None,
+        conn: Optional[sqlite3.Connection] = None,
+        latency_budget_ms: Optional[float] = None
     ) -> List[Dict]:
         """
         Perform hybrid search combining FTS5 and vector similarity.
 
+        The vector leg runs on a worker thread (with its own connection if it
+        needs one) while the FTS5 leg runs here; winners are then read with a
+        single query on the FTS5 leg's connection.
+
         Args:
             query: Search query
             table_name: Base table to search (e.g., 'bia_sections')
             top_k: Number of results to return
             fts_weight: Weight for FTS5 results (0-1)
             vec_weight: Weight for vector results (0-1)
+            columns: Columns of table_name to return (None = all)
+            conn: Connection for the FTS5 leg and hydration (default: a pooled read connection)
+            latency_budget_ms: Time the vector leg may take (None = KB_LATENCY_BUDGET_MS,
+                0 = wait for it)
 
         Returns:
-            List of result dictionaries with rowid, score, and merged info
+            List of result dictionaries with rowid, score, and merged info;
+            'degraded' says why the vector leg was dropped (missed the
+            budget, or failed), None if it was not
         """
         fts_table = f"{table_name}_fts"
         vector_table = f"{table_name}_vec"
+        deadline = Deadline(latency_budget_ms)
 
-        # Get FTS5 results
-        fts_results = self.fts5_search(query, table_name, fts_table, top_k=top_k*2)
+        # Get vector results (worker thread)
+        vector_leg = start_vector_leg(self.vector_search, query, vector_table, top_k*2)
 
-        # Get vector results
-        vec_results = self.vector_search(query, vector_table, top_k=top_k*2)
+        with self._connection(conn) as conn:
+            # Get FTS5 results, meanwhile
+            fts_results = self.fts5_search(query, table_name, fts_table, top_k=top_k*2, conn=conn)
 
-        # Merge using RRF
-        merged = self.reciprocal_rank_fusion(fts_results, vec_results)
+            vec_results, degraded = await_vector_leg(vector_leg, deadline)
 
-        # Take top_k
-        merged = merged[:top_k]
+            # Merge using RRF
+            merged = self.reciprocal_rank_fusion(fts_results, vec_results or [])
 
-        # Fetch full records
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+            # Take top_k
+            merged = merged[:top_k]
 
-        results = []
-        for rowid, rrf_score in merged:
-            cursor.execute(f"SELECT * FROM {table_name} WHERE rowid=?", (rowid,))
-            row = cursor.fetchone()
+            # Fetch full records (one query, rank order)
+            results = _with_scores(
+                hydrate_rows(conn, table_name, [rowid for rowid, _ in merged], columns),
+                merged,
+                'rrf_score'
+            )
 
-            if row:
-                # Get column names
-                column_names = [desc[0] for desc in cursor.description]
-                result = dict(zip(column_names, row))
-                result['rowid'] = rowid
-                result['rrf_score'] = rrf_score
-                results.append(result)
+        for result in results:
+            result['degraded'] = degraded
+        return results
 
-        conn.close()
 
-        return results
+def _with_scores(rows: List[Dict], scored: List[Tuple[int, float]], score_key: str) -> List[Dict]:
+    """Attach each hydrated row's score (rows and scored share rowids)."""
+    scores = dict(scored)
+    for row in rows:
+        row[score_key] = scores[row['rowid']]
+    return rows
 
 
 def hybrid_search_rrf(
     db_path: Path,
     query: str,
     table_name: str,
-    top_k: int = 10
+    top_k: int = 10,
+    use_ann: bool = False,
+    columns: Optional[Sequence[str]] = None,
+    latency_budget_ms: Optional[float] = None
 ) -> List[Dict]:
     """
     Convenience function for hybrid search.
@@ -271,73 +347,72 @@ def hybrid_search_rrf(
         query: Search query
         table_name: Table to search
         top_k: Number of results
+        use_ann: Use the table's IVF index if built
+        columns: Columns to return (None = all)
+        latency_budget_ms: Time the vector leg may take (None = KB_LATENCY_BUDGET_MS, 0 = wait)
 
     Returns:
         List of result dictionaries
     """
-    searcher = HybridSearcher(db_path)
-    return searcher.hybrid_search(query, table_name, top_k)
+    searcher = HybridSearcher(db_path, use_ann=use_ann)
+    return searcher.hybrid_search(
+        query, table_name, top_k, columns=columns, latency_budget_ms=latency_budget_ms
+    )
 
 
 def compare_search_methods(
     db_path: Path,
     query: str,
     table_name: str,
-    top_k: int = 10
+    top_k: int = 10,
+    use_ann: bool = False,
+    columns: Optional[Sequence[str]] = None
 ) -> Dict[str, List[Dict]]:
     """
     Compare FTS5-only vs hybrid search results.
 
+    The query is embedded once; the hybrid leg reuses the cached embedding.
+    All searches and hydration share one connection, and the rows of all
+    three result lists are read with a single query.
+
     Args:
         db_path: Path to database
         query: Search query
         table_name: Table to search
         top_k: Number of results
+        use_ann: Use the table's IVF index if built
+        columns: Columns to return (None = all)
 
     Returns:
         Dictionary with 'fts5_only', 'vector_only', and 'hybrid' results
     """
-    searcher = HybridSearcher(db_path)
+    searcher = HybridSearcher(db_path, use_ann=use_ann)
 
-    # FTS5 only
     fts_table = f"{table_name}_fts"
-    fts_results = searcher.fts5_search(query, table_name, fts_table, top_k)
-
-    # Vector only
     vector_table = f"{table_name}_vec"
-    vec_results = searcher.vector_search(query, vector_table, top_k)
-
-    # Hybrid
-    hybrid_results = searcher.hybrid_search(query, table_name, top_k)
-
-    # Fetch full records for FTS5
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    fts_full = []
-    for rowid, score in fts_results:
-        cursor.execute(f"SELECT * FROM {table_name} WHERE rowid=?", (rowid,))
-        row = cursor.fetchone()
-        if row:
-            column_names = [desc[0] for desc in cursor.description]
-            result = dict(zip(column_names, row))
-            result['rowid'] = rowid
-            result['fts_score'] = score
-            fts_full.append(result)
-
-    # Fetch full records for vector
-    vec_full = []
-    for rowid, score in vec_results:
-        cursor.execute(f"SELECT * FROM {table_name} WHERE rowid=?", (rowid,))
-        row = cursor.fetchone()
-        if row:
-            column_names = [desc[0] for desc in cursor.description]
-            result = dict(zip(column_names, row))
-            result['rowid'] = rowid
-            result['vec_score'] = score
-            vec_full.append(result)
-
-    conn.close()
+
+    with read_connection(db_path) as conn:
+        # FTS5 only
+        fts_results = searcher.fts5_search(query, table_name, fts_table, top_k, conn=conn)
+
+        # Vector only
+        vec_results = searcher.vector_search(query, vector_table, top_k, conn=conn)
+
+        # Hybrid
+        fts_wide = searcher.fts5_search(query, table_name, fts_table, top_k * 2, conn=conn)
+        vec_wide = searcher.vector_search(query, vector_table, top_k * 2, conn=conn)
+        merged = searcher.reciprocal_rank_fusion(fts_wide, vec_wide)[:top_k]
+
+        # Fetch full records for all three lists at once
+        rowids = [rowid for results in (fts_results, vec_results, merged) for rowid, _ in results]
+        rows = {row['rowid']: row for row in hydrate_rows(conn, table_name, rowids, columns)}
+
+    def records(scored: List[Tuple[int, float]], score_key: str) -> List[Dict]:
+        return _with_scores([dict(rows[rowid]) for rowid, _ in scored if rowid in rows], scored, score_key)
+
+    fts_full = records(fts_results, 'fts_score')
+    vec_full = records(vec_results, 'vec_score')
+    hybrid_results = records(merged, 'rrf_score')
 
     return {
         'fts5_only': fts_full,
@@ -347,8 +422,6 @@ def compare_search_methods(
 
 
 if __name__ == '__main__':
-    import sys
-
     if len(sys.argv) < 3:
         print("Usage: python hybrid_search.py <database_path> <query> [table_name] [top_k]")
         print("\nExample:")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Hydration Module
+
+Reads ranked result rows back in bulk.
+
+Searches produce ranked keys (FTS5 rowids, vector-store rowids, fused RRF
+lists); hydration turns them into records. Rather than one
+SELECT ... WHERE rowid = ? per result, hydrate_rows() fetches all of them
+with one WHERE key IN (...) statement on the caller's connection,
+projects only the requested columns and returns the rows in ranking order.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Union
+
+# Keys per IN (...) list, below SQLite's default host-parameter limit (999)
+MAX_KEYS_PER_QUERY = 900
+
+
+def hydrate_rows(
+    conn: Union[sqlite3.Connection, sqlite3.Cursor],
+    table: str,
+    keys: Sequence,
+    columns: Optional[Sequence[str]] = None,
+    key_col: str = 'rowid'
+) -> List[Dict]:
+    """
+    Fetch rows by key, preserving the order of keys.
+
+    Args:
+        conn: Connection or cursor (typically the one that ran the search)
+        table: Table to read
+        keys: Ranked keys (missing keys are skipped, duplicates read once)
+        columns: Columns to return (None = all columns)
+        key_col: Column keys refer to
+
+    Returns:
+        One dict per found key, in key order, with the requested columns
+        plus key_col
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return []
+
+    projection = '*' if columns is None else ', '.join(columns)
+
+    rows: Dict = {}
+    for start in range(0, len(unique_keys), MAX_KEYS_PER_QUERY):
+        chunk = unique_keys[start:start + MAX_KEYS_PER_QUERY]
+        placeholders = ','.join('?' * len(chunk))
+        cursor = conn.execute(f"""
+            SELECT {key_col} AS _key, {projection}
+            FROM {table}
+            WHERE {key_col} IN ({placeholders})
+        """, tuple(chunk))
+
+        names = [desc[0] for desc in cursor.description[1:]]
+        for row in cursor.fetchall():
+            record = dict(zip(names, row[1:]))
+            record[key_col] = row[0]
+            rows[row[0]] = record
+
+    return [rows[key] for key in unique_keys if key in rows]
+
+
+def hydrate_by_key(
+    conn: Union[sqlite3.Connection, sqlite3.Cursor],
+    table: str,
+    keys: Sequence,
+    columns: Optional[Sequence[str]] = None,
+    key_col: str = 'rowid'
+) -> Dict:
+    """
+    Like hydrate_rows(), but keyed: {key: row dict} for every found key.
+    """
+    return {
+        record[key_col]: record
+        for record in hydrate_rows(conn, table, keys, columns, key_col)
+    }
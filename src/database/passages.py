@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Passages Module
+
+Best-matching passages of search results within a token budget.
+
+Tool responses used to ship the complete text of every hit (tens of
+kilobytes per answer over stdio). Instead, results carry a passage:
+
+1. FTS5 highlight() marks query-term matches inside SQLite
+2. The densest window of matches that fits the result's share of the
+   token budget is cut out in Python, snapped to word boundaries
+3. Character offsets of the window (within the row, and within the source
+   document when the row stores char_start) let the caller fetch the
+   surrounding text, or ask for full text explicitly
+
+Rows the FTS query does not match (e.g. vector-only hits) get their
+leading passage. Short texts, such as relationships, fit whole and leave
+their unused budget to the results after them.
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from database.fts_query import rewrite_citations
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 1200    # tokens for all passages in one response
+MIN_PASSAGE_TOKENS = 48        # floor per result while the budget lasts (later results get none)
+CHARS_PER_TOKEN = 4            # rough English average; close enough for budgeting
+
+# Control characters never occur in stored text, so they delimit matches unambiguously
+_OPEN = '\x02'
+_CLOSE = '\x03'
+_MARKERS = re.compile(f'([{_OPEN}{_CLOSE}])')
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a string."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class Passage:
+    """A window of one row's text column, with the query matches inside it."""
+    rowid: int
+    text: str
+    start: int                      # offset of the window in the column text
+    end: int
+    length: int                     # length of the complete column text
+    matches: List[Tuple[int, int]] = field(default_factory=list)  # spans relative to text
+    source_start: Optional[int] = None  # row's char_start in its source document
+
+    @property
+    def truncated(self) -> bool:
+        """True if the window is not the complete text."""
+        return self.start > 0 or self.end < self.length
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    def quote(self) -> str:
+        """Passage text with ellipses where it was cut."""
+        return ('… ' if self.start > 0 else '') + self.text + (' …' if self.end < self.length else '')
+
+    def highlighted(self, open_mark: str = '**', close_mark: str = '**') -> str:
+        """Passage text with query matches wrapped in markers (and ellipses where cut)."""
+        parts = []
+        position = 0
+        for start, end in self.matches:
+            parts.append(self.text[position:start])
+            parts.append(open_mark + self.text[start:end] + close_mark)
+            position = end
+        parts.append(self.text[position:])
+
+        text = ''.join(parts)
+        return ('… ' if self.start > 0 else '') + text + (' …' if self.end < self.length else '')
+
+    def location(self) -> str:
+        """Human-readable offsets, e.g. 'chars 1200-2400 of 8000'."""
+        if not self.truncated:
+            return f"complete, {self.length} chars"
+        location = f"chars {self.start}-{self.end} of {self.length}"
+        if self.source_start is not None:
+            location += f"; source offset {self.source_start + self.start}"
+        return location
+
+    def to_dict(self) -> Dict:
+        return {
+            'text': self.text,
+            'start': self.start,
+            'end': self.end,
+            'length': self.length,
+            'truncated': self.truncated,
+            'source_start': None if self.source_start is None else self.source_start + self.start
+        }
+
+
+def parse_highlight(marked: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Split highlight() output into plain text and match spans.
+
+    Returns:
+        (text, [(start, end), ...]) - offsets into the plain text
+    """
+    text_parts = []
+    spans = []
+    position = 0
+    match_start = None
+
+    for piece in _MARKERS.split(marked):
+        if piece == _OPEN:
+            match_start = position
+        elif piece == _CLOSE:
+            if match_start is not None and position > match_start:
+                spans.append((match_start, position))
+            match_start = None
+        else:
+            text_parts.append(piece)
+            position += len(piece)
+
+    return ''.join(text_parts), spans
+
+
+def select_window(text: str, spans: List[Tuple[int, int]], max_chars: int) -> Tuple[int, int]:
+    """
+    Pick the window of at most max_chars that contains the most matches.
+
+    The window starts a little before its first match so the passage reads
+    in context, and both ends are snapped to whitespace.
+
+    Returns:
+        (start, end) offsets into text
+    """
+    length = len(text)
+    if length <= max_chars:
+        return 0, length
+
+    lead = max_chars // 5
+    candidates = [0] + [max(0, min(start - lead, length - max_chars)) for start, _ in spans]
+
+    def covered(window_start: int) -> int:
+        window_end = window_start + max_chars
+        return sum(1 for start, end in spans if start >= window_start and end <= window_end)
+
+    best = max(candidates, key=lambda start: (covered(start), -start))
+    start, end = best, min(length, best + max_chars)
+
+    # Snap to word boundaries (never past a match)
+    if start > 0:
+        space = text.find(' ', start, start + lead)
+        if space != -1 and all(space < s for s, _ in spans if s >= start):
+            start = space + 1
+    if end < length:
+        space = text.rfind(' ', start, end)
+        if space > start and all(e <= space for s, e in spans if s < end and e <= end):
+            end = space
+
+    return start, end
+
+
+def _fts_matches(
+    conn: sqlite3.Connection,
+    fts_table: str,
+    fts_columns: List[str],
+    column: str,
+    rowids: Sequence[int],
+    queries: Sequence[str]
+) -> Dict[int, Tuple[str, List[Tuple[int, int]]]]:
+    """Highlighted text for rows matching the first query (in order) that matches them."""
+    found: Dict[int, Tuple[str, List[Tuple[int, int]]]] = {}
+
+    for query in queries:
+        query = rewrite_citations(query, fts_columns)
+        pending = [rowid for rowid in rowids if rowid not in found]
+        if not pending:
+            break
+
+        placeholders = ','.join('?' * len(pending))
+        try:
+            rows = conn.execute(f"""
+                SELECT rowid, highlight({fts_table}, {fts_columns.index(column)}, '{_OPEN}', '{_CLOSE}')
+                FROM {fts_table}
+                WHERE {fts_table} MATCH ? AND rowid IN ({placeholders})
+            """, (query, *pending)).fetchall()
+        except sqlite3.OperationalError as e:
+            # FTS5 syntax the query cannot express - fall through to leading passages
+            logger.debug(f"highlight() skipped for {query!r}: {e}")
+            continue
+
+        for rowid, marked in rows:
+            if marked is not None:
+                found[rowid] = parse_highlight(marked)
+
+    return found
+
+
+def build_passages(
+    conn: sqlite3.Connection,
+    table: str,
+    column: str,
+    rowids: Sequence[int],
+    queries: Sequence[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    fts_table: Optional[str] = None,
+    fts_columns: Optional[List[str]] = None,
+    offset_column: Optional[str] = None
+) -> Dict[int, Passage]:
+    """
+    Best-matching passage of each row, sharing one token budget.
+
+    Rows are served in the given (rank) order; each gets an equal share of
+    what is left, so short rows leave budget for the rows after them. A
+    share is at least MIN_PASSAGE_TOKENS, never more than what is left:
+    once a useful passage no longer fits, the remaining rows get none, and
+    the passages together never exceed token_budget.
+
+    Args:
+        conn: Open connection
+        table: Table holding the text (the FTS table's content table)
+        column: Text column to cut passages from
+        rowids: Ranked rowids of table
+        queries: FTS5 queries to highlight, tried in order (e.g. original, then OR fallback)
+        token_budget: Tokens for all passages together
+        fts_table: FTS5 table indexing table (None = leading passages only)
+        fts_columns: Columns of fts_table (to locate column)
+        offset_column: Column with the row's offset in its source document (e.g. char_start)
+
+    Returns:
+        {rowid: Passage} for every row that exists, until the budget runs out
+    """
+    if not rowids:
+        return {}
+
+    matched: Dict[int, Tuple[str, List[Tuple[int, int]]]] = {}
+    if fts_table and fts_columns and column in fts_columns:
+        matched = _fts_matches(conn, fts_table, fts_columns, column, rowids, queries)
+
+    # Plain text for unmatched rows, plus source offsets for all rows
+    select_cols = ['rowid', column, offset_column or 'NULL']
+    placeholders = ','.join('?' * len(rowids))
+    rows = {
+        row[0]: row for row in conn.execute(f"""
+            SELECT {', '.join(select_cols)}
+            FROM {table}
+            WHERE rowid IN ({placeholders})
+        """, tuple(rowids)).fetchall()
+    }
+
+    passages: Dict[int, Passage] = {}
+    remaining_chars = token_budget * CHARS_PER_TOKEN
+    present = [rowid for rowid in rowids if rowid in rows]
+
+    for i, rowid in enumerate(present):
+        _, plain, source_start = rows[rowid]
+        text, spans = matched.get(rowid, (plain or '', []))
+
+        floor = MIN_PASSAGE_TOKENS * CHARS_PER_TOKEN
+        share = min(remaining_chars, max(floor, remaining_chars // (len(present) - i)))
+        # The top row takes whatever is left; later rows only a useful passage
+        if share <= 0 or (i and share < min(floor, len(text))):
+            break
+        start, end = select_window(text, spans, share)
+
+        passages[rowid] = Passage(
+            rowid=rowid,
+            text=text[start:end],
+            start=start,
+            end=end,
+            length=len(text),
+            matches=[(s - start, e - start) for s, e in spans if s >= start and e <= end],
+            source_start=source_start
+        )
+        remaining_chars -= passages[rowid].tokens * CHARS_PER_TOKEN
+
+    return passages
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Query Cache Module
+
+Persistent LRU/TTL cache of ranked search results for one knowledge database.
+
+Entries live in a side database next to the knowledge database
+(database/query_cache.db), so caching never changes the file it describes.
+Each entry is keyed on:
+1. The normalized query text
+2. The search mode (e.g. 'universal:hybrid:all-MiniLM-L6-v2:bia_sections')
+3. A content fingerprint of the knowledge database
+
+Values are ranked result IDs only; callers re-read the rows they need.
+Any write to the knowledge database (extraction, loaders, embedding refresh)
+changes its fingerprint, so stale entries simply stop matching and are purged
+the next time a result is stored.
+
+A hit is a read only: recency and hit counts are buffered in memory and
+written in one batch at most every TOUCH_FLUSH_SECONDS, before each store
+(so eviction sees them) and on close.
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOUCH_FLUSH_SECONDS = 60.0  # longest a hit's last_used update waits in memory
+
+# FTS5 operators are case-sensitive and must survive normalization
+FTS_OPERATORS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace, keeping FTS5 operators intact."""
+    return ' '.join(
+        word if word in FTS_OPERATORS else word.lower()
+        for word in query.split()
+    )
+
+
+class QueryCache:
+    """
+    On-disk LRU cache with time-to-live for ranked result IDs.
+
+    Hit/miss counters cover the current process.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path,
+        max_entries: int = 5000,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        """
+        Initialize query cache.
+
+        Args:
+            cache_path: Side database file holding the cache
+            max_entries: Entries kept before least-recently-used eviction
+            ttl_seconds: Maximum age of an entry
+        """
+        self.cache_path = Path(cache_path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._touched: Dict[str, List] = {}  # cache_key -> [last_used, hits] not yet written
+        self._last_flush = time.time()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                cache_key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                query TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hit_count INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_query_cache_last_used ON query_cache(last_used);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(fingerprint: str, mode: str, query: str) -> str:
+        """Stable cache key for (fingerprint, mode, normalized query)."""
+        raw = f"{fingerprint}\x1f{mode}\x1f{normalize_query(query)}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, fingerprint: str, mode: str, query: str) -> Optional[Any]:
+        """
+        Look up cached result IDs.
+
+        Args:
+            fingerprint: Current knowledge database fingerprint
+            mode: Search mode
+            query: Query text (normalized here)
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        key = self.make_key(fingerprint, mode, query)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json FROM query_cache WHERE cache_key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            touch = self._touched.setdefault(key, [now, 0])
+            touch[0] = now
+            touch[1] += 1
+            if now - self._last_flush >= TOUCH_FLUSH_SECONDS:
+                self._flush_touches()
+                self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def _flush_touches(self):
+        """Write buffered hits (caller holds the lock and commits)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE query_cache SET last_used = MAX(last_used, ?), hit_count = hit_count + ? WHERE cache_key = ?",
+                [(last_used, hits, key) for key, (last_used, hits) in self._touched.items()]
+            )
+            self._touched.clear()
+        self._last_flush = time.time()
+
+    def put(self, fingerprint: str, mode: str, query: str, value: Any):
+        """
+        Store result IDs, evicting stale and least-recently-used entries.
+
+        Args:
+            fingerprint: Knowledge database fingerprint the value was computed against
+            mode: Search mode
+            query: Query text (normalized here)
+            value: JSON-serializable ranked result IDs
+        """
+        key = self.make_key(fingerprint, mode, query)
+        now = time.time()
+
+        with self._lock:
+            self._flush_touches()
+
+            # Database changed since the last store: drop everything computed against old data
+            if fingerprint != self._fingerprint:
+                self._conn.execute("DELETE FROM query_cache WHERE fingerprint != ?", (fingerprint,))
+                self._fingerprint = fingerprint
+
+            self._conn.execute("""
+                INSERT OR REPLACE INTO query_cache
+                (cache_key, fingerprint, mode, query, result_json, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (key, fingerprint, mode, normalize_query(query), json.dumps(value), now, now))
+
+            self._conn.execute("""
+                DELETE FROM query_cache WHERE cache_key IN (
+                    SELECT cache_key FROM query_cache
+                    ORDER BY last_used DESC
+                    LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM query_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus the current entry count."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
+
+    def close(self):
+        """Write buffered hits and close the side database."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Query Engine Module
+
+Process-wide search state for the MCP server. Keeps the embedder (see
+embedders.py; KB_EMBEDDER selects the backend), pooled read-only SQLite
+connections (see connections.py) and discovered table metadata resident
+between tool calls, so each question only pays for the SQL it actually runs.
+
+The model is loaded on a background thread when the server starts; until it
+is ready, searches fall back to FTS5-only and report the engine as warming up.
+"""
+
+import sqlite3
+import hashlib
+import threading
+import logging
+import numpy as np
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Tuple
+
+from database.vector_store import VectorStore, build_vector_store, source_fingerprint
+from database.schema_catalog import SchemaCatalog
+from database.query_cache import QueryCache
+from database.embedding_cache import EmbeddingCache, shared_embedding_cache, close_shared_embedding_caches
+from database.embedders import get_embedder, resolve_embedder_name
+from database.connections import read_connection, close_read_pools
+from database import search_legs
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEngine:
+    """
+    Resident query engine shared by all tool calls.
+
+    Holds:
+    1. The embedder (loaded once, in the background)
+    2. A pool of tuned read-only SQLite connections per database
+    3. A schema catalog per database, rebuilt only when the schema changes
+    4. Memory-mapped vector stores for content tables
+    5. A persistent query-result cache per database
+    6. The shared query-embedding cache per database
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        """
+        Initialize query engine.
+
+        Args:
+            model_name: Embedder to keep resident (defaults to KB_EMBEDDER,
+                then all-MiniLM-L6-v2; 'hashing' needs no download)
+        """
+        self.model_name = resolve_embedder_name(model_name)
+        self.model = None
+        self.model_error: Optional[str] = None
+
+        self._warmup_done = threading.Event()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        self._catalogs: Dict[str, SchemaCatalog] = {}
+        self._file_stamps: Dict[str, Tuple] = {}
+        self._vector_stores: Dict[Tuple[str, str], Optional[VectorStore]] = {}
+        self._query_caches: Dict[str, QueryCache] = {}
+
+    # ------------------------------------------------------------------
+    # Model lifecycle
+    # ------------------------------------------------------------------
+
+    def start_warmup(self):
+        """Load the embedding model on a background thread."""
+        if self._warmup_thread is not None:
+            return
+
+        self._warmup_thread = threading.Thread(
+            target=self._warm_up,
+            name="query-engine-warmup",
+            daemon=True
+        )
+        self._warmup_thread.start()
+
+    def _warm_up(self):
+        """Load the embedder and run one encode so the first query is not cold."""
+        try:
+            model = get_embedder(self.model_name)
+            model.encode(["warmup"])
+            self.model = model
+            logger.info(f"Query engine warm ({model.name}, {model.dim} dimensions)")
+        except ImportError as e:
+            self.model_error = str(e)
+            logger.warning(f"Embedder {self.model_name} unavailable, using FTS5 only: {e}")
+        except Exception as e:
+            # No network for the download, corrupt model files, ... - report the cause
+            self.model_error = f"{type(e).__name__}: {e} (set KB_EMBEDDER=hashing for the offline embedder)"
+            logger.error(f"Failed to load embedder {self.model_name}, using FTS5 only: {self.model_error}")
+        finally:
+            self._warmup_done.set()
+
+    @property
+    def is_warm(self) -> bool:
+        """True once the embedding model is loaded and ready."""
+        return self._warmup_done.is_set() and self.model is not None
+
+    def wait_until_warm(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until warmup finishes (or timeout expires).
+
+        Returns:
+            True if the model is loaded
+        """
+        if self._warmup_thread is None:
+            self.start_warmup()
+        self._warmup_done.wait(timeout)
+        return self.is_warm
+
+    def status(self) -> str:
+        """Human-readable engine state for tool responses."""
+        if self.is_warm:
+            return f"warm (hybrid FTS5 + vector search, {self.model_name})"
+        if self._warmup_done.is_set():
+            return f"FTS5 only (embedder {self.model_name} unavailable: {self.model_error})"
+        return "warming up (FTS5 only until model is loaded)"
+
+    def encode_queries(self, db_path: Path, texts: List[str]) -> np.ndarray:
+        """
+        Embed query strings through the database's embedding cache.
+
+        Only strings never seen before (in this or any earlier process)
+        reach the model. Requires the engine to be warm.
+
+        Args:
+            db_path: Database whose embedding cache to use
+            texts: Query strings
+
+        Returns:
+            float32 matrix (len(texts) x dim)
+        """
+        if not self.is_warm:
+            raise RuntimeError("Embedding model not loaded")
+
+        return self.get_embedding_cache(db_path).encode(texts, self.model_name, self.model.encode)
+
+    def get_embedding_cache(self, db_path: Path) -> EmbeddingCache:
+        """Process-wide query-embedding cache for a database (shared with HybridSearcher)."""
+        return shared_embedding_cache(db_path)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def connection(self, db_path: Path) -> ContextManager[sqlite3.Connection]:
+        """
+        Borrow a pooled read-only connection to a database.
+
+        Usage: `with engine.connection(db_path) as conn: ...`
+
+        Args:
+            db_path: Path to SQLite database
+
+        Returns:
+            Context manager yielding a sqlite3 connection (do not close it)
+        """
+        return read_connection(db_path)
+
+    def invalidate(self, db_path: Optional[Path] = None):
+        """
+        Forget cached catalog and vector stores for a database.
+
+        Call after anything that changes the schema, e.g. extraction.
+        Pooled connections stay open - SQLite picks up schema changes itself.
+
+        Args:
+            db_path: Database to invalidate (all databases if None)
+        """
+        with self._lock:
+            if db_path is None:
+                keys = set(self._catalogs) | {key for key, _ in self._vector_stores}
+            else:
+                keys = [str(Path(db_path).resolve())]
+
+            for key in keys:
+                self._catalogs.pop(key, None)
+                self._file_stamps.pop(key, None)
+                self._drop_vector_stores(key)
+
+    def _drop_vector_stores(self, key: str):
+        """Forget loaded vector stores for a database (reloaded on next use)."""
+        self._vector_stores = {
+            k: v for k, v in self._vector_stores.items() if k[0] != key
+        }
+
+    def close(self):
+        """Close pooled connections, query and embedding caches and vector-leg threads (at shutdown)."""
+        self.invalidate()
+        close_read_pools()
+        search_legs.shutdown()
+        close_shared_embedding_caches()
+
+        with self._lock:
+            for cache in self._query_caches.values():
+                cache.close()
+            self._query_caches = {}
+
+    # ------------------------------------------------------------------
+    # Schema catalog
+    # ------------------------------------------------------------------
+
+    def get_catalog(self, db_path: Path) -> SchemaCatalog:
+        """
+        Get the schema catalog for a database.
+
+        The catalog is reused while the database file (and its WAL) is
+        untouched. If the files changed, PRAGMA schema_version decides
+        whether the schema itself changed and the catalog must be rebuilt.
+
+        Args:
+            db_path: Path to project database
+
+        Returns:
+            SchemaCatalog
+        """
+        key = str(Path(db_path).resolve())
+
+        with self._lock:
+            catalog = self._catalogs.get(key)
+            stamp = _file_stamp(key)
+
+            if catalog is not None and self._file_stamps.get(key) == stamp:
+                return catalog
+
+            with self.connection(key) as conn:
+                # Data changed: vector stores may be out of date
+                if catalog is not None:
+                    self._drop_vector_stores(key)
+                    schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+                    if schema_version == catalog.schema_version:
+                        self._file_stamps[key] = stamp
+                        return catalog
+
+                catalog = SchemaCatalog.discover(conn)
+
+            self._catalogs[key] = catalog
+            self._file_stamps[key] = stamp
+            return catalog
+
+    # ------------------------------------------------------------------
+    # Query-result cache
+    # ------------------------------------------------------------------
+
+    def fingerprint(self, db_path: Path) -> str:
+        """
+        Content fingerprint of a database.
+
+        Derived from the (mtime, size) of the database file and its WAL, so
+        any committed write - from this process or another - changes it.
+        """
+        stamp = _file_stamp(str(Path(db_path).resolve()))
+        return hashlib.sha1(repr(stamp).encode('utf-8')).hexdigest()
+
+    def get_query_cache(self, db_path: Path) -> QueryCache:
+        """
+        Get the persistent query-result cache for a database.
+
+        Stored as database/query_cache.db next to the knowledge database and
+        kept open across invalidations so hit/miss counters survive.
+        """
+        key = str(Path(db_path).resolve())
+
+        with self._lock:
+            cache = self._query_caches.get(key)
+            if cache is None:
+                cache = QueryCache(Path(key).parent / "query_cache.db")
+                self._query_caches[key] = cache
+            return cache
+
+    # ------------------------------------------------------------------
+    # Vector stores
+    # ------------------------------------------------------------------
+
+    def get_vector_store(self, db_path: Path, table_name: str) -> Optional[VectorStore]:
+        """
+        Get the memory-mapped vector store for a table.
+
+        Builds the store from the table's embedding table on first use if it
+        is missing or the embedding table has changed since it was built.
+        Stores built by a different embedder than the resident one are skipped.
+
+        Args:
+            db_path: Path to project database
+            table_name: Base table name
+
+        Returns:
+            Loaded VectorStore, or None if the table has no embeddings
+        """
+        key = (str(Path(db_path).resolve()), table_name)
+
+        with self._lock:
+            if key in self._vector_stores:
+                return self._vector_stores[key]
+
+            store = VectorStore(Path(key[0]), table_name)
+            try:
+                if not store.load() or self._store_is_stale(db_path, store):
+                    # Keep the recorded embedder; the embedding table does not store it
+                    build_vector_store(Path(key[0]), table_name, model_name=store.metadata.get("model_name"))
+                    store.load()
+
+                if self.model is not None and not store.compatible_with(self.model.name, self.model.dim):
+                    logger.warning(
+                        f"Vector store for {table_name} was built with "
+                        f"{store.metadata.get('model_name') or 'another embedder'} ({store.dim} dimensions), "
+                        f"not {self.model.name} ({self.model.dim}); re-run embeddings_setup.py with this embedder. "
+                        f"Using FTS5 only for this table"
+                    )
+                    store = None
+            except Exception as e:
+                logger.warning(f"No vector store for {table_name}: {e}")
+                store = None
+
+            self._vector_stores[key] = store
+            return store
+
+    def _store_is_stale(self, db_path: Path, store: VectorStore) -> bool:
+        """Compare the store's recorded source fingerprint with its source embedding table."""
+        source = store.metadata.get("source")
+        if not source:
+            return False
+
+        recorded = store.metadata.get("source_fingerprint")
+        try:
+            with self.connection(db_path) as conn:
+                if recorded is None:
+                    # Built before fingerprints were recorded: row count is all we can compare
+                    count = conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+                    return count != store.metadata.get("rows")
+                return source_fingerprint(conn, source) != recorded
+        except sqlite3.Error:
+            # Source table gone (or sqlite-vec not loaded) - keep what we have
+            return False
+
+
+def _file_stamp(db_path: str) -> Tuple:
+    """(mtime, size) of a database file and its WAL - changes on any write."""
+    stamp = []
+    for path in (Path(db_path), Path(db_path + "-wal")):
+        try:
+            st = path.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Schema Catalog Module
+
+One-pass description of a knowledge database: which content tables, FTS5
+tables and embedding tables exist, and which ID/title columns each content
+table uses. Built from a single sqlite_master + pragma_table_info query so
+searches never have to probe the schema per request.
+
+The catalog records the database's schema_version; callers rebuild it only
+when that changes.
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Atomic entity tables searched alongside the primary content table
+# (table, fts table, text columns)
+ENTITY_TABLES = [
+    ('concepts', 'concepts_fts', ['term', 'definition', 'extraction_text']),
+    ('actors', 'actors_fts', ['role_canonical', 'extraction_text']),
+    ('deadlines', 'deadlines_fts', ['extraction_text']),
+    ('documents', 'documents_fts', ['extraction_text']),
+    ('procedures', 'procedures_fts', ['extraction_text']),
+    ('consequences', 'consequences_fts', ['extraction_text']),
+    ('statutory_references', 'statutory_references_fts', ['extraction_text'])
+]
+
+# Columns that mark a table as hierarchical structured content
+CONTENT_ID_COLUMNS = ['section_number', 'content_id', 'chapter_id']
+
+
+@dataclass
+class ContentTable:
+    """A structured content table and its companion indexes."""
+    name: str
+    id_col: str
+    title_col: Optional[str] = None
+    fts_table: Optional[str] = None
+    emb_table: Optional[str] = None
+    vec_table: Optional[str] = None
+
+
+@dataclass
+class SchemaCatalog:
+    """Discovered schema for one database."""
+    schema_version: int
+    columns: Dict[str, List[str]] = field(default_factory=dict)
+    virtual_tables: Dict[str, str] = field(default_factory=dict)  # name -> module
+    content_tables: Dict[str, ContentTable] = field(default_factory=dict)
+    entity_tables: List[Tuple[str, str, List[str]]] = field(default_factory=list)
+
+    def has_table(self, name: str) -> bool:
+        """Check if a table (regular or virtual) exists."""
+        return name in self.columns
+
+    @property
+    def fts_tables(self) -> List[str]:
+        """All FTS5 virtual tables."""
+        return [name for name, module in self.virtual_tables.items() if module == 'fts5']
+
+    @property
+    def has_relationships_fts(self) -> bool:
+        return 'relationships_fts' in self.virtual_tables
+
+    @property
+    def has_search_documents(self) -> bool:
+        """True if entities are searchable through the unified search_documents index."""
+        return 'search_documents' in self.columns and self.virtual_tables.get('search_documents_fts') == 'fts5'
+
+    def primary_content_table(self, domain_config: Dict) -> Optional[ContentTable]:
+        """
+        Pick the primary structured content table.
+
+        Args:
+            domain_config: Domain terminology configuration
+
+        Returns:
+            ContentTable or None if the database has no structured content
+        """
+        # 1. Try explicit config first
+        explicit_table = domain_config.get('primary_content_table')
+        if explicit_table and explicit_table in self.content_tables:
+            return self.content_tables[explicit_table]
+
+        if explicit_table and self.has_table(explicit_table):
+            return self._describe(explicit_table)
+
+        # 2. Fallback: first table with full_text + an ID column
+        return next(iter(self.content_tables.values()), None)
+
+    def _describe(self, table: str) -> ContentTable:
+        """Build a ContentTable entry for any table."""
+        columns = set(self.columns.get(table, []))
+
+        id_col = (
+            'section_number' if 'section_number' in columns
+            else 'content_id' if 'content_id' in columns
+            else 'id'
+        )
+        title_col = (
+            'section_title' if 'section_title' in columns
+            else 'title' if 'title' in columns
+            else None
+        )
+
+        return ContentTable(
+            name=table,
+            id_col=id_col,
+            title_col=title_col,
+            fts_table=f"{table}_fts" if self.virtual_tables.get(f"{table}_fts") == 'fts5' else None,
+            emb_table=f"{table}_embeddings" if self.has_table(f"{table}_embeddings") else None,
+            vec_table=f"{table}_vec" if self.has_table(f"{table}_vec") else None
+        )
+
+    @classmethod
+    def discover(cls, conn: sqlite3.Connection) -> 'SchemaCatalog':
+        """
+        Read the whole schema in two queries (tables, then their columns).
+
+        Columns of virtual tables other than FTS5 are not read: table_info
+        on a vec0 table fails unless sqlite-vec is loaded on the connection.
+
+        Args:
+            conn: Open connection to the database
+
+        Returns:
+            SchemaCatalog
+        """
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+
+        catalog = cls(schema_version=schema_version)
+
+        readable = []
+        for table, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY rowid"
+        ):
+            catalog.columns[table] = []
+            module = _virtual_table_module(sql)
+            if module:
+                catalog.virtual_tables[table] = module
+            if module in (None, 'fts5'):
+                readable.append(table)
+
+        if readable:
+            rows = conn.execute(f"""
+                SELECT m.name, p.name
+                FROM sqlite_master m
+                JOIN pragma_table_info(m.name) p
+                WHERE m.type = 'table' AND m.name IN ({','.join('?' * len(readable))})
+                ORDER BY m.rowid, p.cid
+            """, readable).fetchall()
+
+            for table, column in rows:
+                catalog.columns[table].append(column)
+
+        # Structured content: regular tables with full_text + an ID column
+        for table, columns in catalog.columns.items():
+            if table in catalog.virtual_tables:
+                continue
+            if 'full_text' in columns and any(col in columns for col in CONTENT_ID_COLUMNS):
+                catalog.content_tables[table] = catalog._describe(table)
+
+        catalog.entity_tables = [
+            entry for entry in ENTITY_TABLES
+            if entry[0] in catalog.columns
+            and (catalog.has_search_documents or catalog.virtual_tables.get(entry[1]) == 'fts5')
+        ]
+
+        return catalog
+
+
+def _virtual_table_module(sql: Optional[str]) -> Optional[str]:
+    """Return the module name ('fts5', 'vec0', ...) for a CREATE VIRTUAL TABLE statement."""
+    if not sql or not re.match(r'\s*CREATE\s+VIRTUAL\s+TABLE', sql, re.IGNORECASE):
+        return None
+
+    match = re.search(r'\bUSING\s+(\w+)', sql, re.IGNORECASE)
+    return match.group(1).lower() if match else None
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Search Documents Module
+
+One denormalized search table for every atomic entity type.
+
+Searching study-material entities used to take one FTS5 MATCH per entity
+table (concepts, actors, deadlines, documents, procedures, consequences,
+statutory_references), seven statements per question. Instead, each
+entity row is mirrored into search_documents:
+
+    search_documents(id, entity_type, entity_id, section_number,
+                     section_title, section_context, title, body)
+
+with a single FTS5 index, search_documents_fts(title, body, section_context).
+One ranked statement returns the best entities across all types, and a
+window function caps how many each type contributes (ENTITY_QUOTAS).
+
+Triggers on the entity tables keep search_documents in sync, and triggers
+on search_documents keep the FTS index in sync, so loaders need no changes.
+
+Usage:
+
+    python src/database/search_documents.py projects/insolvency-law/database/knowledge.db
+"""
+
+import sys
+import time
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.connections import enable_wal
+from database.fts_query import bm25_expr, rewrite_citations
+from database.fts_rebuild import PREFIX, TOKENIZE
+from database.schema_catalog import ENTITY_TABLES
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DOCUMENTS = 'search_documents'
+SEARCH_DOCUMENTS_FTS = 'search_documents_fts'
+FTS_COLUMNS = ['title', 'body', 'section_context']
+
+# Entities returned per type (unlisted types: DEFAULT_QUOTA)
+DEFAULT_QUOTA = 3
+ENTITY_QUOTAS: Dict[str, int] = {table: DEFAULT_QUOTA for table, _, _ in ENTITY_TABLES}
+
+# Best-ranked matches the quotas are applied to. A type with no match among
+# them returns nothing; a larger pool costs a content-table join per match.
+CANDIDATES = 50
+
+
+def _document_exprs(prefix: str, text_columns: List[str]) -> Tuple[str, str]:
+    """
+    SQL for an entity row's (title, body).
+
+    The first text column is the title when the entity has a name-like
+    column (concepts.term, actors.role_canonical); the rest form the body.
+    """
+    if len(text_columns) > 1:
+        title = f"{prefix}.{text_columns[0]}"
+        body_columns = text_columns[1:]
+    else:
+        title = 'NULL'
+        body_columns = text_columns
+
+    body = " || ' ' || ".join(f"COALESCE({prefix}.{col}, '')" for col in body_columns)
+    return title, f"trim({body})"
+
+
+def _create_entity_triggers(conn: sqlite3.Connection, table: str, text_columns: List[str]):
+    """Mirror inserts, updates and deletes on an entity table into search_documents."""
+    title, body = _document_exprs('new', text_columns)
+
+    conn.execute(f"""
+        CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {SEARCH_DOCUMENTS}
+                (entity_type, entity_id, section_number, section_title, section_context, title, body)
+            VALUES ('{table}', new.id, new.section_number, new.section_title, new.section_context, {title}, {body});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM {SEARCH_DOCUMENTS} WHERE entity_type = '{table}' AND entity_id = old.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN
+            UPDATE {SEARCH_DOCUMENTS}
+            SET entity_id = new.id,
+                section_number = new.section_number,
+                section_title = new.section_title,
+                section_context = new.section_context,
+                title = {title},
+                body = {body}
+            WHERE entity_type = '{table}' AND entity_id = old.id;
+        END
+    """)
+
+
+def _create_fts_triggers(conn: sqlite3.Connection):
+    """Keep search_documents_fts in sync with search_documents."""
+    columns = ', '.join(FTS_COLUMNS)
+
+    def values(prefix: str) -> str:
+        return ', '.join([f"{prefix}.id"] + [f"{prefix}.{col}" for col in FTS_COLUMNS])
+
+    conn.execute(f"""
+        CREATE TRIGGER {SEARCH_DOCUMENTS_FTS}_ai AFTER INSERT ON {SEARCH_DOCUMENTS} BEGIN
+            INSERT INTO {SEARCH_DOCUMENTS_FTS}(rowid, {columns}) VALUES ({values('new')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {SEARCH_DOCUMENTS_FTS}_ad AFTER DELETE ON {SEARCH_DOCUMENTS} BEGIN
+            INSERT INTO {SEARCH_DOCUMENTS_FTS}({SEARCH_DOCUMENTS_FTS}, rowid, {columns}) VALUES ('delete', {values('old')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {SEARCH_DOCUMENTS_FTS}_au AFTER UPDATE ON {SEARCH_DOCUMENTS} BEGIN
+            INSERT INTO {SEARCH_DOCUMENTS_FTS}({SEARCH_DOCUMENTS_FTS}, rowid, {columns}) VALUES ('delete', {values('old')});
+            INSERT INTO {SEARCH_DOCUMENTS_FTS}(rowid, {columns}) VALUES ({values('new')});
+        END
+    """)
+
+
+def build_search_documents(db_path: Path) -> Dict:
+    """
+    Create (or recreate) search_documents, its FTS index and sync triggers.
+
+    Runs in one transaction: readers keep the previous table (or none)
+    until the commit.
+
+    Args:
+        db_path: Path to the knowledge database
+
+    Returns:
+        Statistics dictionary (documents per entity type)
+    """
+    enable_wal(db_path)
+
+    start = time.time()
+    # Autocommit mode: the transaction is managed explicitly
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+
+    try:
+        existing = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+        entity_tables = [(table, columns) for table, _, columns in ENTITY_TABLES if table in existing]
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (trigger,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND (name LIKE '%\\_search\\_a_' ESCAPE '\\' OR tbl_name = ?)",
+                (SEARCH_DOCUMENTS,)
+            ).fetchall():
+                conn.execute(f"DROP TRIGGER {trigger}")
+            conn.execute(f"DROP TABLE IF EXISTS {SEARCH_DOCUMENTS_FTS}")
+            conn.execute(f"DROP VIEW IF EXISTS {SEARCH_DOCUMENTS_FTS}_source")  # left by fts_rebuild.py
+            conn.execute(f"DROP TABLE IF EXISTS {SEARCH_DOCUMENTS}")
+
+            conn.execute(f"""
+                CREATE TABLE {SEARCH_DOCUMENTS} (
+                    id INTEGER PRIMARY KEY,
+                    entity_type TEXT NOT NULL,
+                    entity_id INTEGER NOT NULL,
+                    section_number TEXT,
+                    section_title TEXT,
+                    section_context TEXT,
+                    title TEXT,
+                    body TEXT,
+                    UNIQUE (entity_type, entity_id)
+                )
+            """)
+            conn.execute(f"CREATE INDEX idx_search_documents_section ON {SEARCH_DOCUMENTS}(section_number)")
+
+            counts = {}
+            for table, text_columns in entity_tables:
+                title, body = _document_exprs(table, text_columns)
+                cursor = conn.execute(f"""
+                    INSERT INTO {SEARCH_DOCUMENTS}
+                        (entity_type, entity_id, section_number, section_title, section_context, title, body)
+                    SELECT '{table}', id, section_number, section_title, section_context, {title}, {body}
+                    FROM {table}
+                """)
+                counts[table] = cursor.rowcount
+                _create_entity_triggers(conn, table, text_columns)
+
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE {SEARCH_DOCUMENTS_FTS} USING fts5(
+                    {', '.join(FTS_COLUMNS)},
+                    content='{SEARCH_DOCUMENTS}',
+                    content_rowid='id',
+                    tokenize="{TOKENIZE}",
+                    prefix='{PREFIX}'
+                )
+            """)
+            conn.execute(f"INSERT INTO {SEARCH_DOCUMENTS_FTS}({SEARCH_DOCUMENTS_FTS}) VALUES('rebuild')")
+            conn.execute(f"INSERT INTO {SEARCH_DOCUMENTS_FTS}({SEARCH_DOCUMENTS_FTS}) VALUES('optimize')")
+            _create_fts_triggers(conn)
+
+            conn.execute("COMMIT")
+
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    finally:
+        conn.close()
+
+    seconds = time.time() - start
+    logger.info(f"Built {SEARCH_DOCUMENTS}: {sum(counts.values())} documents in {seconds:.2f}s")
+
+    return {
+        'documents': sum(counts.values()),
+        'by_type': counts,
+        'seconds': seconds
+    }
+
+
+def _quota_expr(quotas: Dict[str, int]) -> str:
+    """CASE expression giving each entity type's quota (types are known table names)."""
+    cases = ' '.join(f"WHEN '{entity_type}' THEN {int(quota)}" for entity_type, quota in quotas.items())
+    return f"CASE entity_type {cases} ELSE {DEFAULT_QUOTA} END"
+
+
+def ranked_entities(
+    cursor: sqlite3.Cursor,
+    fts_columns: Optional[Sequence[str]],
+    query: str,
+    quotas: Optional[Dict[str, int]] = None,
+    limit: Optional[int] = None,
+    candidates: int = CANDIDATES
+) -> List[Tuple[str, int]]:
+    """
+    Best entities of every type for a query, in one ranked statement.
+
+    Args:
+        cursor: Database cursor
+        fts_columns: Columns of search_documents_fts (for bm25 weights and citations)
+        query: MATCH string
+        quotas: Maximum entities per type (default: ENTITY_QUOTAS)
+        limit: Maximum entities overall (default: sum of quotas)
+        candidates: Best-ranked matches the quotas are applied to
+
+    Returns:
+        List of (entity_type, entity_id), best first
+    """
+    quotas = quotas or ENTITY_QUOTAS
+    if limit is None:
+        limit = sum(quotas.values())
+
+    bm25 = bm25_expr(SEARCH_DOCUMENTS_FTS, fts_columns)
+
+    cursor.execute(f"""
+        SELECT entity_type, entity_id
+        FROM (
+            SELECT d.entity_type, d.entity_id, m.score,
+                   ROW_NUMBER() OVER (PARTITION BY d.entity_type ORDER BY m.score) AS type_rank
+            FROM (
+                SELECT rowid, {bm25} AS score
+                FROM {SEARCH_DOCUMENTS_FTS}
+                WHERE {SEARCH_DOCUMENTS_FTS} MATCH ?1
+                ORDER BY score
+                LIMIT ?3
+            ) m
+            JOIN {SEARCH_DOCUMENTS} d ON d.id = m.rowid
+        )
+        WHERE type_rank <= {_quota_expr(quotas)}
+        ORDER BY score
+        LIMIT ?2
+    """, (rewrite_citations(query, fts_columns), limit, max(candidates, limit)))
+
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def section_entities(
+    cursor: sqlite3.Cursor,
+    sections: Sequence[str],
+    quotas: Optional[Dict[str, int]] = None
+) -> List[Tuple[str, int]]:
+    """
+    Entities recorded against the given sections, up to each type's quota.
+
+    Args:
+        cursor: Database cursor
+        sections: Section numbers
+        quotas: Maximum entities per type (default: ENTITY_QUOTAS)
+
+    Returns:
+        List of (entity_type, entity_id) in load order
+    """
+    if not sections:
+        return []
+
+    placeholders = ','.join('?' * len(sections))
+    cursor.execute(f"""
+        SELECT entity_type, entity_id
+        FROM (
+            SELECT entity_type, entity_id, id,
+                   ROW_NUMBER() OVER (PARTITION BY entity_type ORDER BY id) AS type_rank
+            FROM {SEARCH_DOCUMENTS}
+            WHERE section_number IN ({placeholders})
+        )
+        WHERE type_rank <= {_quota_expr(quotas or ENTITY_QUOTAS)}
+        ORDER BY id
+    """, tuple(sections))
+
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Usage: python search_documents.py <database_path>")
+        print("\nExample:")
+        print("  python search_documents.py projects/insolvency-law/database/knowledge.db")
+        sys.exit(1)
+
+    db_path = Path(sys.argv[1])
+    if not db_path.exists():
+        print(f"Error: Database not found: {db_path}")
+        sys.exit(1)
+
+    stats = build_search_documents(db_path)
+
+    print(f"\n✅ {SEARCH_DOCUMENTS}: {stats['documents']} documents in {stats['seconds']:.2f}s")
+    for entity_type, count in stats['by_type'].items():
+        print(f"   {entity_type}: {count}")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Search Legs Module
+
+Runs the semantic leg of a hybrid search next to the lexical leg, under a
+latency budget.
+
+Hybrid search has two independent legs: FTS5 ranking (SQLite) and vector
+retrieval (query encoding plus a NumPy matrix product). Both spend most of
+their time outside the GIL, so the vector leg runs on a worker thread while
+the caller ranks with FTS5 on its own connection.
+
+The caller then waits for the vector leg only until the request's deadline.
+If it is late (cold encoder, loaded machine), the search answers with its
+FTS5 ranking and marks the result degraded. The late leg still finishes in
+the background, so its query embeddings land in the embedding cache for
+the next request. A leg that fails (e.g. an encoder error) degrades the
+result the same way, with its own reason.
+
+KB_LATENCY_BUDGET_MS sets the default budget (0 = wait for the vector leg).
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUDGET_MS = 1000
+VECTOR_LEG_WORKERS = 2
+
+# Degraded reason of a vector leg that missed its deadline (failures report the exception)
+MISSED_BUDGET = "missed the latency budget"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def default_latency_budget_ms() -> float:
+    """Default budget from KB_LATENCY_BUDGET_MS (0 = no deadline)."""
+    return float(os.environ.get('KB_LATENCY_BUDGET_MS', DEFAULT_LATENCY_BUDGET_MS))
+
+
+def _vector_executor() -> ThreadPoolExecutor:
+    """Process-wide worker threads for vector legs."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=VECTOR_LEG_WORKERS, thread_name_prefix="vector-leg")
+        return _executor
+
+
+class Deadline:
+    """Wall-clock deadline of one search request."""
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        """
+        Start the clock.
+
+        Args:
+            budget_ms: Milliseconds the request may take (None = default_latency_budget_ms(),
+                0 or less = no deadline)
+        """
+        if budget_ms is None:
+            budget_ms = default_latency_budget_ms()
+        self.budget_ms: Optional[float] = budget_ms if budget_ms > 0 else None
+        self.started = time.perf_counter()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.budget_ms is None:
+            return None
+        return max(0.0, self.budget_ms / 1000 - (time.perf_counter() - self.started))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_vector_leg(fn: Callable[..., Any], *args) -> Future:
+    """
+    Run a vector leg on a worker thread.
+
+    Args:
+        fn: Blocking callable (encode + vector search)
+        *args: Arguments for fn
+
+    Returns:
+        Future with fn's result
+    """
+    return _vector_executor().submit(fn, *args)
+
+
+def await_vector_leg(future: Future, deadline: Deadline) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Wait for a vector leg until the deadline.
+
+    Args:
+        future: From start_vector_leg()
+        deadline: Request deadline
+
+    Returns:
+        (result, degraded) - degraded is None if the leg finished in time;
+        otherwise result is None and degraded says why: MISSED_BUDGET, or
+        "failed (<exception>)"
+    """
+    try:
+        return future.result(timeout=deadline.remaining()), None
+    except FutureTimeout:
+        logger.warning(
+            f"Vector leg missed the {deadline.budget_ms:.0f} ms budget; answering with FTS5 only"
+        )
+        return None, MISSED_BUDGET
+    except Exception as e:
+        logger.error(f"Vector leg failed, answering with FTS5 only: {type(e).__name__}: {e}")
+        return None, f"failed ({type(e).__name__}: {e})"
+
+
+def shutdown():
+    """Stop the worker threads (running legs are abandoned)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
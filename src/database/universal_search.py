@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Universal Search Module
+
+Domain-agnostic content search used by the MCP server and batch tools.
+
+Searches the project's primary structured content table (hybrid FTS5 +
+vector search with RRF when the query engine is warm, FTS5 only otherwise),
+then relationships and the atomic entity tables (one ranked statement over
+search_documents when the database has it, see database.search_documents).
+
+Searching is split in two: ranking produces result IDs (cached per query in
+the engine's persistent query cache) and hydration reads the rows back.
+
+Queries that cite a section ("What does section 158 require?") skip ranking:
+the section and its entity rows are read by indexed section-number lookup.
+Every result reports the path taken (SearchResult.path).
+
+A single question is a batch of one: search_batch() encodes every query in
+one model call and scores them against the vector store with one
+matrix-matrix product, then runs the SQL legs over one pooled read-only
+connection.
+
+The vector leg runs on a worker thread while FTS5 ranks (see
+database.search_legs). If it misses the request's latency budget or
+fails, the results are FTS5-only and SearchResult.degraded says why.
+
+A query whose search fails gets empty results and SearchResult.error;
+the rest of the batch is unaffected.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from database.query_engine import QueryEngine
+from database.schema_catalog import ContentTable, SchemaCatalog
+from database.passages import build_passages
+from database.hydration import hydrate_by_key, hydrate_rows
+from database.fts_query import ranked_match
+from database.search_documents import SEARCH_DOCUMENTS_FTS, ranked_entities, section_entities
+from database.search_legs import Deadline, await_vector_leg, start_vector_leg
+from utils.citations import find_section_references
+
+logger = logging.getLogger(__name__)
+
+# Words dropped when building the fallback OR query
+STOP_WORDS = {'by', 'the', 'a', 'an', 'to', 'of', 'in', 'for', 'on', 'at', 'from', 'is', 'are', 'was'}
+
+RRF_K = 60  # Reciprocal Rank Fusion constant
+
+TOP_CONTENT = 5   # structured results returned per query
+FTS_POOL = 20     # FTS5 candidates fused with the vector leg
+
+# Search paths reported with each result
+SECTION_LOOKUP = 'section_lookup'  # query cited a section: indexed ID lookup, no search
+HYBRID = 'hybrid'                  # FTS5 + vector search fused with RRF
+FTS = 'fts'                        # FTS5 only (engine cold or no embeddings)
+
+
+class SearchResult(tuple):
+    """
+    (structured_results, relationship_results) for one query.
+
+    Unpacks like a plain pair; .path says which search path produced it,
+    .degraded why the vector leg was dropped (missed its deadline, or
+    failed; None if it was not),
+    .error why the search failed (None if it did not).
+    """
+
+    def __new__(
+        cls,
+        structured_results: List[Dict],
+        relationship_results: List[Dict],
+        path: str = FTS,
+        degraded: Optional[str] = None,
+        error: Optional[str] = None
+    ):
+        result = super().__new__(cls, (structured_results, relationship_results))
+        result.path = path
+        result.degraded = degraded
+        result.error = error
+        return result
+
+
+def fallback_queries(query: str) -> List[str]:
+    """Original query first, then an OR query over its key terms."""
+    search_queries = [query]
+    key_terms = [w for w in query.split() if w.lower() not in STOP_WORDS and len(w) > 2]
+    if key_terms:
+        search_queries.append(' OR '.join(key_terms))
+    return search_queries
+
+
+def search_content_universal(
+    engine: QueryEngine,
+    db_path: Path,
+    query: str,
+    domain_config: Dict,
+    token_budget: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None
+) -> SearchResult:
+    """
+    Universal content search that adapts to any domain.
+
+    Returns:
+        SearchResult - (structured_results, relationship_results) with .path
+    """
+    return search_batch(engine, db_path, [query], domain_config, token_budget, latency_budget_ms)[0]
+
+
+def search_batch(
+    engine: QueryEngine,
+    db_path: Path,
+    queries: List[str],
+    domain_config: Dict,
+    token_budget: Optional[int] = None,
+    latency_budget_ms: Optional[float] = None
+) -> List[SearchResult]:
+    """
+    Run many searches against one database.
+
+    Ranked result IDs are looked up in the engine's persistent query cache
+    first. The remaining queries are embedded in one encode call (strings
+    seen before come from the embedding cache) and scored
+    against the packed vector store with a single matrix-matrix product,
+    on a worker thread; meanwhile the FTS5 legs run here, on one pooled
+    read-only connection with the cached schema catalog.
+
+    Args:
+        engine: Resident query engine
+        db_path: Path to project database
+        queries: Search strings
+        domain_config: Domain terminology configuration
+        token_budget: If set, each structured result gets a 'passage'
+            (best-matching window of its full_text; see database.passages),
+            all of one query's passages together within this many tokens
+        latency_budget_ms: Time the vector leg may take from the start of the
+            call (None = KB_LATENCY_BUDGET_MS, 0 = wait for it). Queries whose
+            vector leg is late or fails get FTS5-only results, flagged
+            degraded (with the reason) and not cached.
+
+    Returns:
+        One SearchResult ((structured_results, relationship_results) with .path) per query
+    """
+    if not queries:
+        return []
+
+    deadline = Deadline(latency_budget_ms)
+
+    model = engine.model if engine.is_warm else None
+
+    catalog = engine.get_catalog(db_path)
+    content = catalog.primary_content_table(domain_config)
+
+    store = None
+    if model is not None and content and content.fts_table and (content.emb_table or content.vec_table):
+        store = engine.get_vector_store(db_path, content.name)
+
+    # Hybrid rankings depend on the embedder, so it is part of the cache mode
+    leg = f"hybrid:{engine.model_name}" if store is not None else 'fts'
+    mode = f"universal:{leg}:{content.name if content else '-'}"
+    cache = engine.get_query_cache(db_path)
+    fingerprint = engine.fingerprint(db_path)
+
+    ranked: List[Optional[Dict]] = [None] * len(queries)
+    paths = [HYBRID if store is not None else FTS] * len(queries)
+    degraded: List[Optional[str]] = [None] * len(queries)
+    errors: List[Optional[str]] = [None] * len(queries)
+
+    with engine.connection(db_path) as conn:
+        cursor = conn.cursor()
+
+        # Fast path: queries citing a section resolve by indexed section lookup
+        if content:
+            for i, query in enumerate(queries):
+                ranked[i] = _lookup_sections(cursor, catalog, content, find_section_references(query))
+                if ranked[i] is not None:
+                    paths[i] = SECTION_LOOKUP
+
+        for i, query in enumerate(queries):
+            if ranked[i] is None:
+                ranked[i] = cache.get(fingerprint, mode, query)
+        misses = [i for i, entry in enumerate(ranked) if entry is None]
+
+        if misses:
+            # Vector leg for every uncached query at once, on a worker thread
+            vector_leg = None
+            if store is not None:
+                vector_leg = start_vector_leg(
+                    _vector_leg, engine, db_path, store, [queries[i] for i in misses]
+                )
+
+            # Lexical legs here, meanwhile (a failing query fails alone)
+            for i in misses:
+                try:
+                    ranked[i] = _rank_one(
+                        cursor, catalog, content, queries[i],
+                        FTS_POOL if vector_leg is not None else TOP_CONTENT
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"Search failed for {queries[i]!r}: {e}")
+                    ranked[i] = {'content': [], 'relationships': [], 'entities': []}
+                    errors[i] = str(e)
+
+            vec_tops = None
+            if vector_leg is not None:
+                vec_tops, reason = await_vector_leg(vector_leg, deadline)
+                if reason:
+                    for i in misses:
+                        paths[i] = FTS
+                        degraded[i] = reason
+
+            for j, i in enumerate(misses):
+                if errors[i] is not None:
+                    continue
+                if vec_tops is not None:
+                    ranked[i]['content'] = _fuse(ranked[i]['content'], vec_tops[j])
+                else:
+                    ranked[i]['content'] = ranked[i]['content'][:TOP_CONTENT]
+                # Degraded rankings are not what this mode promises; rank again next time
+                if not degraded[i]:
+                    cache.put(fingerprint, mode, queries[i], ranked[i])
+
+        results = [
+            SearchResult(*_hydrate(cursor, catalog, content, entry), path=path, degraded=reason, error=error)
+            for entry, path, reason, error in zip(ranked, paths, degraded, errors)
+        ]
+
+        if token_budget is not None and content:
+            for query, (structured_results, _) in zip(queries, results):
+                _attach_passages(conn, catalog, content, query, structured_results, token_budget)
+
+        return results
+
+
+def _lookup_sections(
+    cursor,
+    catalog: SchemaCatalog,
+    content: ContentTable,
+    sections: List[str]
+) -> Optional[Dict[str, List]]:
+    """
+    Resolve cited sections by indexed ID lookup, with entity rows from the same sections.
+
+    Returns:
+        Ranked entry like _rank_one() (cited order), or None if no cited section exists
+    """
+    if not sections:
+        return None
+
+    placeholders = ','.join('?' * len(sections))
+    cursor.execute(f"""
+        SELECT rowid, {content.id_col}
+        FROM {content.name}
+        WHERE {content.id_col} IN ({placeholders})
+    """, sections)
+    found = {str(section): rowid for rowid, section in cursor.fetchall()}
+    if not found:
+        return None
+
+    entities = []
+    if catalog.has_search_documents:
+        entities = [[table_name, entity_id] for table_name, entity_id in section_entities(cursor, sections)]
+    else:
+        for table_name, _, _ in catalog.entity_tables:
+            if 'section_number' not in catalog.columns.get(table_name, []):
+                continue
+            cursor.execute(f"""
+                SELECT id
+                FROM {table_name}
+                WHERE section_number IN ({placeholders})
+                LIMIT 3
+            """, sections)
+            entities.extend([table_name, row[0]] for row in cursor.fetchall())
+
+    return {
+        'content': [found[section] for section in sections if section in found],
+        'relationships': [],
+        'entities': entities
+    }
+
+
+def _vector_leg(engine: QueryEngine, db_path: Path, store, queries: List[str]) -> List[List[int]]:
+    """Embed queries (one encode call) and return each one's vector-ranked rowids."""
+    query_embs = engine.encode_queries(db_path, queries)
+    return [
+        [rowid for rowid, _ in hits]
+        for hits in store.search_many(query_embs, top_k=FTS_POOL)
+    ]
+
+
+def _fuse(fts_results: List[int], vec_top: List[int]) -> List[int]:
+    """Reciprocal Rank Fusion (RRF) of FTS5 and vector ranks, best TOP_CONTENT rowids."""
+    fts_ranks = {rowid: i for i, rowid in enumerate(fts_results)}
+    vec_ranks = {rowid: i for i, rowid in enumerate(vec_top)}
+    all_rows = set(fts_ranks.keys()) | set(vec_ranks.keys())
+
+    rrf_scores = []
+    for rowid in all_rows:
+        fts_score = 1.0 / (RRF_K + fts_ranks[rowid]) if rowid in fts_ranks else 0
+        vec_score = 1.0 / (RRF_K + vec_ranks[rowid]) if rowid in vec_ranks else 0
+        rrf_scores.append((rowid, fts_score + vec_score))
+
+    rrf_scores.sort(key=lambda x: x[1], reverse=True)
+    return [rowid for rowid, _ in rrf_scores[:TOP_CONTENT]]
+
+
+def _rank_one(
+    cursor,
+    catalog: SchemaCatalog,
+    content: Optional[ContentTable],
+    query: str,
+    content_limit: int = TOP_CONTENT
+) -> Dict[str, List]:
+    """
+    Rank one query with FTS5 (the lexical leg).
+
+    Args:
+        content_limit: Structured-content rows to rank (FTS_POOL when the
+            result will be fused with a vector leg)
+
+    Returns:
+        {'content': [rowid, ...], 'relationships': [id, ...],
+         'entities': [[table, id], ...]} - best first, JSON-serializable
+    """
+    ranked = {'content': [], 'relationships': [], 'entities': []}
+
+    # 1. Search primary structured content
+    if content and content.fts_table:
+        # Original query first, OR fallback filling the remaining slots (one statement)
+        ranked['content'] = [
+            rowid for rowid, _ in ranked_match(
+                cursor, content.name, content.fts_table, catalog.columns.get(content.fts_table),
+                fallback_queries(query), content_limit
+            )
+        ]
+
+    # 2. Search relationships (always present)
+    if catalog.has_relationships_fts:
+        ranked['relationships'] = [
+            rel_id for rel_id, _ in ranked_match(
+                cursor, 'relationships', 'relationships_fts', catalog.columns.get('relationships_fts'),
+                [query], 5, key_col='id'
+            )
+        ]
+
+    # 3. Search atomic entity tables (study materials)
+    if catalog.has_search_documents:
+        # Best entities of every type in one statement, per-type quotas applied in SQL
+        ranked['entities'] = [
+            [table_name, entity_id] for table_name, entity_id in ranked_entities(
+                cursor, catalog.columns.get(SEARCH_DOCUMENTS_FTS), query
+            )
+        ]
+    else:
+        for table_name, fts_name, _ in catalog.entity_tables:
+            hits = ranked_match(cursor, table_name, fts_name, catalog.columns.get(fts_name), [query], 3, key_col='id')
+            ranked['entities'].extend([table_name, entity_id] for entity_id, _ in hits)
+
+    return ranked
+
+
+def _attach_passages(
+    conn,
+    catalog: SchemaCatalog,
+    content: ContentTable,
+    query: str,
+    structured_results: List[Dict],
+    token_budget: int
+):
+    """
+    Add each structured result's best-matching passage (highlighting the queries ranking used).
+
+    Results the token budget has no passage for are dropped (lowest ranked first).
+    """
+    passages = build_passages(
+        conn,
+        content.name,
+        'full_text',
+        [result['rowid'] for result in structured_results],
+        fallback_queries(query),
+        token_budget=token_budget,
+        fts_table=content.fts_table,
+        fts_columns=catalog.columns.get(content.fts_table) if content.fts_table else None,
+        offset_column='char_start' if 'char_start' in catalog.columns.get(content.name, []) else None
+    )
+
+    structured_results[:] = [result for result in structured_results if result['rowid'] in passages]
+    for result in structured_results:
+        result['passage'] = passages[result['rowid']]
+
+
+def _hydrate(
+    cursor,
+    catalog: SchemaCatalog,
+    content: Optional[ContentTable],
+    ranked: Dict[str, List]
+) -> Tuple[List[Dict], List[Dict]]:
+    """Read result rows for ranked IDs (one query per table), preserving rank order."""
+    structured_results = []
+    relationship_results = []
+
+    if content and ranked['content']:
+        content_table = content.name
+
+        select_cols = [content.id_col, 'full_text']
+        if content.title_col:
+            select_cols.insert(1, content.title_col)
+
+        for row in hydrate_rows(cursor, content_table, ranked['content'], select_cols):
+            structured_results.append({
+                'rowid': row['rowid'],
+                'id': row[content.id_col],
+                'title': row[content.title_col] if content.title_col else '',
+                'full_text': row['full_text'],
+                'table': content_table
+            })
+
+    for row in hydrate_rows(
+        cursor, 'relationships', ranked['relationships'],
+        ['relationship_text', 'relationship_type'], key_col='id'
+    ):
+        relationship_results.append({
+            'text': row['relationship_text'],
+            'type': row['relationship_type']
+        })
+
+    entity_columns = {table_name: columns for table_name, _, columns in catalog.entity_tables}
+
+    # One query per entity table, then back to rank order
+    ids_by_table: Dict[str, List[int]] = {}
+    for table_name, entity_id in ranked['entities']:
+        if table_name in entity_columns:
+            ids_by_table.setdefault(table_name, []).append(entity_id)
+
+    entity_rows = {
+        table_name: hydrate_by_key(
+            cursor, table_name, ids,
+            [f"COALESCE({col}, '') AS {col}" for col in entity_columns[table_name]]
+            + ['section_number', 'section_title'],
+            key_col='id'
+        )
+        for table_name, ids in ids_by_table.items()
+    }
+
+    for table_name, entity_id in ranked['entities']:
+        row = entity_rows.get(table_name, {}).get(entity_id)
+        if not row:
+            continue
+
+        # Combine all text fields
+        text_parts = [str(row[col]) for col in entity_columns[table_name] if row[col]]
+        section_ref = row['section_number'] if row['section_number'] else ""
+        section_title = row['section_title'] if row['section_title'] else ""
+
+        combined_text = " | ".join(text_parts)
+        if section_ref:
+            combined_text += f" [Study Materials §{section_ref}]"
+        if section_title:
+            combined_text += f" ({section_title})"
+
+        relationship_results.append({
+            'text': combined_text,
+            'type': table_name.replace('_', ' ').title()
+        })
+
+    return (structured_results, relationship_results)
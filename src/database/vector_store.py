@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Vector Store Module
+
+Packed float32 embedding matrix per content table, stored next to the
+database as a memory-mapped .npy file.
+
+Rows are L2-normalized once at build time, so a query is scored with one
+matrix-vector product and top-k is selected with argpartition - no JSON
+parsing or per-row Python work at query time.
+
+Migrates from the two existing embedding layouts:
+1. {table}_embeddings - (section_number, embedding_json) JSON rows
+2. {table}_vec        - sqlite-vec tables written by EmbeddingsManager
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VectorStore:
+    """
+    Packed, pre-normalized vectors for one table, keyed by rowid.
+
+    Files (in <database dir>/vectors/):
+    - {table}.npy  - float32 matrix (n_rows x dim)
+    - {table}.json - rowids, dimension, model and source metadata, plus
+                     fingerprints of the store and of its source table
+    """
+
+    def __init__(self, db_path: Path, table_name: str):
+        """
+        Initialize vector store.
+
+        Args:
+            db_path: Path to SQLite database the vectors belong to
+            table_name: Base table the vectors embed (e.g., 'bia_sections')
+        """
+        self.db_path = Path(db_path)
+        self.table_name = table_name
+        self.store_dir = self.db_path.parent / "vectors"
+        self.vectors_file = self.store_dir / f"{table_name}.npy"
+        self.meta_file = self.store_dir / f"{table_name}.json"
+
+        self.rowids: Optional[np.ndarray] = None
+        self.vectors: Optional[np.ndarray] = None
+        self.metadata: Dict = {}
+
+    def exists(self) -> bool:
+        """Check if the store has been built."""
+        return self.vectors_file.exists() and self.meta_file.exists()
+
+    def __len__(self) -> int:
+        return 0 if self.rowids is None else len(self.rowids)
+
+    @property
+    def dim(self) -> int:
+        """Vector dimension (0 if not loaded)."""
+        return 0 if self.vectors is None else self.vectors.shape[1]
+
+    def compatible_with(self, model_name: str, dim: int) -> bool:
+        """
+        Check the loaded store can be queried with an embedder's vectors.
+
+        Stores built without a recorded model name only have to match on dimension.
+        """
+        recorded = self.metadata.get("model_name")
+        return self.dim == dim and (recorded is None or recorded == model_name)
+
+    def build(
+        self,
+        rowids: List[int],
+        embeddings: np.ndarray,
+        model_name: Optional[str] = None,
+        source: Optional[str] = None,
+        source_fingerprint: Optional[str] = None
+    ) -> Dict:
+        """
+        Normalize and write vectors to disk, replacing any existing store.
+
+        Args:
+            rowids: Base table rowid for each embedding row
+            embeddings: Matrix of embeddings (n_rows x dim)
+            model_name: Model that produced the embeddings
+            source: Where the embeddings came from (table name)
+            source_fingerprint: Fingerprint of the source table's contents
+
+        Returns:
+            Statistics dictionary
+        """
+        vectors = np.array(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(rowids):
+            raise ValueError(
+                f"Expected {len(rowids)} x dim embeddings, got shape {vectors.shape}"
+            )
+
+        # Normalize once so cosine similarity is a plain dot product
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+
+        # Content checksum: indexes built over the store record it to detect rebuilds
+        checksum = hashlib.sha256()
+        checksum.update(np.asarray(rowids, dtype=np.int64).tobytes())
+        checksum.update(vectors.tobytes())
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write to temp files and swap in, so readers never see a partial store
+        tmp_vectors = self.vectors_file.with_suffix(".npy.tmp")
+        with open(tmp_vectors, 'wb') as f:
+            np.save(f, vectors)
+
+        metadata = {
+            "table": self.table_name,
+            "rows": len(rowids),
+            "dim": int(vectors.shape[1]) if vectors.size else 0,
+            "model_name": model_name,
+            "source": source,
+            "source_fingerprint": source_fingerprint,
+            "checksum": checksum.hexdigest(),
+            "rowids": [int(r) for r in rowids]
+        }
+        tmp_meta = self.meta_file.with_suffix(".json.tmp")
+        with open(tmp_meta, 'w') as f:
+            json.dump(metadata, f)
+
+        os.replace(tmp_vectors, self.vectors_file)
+        os.replace(tmp_meta, self.meta_file)
+
+        logger.info(f"Wrote vector store {self.vectors_file} ({len(rowids)} x {metadata['dim']})")
+
+        self.load()
+
+        return {
+            "table": self.table_name,
+            "rows": metadata["rows"],
+            "dim": metadata["dim"],
+            "source": source,
+            "path": str(self.vectors_file)
+        }
+
+    def load(self) -> bool:
+        """
+        Memory-map the store from disk.
+
+        Returns:
+            True if loaded, False if the store has not been built
+        """
+        if not self.exists():
+            return False
+
+        with open(self.meta_file, 'r') as f:
+            self.metadata = json.load(f)
+
+        self.vectors = np.load(self.vectors_file, mmap_mode='r')
+        self.rowids = np.asarray(self.metadata["rowids"], dtype=np.int64)
+        return True
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Exact cosine similarity search.
+
+        Args:
+            query_embedding: Query vector (dim,)
+            top_k: Number of results to return
+
+        Returns:
+            List of (rowid, similarity) tuples, best first
+        """
+        if not len(self):
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(
+                f"Query dimension {query.shape[0]} does not match store dimension {self.dim}"
+            )
+
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = self.vectors @ query
+        top = top_k_indices(scores, top_k)
+
+        return [(int(self.rowids[i]), float(scores[i])) for i in top]
+
+    def search_many(self, query_embeddings: np.ndarray, top_k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Exact search for many queries with one matrix-matrix product.
+
+        Args:
+            query_embeddings: Query matrix (n_queries x dim)
+            top_k: Number of results per query
+
+        Returns:
+            One list of (rowid, similarity) tuples per query, best first
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        if not len(self):
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match store dimension {self.dim}"
+            )
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        scores = (queries / norms) @ self.vectors.T
+
+        results = []
+        for row in scores:
+            top = top_k_indices(row, top_k)
+            results.append([(int(self.rowids[i]), float(row[i])) for i in top])
+        return results
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest scores, best first (argpartition + small sort)."""
+    n = scores.shape[0]
+    if top_k >= n:
+        return np.argsort(-scores)
+
+    top = np.argpartition(-scores, top_k)[:top_k]
+    return top[np.argsort(-scores[top])]
+
+
+# ============================================================================
+# MIGRATION FROM EXISTING EMBEDDING TABLES
+# ============================================================================
+
+def _parse_embedding(value) -> np.ndarray:
+    """Decode an embedding stored as float32 BLOB or JSON text."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype=np.float32)
+    return np.asarray(json.loads(value), dtype=np.float32)
+
+
+def read_embeddings_table(conn: sqlite3.Connection, table_name: str) -> Tuple[List[int], np.ndarray]:
+    """
+    Read a legacy {table}_embeddings table (key column + embedding_json).
+
+    The key column (e.g. section_number) is mapped back to base table rowids.
+
+    Returns:
+        (rowids, embeddings)
+    """
+    emb_table = f"{table_name}_embeddings"
+
+    cursor = conn.execute(f"PRAGMA table_info({emb_table})")
+    emb_columns = [row[1] for row in cursor.fetchall()]
+    key_col = next(col for col in emb_columns if col != 'embedding_json')
+
+    cursor = conn.execute(f"""
+        SELECT t.rowid, e.embedding_json
+        FROM {emb_table} e
+        JOIN {table_name} t ON t.{key_col} = e.{key_col}
+    """)
+
+    rowids = []
+    vectors = []
+    for rowid, emb in cursor:
+        rowids.append(rowid)
+        vectors.append(_parse_embedding(emb))
+
+    return rowids, np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+def read_vec_table(conn: sqlite3.Connection, table_name: str) -> Tuple[List[int], np.ndarray]:
+    """
+    Read a sqlite-vec {table}_vec table written by EmbeddingsManager.
+
+    Returns:
+        (rowids, embeddings)
+    """
+    try:
+        import sqlite_vec
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+    except ImportError:
+        raise ImportError(
+            "sqlite-vec not installed. "
+            "Install with: pip install sqlite-vec"
+        )
+
+    cursor = conn.execute(f"SELECT rowid, embedding FROM {table_name}_vec")
+
+    rowids = []
+    vectors = []
+    for rowid, emb in cursor:
+        rowids.append(rowid)
+        vectors.append(_parse_embedding(emb))
+
+    return rowids, np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+def source_fingerprint(conn: sqlite3.Connection, source: str) -> str:
+    """
+    Fingerprint the contents of an embedding table.
+
+    A {table}_vec table is read through its content-hash table (written
+    with every vector, and readable without sqlite-vec); other tables are
+    hashed row by row.
+
+    Returns:
+        Hex SHA-256 that changes whenever rows are added, changed or deleted
+    """
+    hash_table = f"{source}_hashes"
+    has_hashes = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?", (hash_table,)
+    ).fetchone()
+
+    if has_hashes:
+        query = f"SELECT row_id, content_hash FROM {hash_table} ORDER BY row_id"
+    else:
+        query = f"SELECT rowid, * FROM {source} ORDER BY rowid"
+
+    digest = hashlib.sha256()
+    for row in conn.execute(query):
+        digest.update(repr(tuple(row)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_vector_store(db_path: Path, table_name: str, model_name: Optional[str] = None) -> Dict:
+    """
+    Build (or rebuild) the packed store for a table from its embedding table.
+
+    Prefers the sqlite-vec {table}_vec table, falling back to the JSON
+    {table}_embeddings table when sqlite-vec is unavailable or absent.
+
+    Args:
+        db_path: Path to the knowledge database
+        table_name: Base table name (e.g., 'bia_sections')
+        model_name: Model that produced the embeddings (recorded in metadata)
+
+    Returns:
+        Statistics dictionary
+    """
+    conn = sqlite3.connect(db_path)
+
+    try:
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        rowids = None
+        source = None
+
+        if f"{table_name}_vec" in tables:
+            try:
+                rowids, vectors = read_vec_table(conn, table_name)
+                source = f"{table_name}_vec"
+            except ImportError as e:
+                logger.warning(f"Skipping {table_name}_vec: {e}")
+
+        if rowids is None and f"{table_name}_embeddings" in tables:
+            rowids, vectors = read_embeddings_table(conn, table_name)
+            source = f"{table_name}_embeddings"
+
+        if rowids is None:
+            raise ValueError(f"No embedding table found for {table_name}")
+
+        fingerprint = source_fingerprint(conn, source)
+
+    finally:
+        conn.close()
+
+    store = VectorStore(db_path, table_name)
+    return store.build(rowids, vectors, model_name=model_name, source=source, source_fingerprint=fingerprint)
+
+
+def migrate_all(db_path: Path) -> Dict[str, Dict]:
+    """
+    Build vector stores for every table that has an embedding table.
+
+    Args:
+        db_path: Path to the knowledge database
+
+    Returns:
+        Dictionary mapping table names to statistics
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    conn.close()
+
+    base_tables = sorted(
+        {name[:-len("_embeddings")] for name in tables if name.endswith("_embeddings")} |
+        {name[:-len("_vec")] for name in tables if name.endswith("_vec")}
+    )
+
+    results = {}
+    for table in base_tables:
+        if table not in tables:
+            continue
+        try:
+            results[table] = build_vector_store(db_path, table)
+        except Exception as e:
+            logger.error(f"Failed to build vector store for {table}: {e}")
+            results[table] = {'error': str(e)}
+
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Usage: python vector_store.py <database_path> [table_name ...]")
+        print("\nExample:")
+        print("  python vector_store.py projects/insolvency-law/database/knowledge.db")
+        sys.exit(1)
+
+    db_path = Path(sys.argv[1])
+
+    if not db_path.exists():
+        print(f"Error: Database not found: {db_path}")
+        sys.exit(1)
+
+    if len(sys.argv) > 2:
+        results = {table: build_vector_store(db_path, table) for table in sys.argv[2:]}
+    else:
+        results = migrate_all(db_path)
+
+    for table, stats in results.items():
+        if 'error' in stats:
+            print(f"❌ {table}: {stats['error']}")
+        else:
+            print(f"✅ {table}: {stats['rows']} x {stats['dim']} from {stats['source']} → {stats['path']}")
@@ -1,9 +1,25 @@
 """
 Document processing modules for extracting and cleaning text from PDFs.
+
+Exports are imported on first use, so importing one submodule (e.g.
+document_processor.chunker from the extraction pipeline) does not pull
+in the PDF libraries pdf_extractor needs.
 """
 
-from .pdf_extractor import PDFExtractor
-from .text_cleaner import TextCleaner
-from .chunker import SmartChunker
+import importlib
+
+_EXPORTS = {
+    'PDFExtractor': '.pdf_extractor',
+    'TextCleaner': '.text_cleaner',
+    'SmartChunker': '.chunker',
+}
 
 __all__ = ['PDFExtractor', 'TextCleaner', 'SmartChunker']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
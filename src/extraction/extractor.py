@@ -5,12 +5,19 @@ Orchestrates multi-pass extraction across all categories.
 Version: 2.0 - Atomic extraction approach
 """
 
+import sys
+import json
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional
 import langextract as lx
+from langextract import data_lib
 from .schemas_v2_atomic import ExtractionCategory, ALL_CATEGORIES, get_category
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.response_cache import response_cache_enabled, shared_response_cache
+
 
 class ExtractionEngine:
     """
@@ -22,15 +29,21 @@ class ExtractionEngine:
     - Progress tracking
     - Result aggregation
     - HTML visualization generation
+    - Response caching (a category already extracted from the same text
+      with the same definition is read from the response cache)
     """
 
-    def __init__(self, model_id: str = "gemini-2.5-flash", api_key: Optional[str] = None):
+    def __init__(self,
+                 model_id: str = "gemini-2.5-flash",
+                 api_key: Optional[str] = None,
+                 use_cache: Optional[bool] = None):
         """
         Initialize extraction engine.
 
         Args:
             model_id: Gemini model to use (default: gemini-2.5-flash)
             api_key: API key (reads from environment if not provided)
+            use_cache: Reuse cached category results (default: on unless KB_EXTRACTION_CACHE=0)
         """
         import os
         self.model_id = model_id
@@ -40,6 +53,10 @@ class ExtractionEngine:
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment")
 
+        if use_cache is None:
+            use_cache = response_cache_enabled()
+        self.cache = shared_response_cache() if use_cache else None
+
         self.logger.info(f"Initialized ExtractionEngine with model: {model_id}")
 
     def extract_category(self,
@@ -65,8 +82,8 @@ class ExtractionEngine:
         self.logger.info(f"Passes: {passes}")
         self.logger.info(f"=" * 70)
 
-        try:
-            result = lx.extract(
+        def extract() -> lx.data.AnnotatedDocument:
+            return lx.extract(
                 text_or_documents=text,
                 prompt_description=category.prompt_template,
                 examples=category.examples,
@@ -76,6 +93,22 @@ class ExtractionEngine:
                 # fence_output=True - Not needed in 1.0.9+ (PR #239 fixed parsing issues)
             )
 
+        try:
+            if self.cache is None:
+                result = extract()
+            else:
+                response = self.cache.get_or_call(
+                    "langextract:category",
+                    lambda: json.dumps(data_lib.annotated_document_to_dict(extract())),
+                    model=self.model_id,
+                    text=text,
+                    category=category.name,
+                    prompt=category.prompt_template,
+                    examples=category.examples,
+                    passes=passes
+                )
+                result = data_lib.dict_to_annotated_document(json.loads(response))
+
             self.logger.info(f"✓ Extracted {len(result.extractions)} items for category: {category.name}")
             return result
 
@@ -14,10 +14,15 @@ from pathlib import Path
 import sqlite3
 import json
 import os
+import sys
 from typing import Dict, List, Optional, Tuple
 import time
 from dotenv import load_dotenv
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from utils.response_cache import response_cache_enabled, shared_response_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -25,13 +30,17 @@ load_dotenv()
 class RelationshipExtractor:
     """Extract relationships from existing entity data using AI."""
 
-    def __init__(self, db_path: Path, api_key: Optional[str] = None):
+    MODEL_ID = 'gemini-2.0-flash'  # Stable version with proper paid tier limits
+
+    def __init__(self, db_path: Path, api_key: Optional[str] = None, use_cache: Optional[bool] = None):
         """
         Initialize the relationship extractor.
 
         Args:
             db_path: Path to SQLite database
             api_key: Gemini API key (or use GEMINI_API_KEY env var)
+            use_cache: Answer repeated prompts from the response cache
+                (default: on unless KB_EXTRACTION_CACHE=0)
         """
         self.db_path = db_path
         self.db = sqlite3.connect(db_path)
@@ -43,7 +52,11 @@ class RelationshipExtractor:
             raise ValueError("GEMINI_API_KEY not found in environment")
 
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')  # Stable version with proper paid tier limits
+        self.model = genai.GenerativeModel(self.MODEL_ID)
+
+        if use_cache is None:
+            use_cache = response_cache_enabled()
+        self.cache = shared_response_cache() if use_cache else None
 
         # Statistics
         self.stats = {
@@ -52,9 +65,37 @@ class RelationshipExtractor:
             'document_requirements': 0,
             'trigger_relationships': 0,
             'api_calls': 0,
+            'cache_hits': 0,
             'errors': 0
         }
 
+    def _generate(self, kind: str, prompt: str) -> str:
+        """
+        Model response text for a prompt, from the response cache when the
+        same prompt (section text, entities, instructions) was sent before.
+
+        Args:
+            kind: Relationship kind (part of the cache key)
+            prompt: Full prompt
+
+        Returns:
+            Raw response text
+        """
+        def call() -> str:
+            self.stats['api_calls'] += 1
+            return self.model.generate_content(prompt).text
+
+        if self.cache is None:
+            return call()
+
+        api_calls = self.stats['api_calls']
+        text = self.cache.get_or_call(
+            f"relationships:{kind}", call, model=self.MODEL_ID, prompt=prompt
+        )
+        if self.stats['api_calls'] == api_calls:
+            self.stats['cache_hits'] += 1
+        return text
+
     def get_entities_in_section(self, section_number: str) -> Dict[str, List[Dict]]:
         """
         Get all entities that appear in a specific BIA section.
@@ -237,12 +278,10 @@ Example format:
 
 Return ONLY the JSON array, no other text."""
 
+        response_text = ""
         try:
-            response = self.model.generate_content(prompt)
-            self.stats['api_calls'] += 1
-
             # Parse JSON response
-            response_text = response.text.strip()
+            response_text = self._generate("duties", prompt).strip()
 
             # Clean up response (remove markdown code blocks if present)
             if response_text.startswith('```'):
@@ -262,7 +301,7 @@ Return ONLY the JSON array, no other text."""
 
         except json.JSONDecodeError as e:
             print(f"  ❌ JSON parse error for section {section_number}: {e}")
-            print(f"  Response: {response.text[:200]}")
+            print(f"  Response: {response_text[:200]}")
             self.stats['errors'] += 1
             return []
         except Exception as e:
@@ -320,10 +359,7 @@ Return ONLY a JSON array:
 Return ONLY the JSON array, no other text."""
 
         try:
-            response = self.model.generate_content(prompt)
-            self.stats['api_calls'] += 1
-
-            response_text = response.text.strip()
+            response_text = self._generate("document_requirements", prompt).strip()
             if response_text.startswith('```'):
                 response_text = response_text.split('```')[1]
                 if response_text.startswith('json'):
@@ -395,10 +431,7 @@ trigger_entity_type must be one of: procedure, deadline, event, condition
 Return ONLY the JSON array, no other text."""
 
         try:
-            response = self.model.generate_content(prompt)
-            self.stats['api_calls'] += 1
-
-            response_text = response.text.strip()
+            response_text = self._generate("triggers", prompt).strip()
             if response_text.startswith('```'):
                 response_text = response_text.split('```')[1]
                 if response_text.startswith('json'):
@@ -556,6 +589,7 @@ Return ONLY the JSON array, no other text."""
             return
 
         print(f"\n📍 Processing Section {section_number}")
+        api_calls = self.stats['api_calls']
 
         # Extract duty relationships
         duties = self.extract_duties_from_section(section_number)
@@ -577,8 +611,9 @@ Return ONLY the JSON array, no other text."""
 
         self.stats['sections_processed'] += 1
 
-        # Rate limiting
-        time.sleep(1)  # 1 second between sections
+        # Rate limiting (not needed when every answer came from the cache)
+        if self.stats['api_calls'] > api_calls:
+            time.sleep(1)  # 1 second between sections
 
     def process_priority_sections(self):
         """
@@ -649,6 +684,7 @@ Return ONLY the JSON array, no other text."""
         print(f"Trigger relationships:    {self.stats['trigger_relationships']}")
         print(f"Total relationships:      {self.stats['duty_relationships'] + self.stats['document_requirements'] + self.stats['trigger_relationships']}")
         print(f"API calls made:           {self.stats['api_calls']}")
+        print(f"Cached responses used:    {self.stats['cache_hits']}")
         print(f"Errors encountered:       {self.stats['errors']}")
         print(f"{'='*60}\n")
 
@@ -666,11 +702,13 @@ def main():
                         help='Process priority sections or all sections')
     parser.add_argument('--db', default='database/insolvency_knowledge.db',
                         help='Path to database file')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the extraction response cache')
 
     args = parser.parse_args()
 
     # Initialize extractor
-    extractor = RelationshipExtractor(Path(args.db))
+    extractor = RelationshipExtractor(Path(args.db), use_cache=False if args.no_cache else None)
 
     try:
         if args.mode == 'priority':
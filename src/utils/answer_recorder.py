@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Answer Recorder Module
+
+CSV audit trail for answered exam questions (tracking/questions_answered.csv).
+Shared by the answer_exam_question tool and the batch question runners so
+every path writes the same columns.
+"""
+
+import csv
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+
+CSV_HEADER = [
+    "timestamp", "question", "answer_choice", "primary_quote",
+    "reference", "source", "cross_references",
+    "search_method", "keywords", "rationale",
+    "correct_answer", "is_correct"
+]
+
+# Answer tools can run concurrently (MCP read pool); keep header + rows atomic
+_write_lock = threading.Lock()
+
+
+def build_answer_row(
+    question: str,
+    answer_choice: str,
+    keywords: str,
+    structured_results: List[Dict],
+    relationship_results: List[Dict],
+    domain: str,
+    domain_config: Dict,
+    search_method: str = "Universal FTS5 search"
+) -> List[str]:
+    """
+    Build one CSV record for an answered question.
+
+    Returns:
+        Row matching CSV_HEADER
+    """
+    # Extract quote from results
+    if structured_results:
+        quote = structured_results[0]['full_text'][:500]
+        source_ref = structured_results[0]['id']
+    elif relationship_results:
+        quote = relationship_results[0]['text'][:500]
+        source_ref = "Study Materials"
+    else:
+        quote = "NOT FOUND"
+        source_ref = "N/A"
+
+    return [
+        datetime.now().isoformat(),
+        question,
+        answer_choice if answer_choice else "",
+        quote,
+        source_ref,
+        f"{domain_config.get('source_type', 'document')}",
+        "",  # cross_references (extracted in answer)
+        search_method,
+        keywords,
+        f"Based on {domain} domain knowledge base",
+        "",  # correct_answer (user fills later)
+        ""   # is_correct (user fills later)
+    ]
+
+
+def append_answer_rows(csv_path: Path, rows: List[List[str]]):
+    """
+    Append records to the CSV audit trail in one write.
+
+    Args:
+        csv_path: Path to questions_answered.csv
+        rows: Records built with build_answer_row()
+    """
+    with _write_lock:
+        # Check if file exists to determine if we need header
+        file_exists = csv_path.exists()
+
+        with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+
+            if not file_exists:
+                writer.writerow(CSV_HEADER)
+
+            writer.writerows(rows)
+
+
+def load_questions(path: Path) -> List[Dict[str, str]]:
+    """
+    Read questions for a batch run.
+
+    Accepts a .csv file with a 'question' column (optional 'answer_choice'
+    and 'topic_hint' columns) or a plain text file with one question per line.
+
+    Args:
+        path: Questions file
+
+    Returns:
+        List of {'question', 'answer_choice', 'topic_hint'} dictionaries
+    """
+    path = Path(path)
+    questions = []
+
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or 'question' not in reader.fieldnames:
+                raise ValueError(f"{path} has no 'question' column")
+            for record in reader:
+                question = (record.get('question') or '').strip()
+                if question:
+                    questions.append({
+                        'question': question,
+                        'answer_choice': (record.get('answer_choice') or '').strip(),
+                        'topic_hint': (record.get('topic_hint') or '').strip()
+                    })
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                question = line.strip()
+                if question and not question.startswith('#'):
+                    questions.append({'question': question, 'answer_choice': '', 'topic_hint': ''})
+
+    return questions
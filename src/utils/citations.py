@@ -0,0 +1,43 @@
+"""
+Section reference detection for free text.
+
+Finds statute section citations such as:
+- "BIA s. 50.4"
+- "section 158"
+- "s. 67(1)"
+
+Used by CrossReferenceNavigator to follow citations and by the search
+fast path to answer questions that name a section outright.
+"""
+
+import re
+from typing import List
+
+
+SECTION_REFERENCE_PATTERNS = [
+    re.compile(r'BIA\s+s\.\s*(\d+(?:\.\d+)?(?:\(\d+\))?)', re.IGNORECASE),
+    re.compile(r'\bsection\s+(\d+(?:\.\d+)?(?:\(\d+\))?)', re.IGNORECASE),
+    re.compile(r'\bs\.\s*(\d+(?:\.\d+)?(?:\(\d+\))?)', re.IGNORECASE),
+]
+
+
+def find_section_references(text: str) -> List[str]:
+    """
+    Extract main section numbers cited in text.
+
+    Subsections are folded into their section ("50.4(1)" -> "50.4"),
+    since sections are stored whole.
+
+    Args:
+        text: Any text (question, section body, directive)
+
+    Returns:
+        Sorted unique section numbers
+    """
+    found_sections = set()
+    for pattern in SECTION_REFERENCE_PATTERNS:
+        for match in pattern.findall(text):
+            # Clean: "50.4(1)" → "50.4" (we store main sections)
+            found_sections.add(re.sub(r'\([0-9]+\)', '', match))
+
+    return sorted(found_sections)
@@ -8,9 +8,15 @@ Links deadlines to actors and documents based on:
 """
 
 import sqlite3
+import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connections import get_read_pool
+
 
 class ProximityLinker:
     """Link entities by proximity and context."""
@@ -18,7 +24,8 @@ class ProximityLinker:
     def __init__(self, db_path: Path):
         """Initialize with database path."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self._pool = get_read_pool(db_path)
+        self.conn = self._pool.acquire()
         self.conn.row_factory = sqlite3.Row
 
     def link_deadline_to_actors(self, deadline_id: int, char_window: int = 300) -> List[str]:
@@ -197,8 +204,8 @@ class ProximityLinker:
         return "Action required"
 
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Return the database connection to the read pool."""
+        self._pool.release(self.conn)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,218 @@
+"""
+Content-addressed cache of extraction API responses.
+
+Extraction calls are deterministic enough to reuse: the same text chunk,
+sent with the same category definition (attributes, examples, prompt) to
+the same model, gets the same answer. Each response is stored under a
+SHA-256 of exactly those inputs, so:
+
+- re-running an extraction (after a crash, or of a second project holding
+  the same document) answers from the cache
+- after a schema tweak, only categories whose definition changed miss
+
+Responses are stored raw (the API's JSON body, or the model's text) in a
+workspace-wide side database, data/cache/extraction_responses.db, and
+evicted least recently used first once they exceed max_bytes.
+
+Used by LangExtractClient (shared/src/extraction), RelationshipExtractor
+and ExtractionEngine. Set KB_EXTRACTION_CACHE=0 to bypass it.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "extraction_responses.db"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def response_cache_enabled() -> bool:
+    """False when KB_EXTRACTION_CACHE is set to 0/false/no (bypass)."""
+    return os.environ.get("KB_EXTRACTION_CACHE", "1").lower() not in ("0", "false", "no")
+
+
+def _canonical(value: Any) -> Any:
+    """JSON fallback for key parts (dataclasses such as example objects, then repr)."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return repr(value)
+
+
+def cache_key(namespace: str, **parts) -> str:
+    """
+    Content address of one API call.
+
+    Args:
+        namespace: Kind of call (e.g. 'langextract:entities')
+        **parts: Everything the response depends on - text chunk,
+            category definition, examples, model ID
+
+    Returns:
+        Hex SHA-256 of the namespace and the canonical JSON of parts
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_canonical)
+    return hashlib.sha256(f"{namespace}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk, size-bounded LRU cache of raw extraction responses.
+
+    Thread-safe; hit/miss counters cover the current process.
+    """
+
+    def __init__(self, cache_path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_path: Side database file holding the cache
+            max_bytes: Total response size kept before least-recently-used eviction
+        """
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key (None on a miss)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE cache_key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, namespace: str, response: str):
+        """Store a response and evict least recently used ones beyond max_bytes."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO responses (cache_key, namespace, response, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, namespace, response, size, now, now))
+            evicted = self._conn.execute("""
+                DELETE FROM responses WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key, SUM(size) OVER (ORDER BY last_used DESC, rowid DESC) AS kept
+                        FROM responses
+                    )
+                    WHERE kept > ?
+                )
+            """, (self.max_bytes,)).rowcount
+            self._conn.commit()
+
+            self.writes += 1
+            self.evictions += max(evicted, 0)
+
+    def get_or_call(self, namespace: str, call: Callable[[], str], **parts) -> str:
+        """
+        Cached response for a call, making the call (and storing it) on a miss.
+
+        Args:
+            namespace: Kind of call (part of the key)
+            call: Makes the API call and returns the raw response
+            **parts: Inputs the response depends on (see cache_key)
+
+        Returns:
+            Raw response
+        """
+        key = cache_key(namespace, **parts)
+        response = self.get(key)
+        if response is None:
+            response = call()
+            self.put(key, namespace, response)
+        return response
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters for this process plus entries and bytes on disk."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes
+        }
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the side database."""
+        with self._lock:
+            self._conn.close()
+
+
+# One cache per file per process, shared by every client and thread
+_shared_caches: Dict[str, ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_response_cache(cache_path: Optional[Path] = None) -> ResponseCache:
+    """
+    Get the process-wide response cache.
+
+    Args:
+        cache_path: Cache file (default: data/cache/extraction_responses.db)
+
+    Returns:
+        ResponseCache
+    """
+    key = str(Path(cache_path or DEFAULT_CACHE_PATH).resolve())
+
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ResponseCache(Path(key))
+            _shared_caches[key] = cache
+        return cache
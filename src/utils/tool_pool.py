@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tool Pool Module
+
+Bounded worker pools for MCP tool bodies.
+
+Tool implementations are blocking (SQLite, NumPy, model encoding, LLM
+extraction calls). Running them on the event loop would stall every other
+request, so the server hands each call to a pool instead:
+
+1. read  - lookups, answers, statistics, diagrams (several at once)
+2. write - adding material, extraction, project switches (one at a time)
+
+Each pool has its own concurrency limit, so a long extraction never takes
+a slot a lookup needs. Calls beyond the limit wait in the pool's queue;
+queue depth and peak depth are reported by stats().
+"""
+
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+READ = 'read'
+WRITE = 'write'
+
+DEFAULT_LIMITS = {
+    READ: 4,
+    WRITE: 1,
+}
+
+
+def limits_from_env() -> Dict[str, int]:
+    """Pool limits, overridable with KB_READ_WORKERS / KB_WRITE_WORKERS."""
+    return {
+        kind: max(1, int(os.environ.get(f"KB_{kind.upper()}_WORKERS", default)))
+        for kind, default in DEFAULT_LIMITS.items()
+    }
+
+
+class ToolPool:
+    """
+    Thread pools with per-kind concurrency limits and queue-depth metrics.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize tool pool.
+
+        Args:
+            limits: Maximum concurrent calls per kind (defaults to limits_from_env())
+        """
+        self.limits = limits or limits_from_env()
+
+        self._pools = {
+            kind: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"tool-{kind}")
+            for kind, limit in self.limits.items()
+        }
+        self._lock = threading.Lock()
+        self._counters = {
+            kind: {'queued': 0, 'running': 0, 'peak_queued': 0, 'completed': 0, 'failed': 0}
+            for kind in self.limits
+        }
+
+    async def run(self, kind: str, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking function on the pool for its kind.
+
+        Args:
+            kind: Pool to use (READ or WRITE)
+            fn: Blocking callable
+            *args: Arguments for fn
+
+        Returns:
+            fn's return value (exceptions propagate to the caller)
+        """
+        counters = self._counters[kind]
+
+        with self._lock:
+            counters['queued'] += 1
+            counters['peak_queued'] = max(counters['peak_queued'], counters['queued'])
+            depth = counters['queued']
+
+        if depth > 1:
+            logger.debug(f"{kind} pool: {depth} calls waiting")
+
+        def call():
+            with self._lock:
+                counters['queued'] -= 1
+                counters['running'] += 1
+            try:
+                return fn(*args)
+            except BaseException:
+                with self._lock:
+                    counters['failed'] += 1
+                raise
+            finally:
+                with self._lock:
+                    counters['running'] -= 1
+                    counters['completed'] += 1
+
+        future = self._pools[kind].submit(call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Request abandoned before a worker picked it up: it will never run
+            if future.cancel():
+                with self._lock:
+                    counters['queued'] -= 1
+            raise
+
+    def queue_depth(self, kind: Optional[str] = None) -> int:
+        """Calls waiting for a worker (for one kind, or all kinds)."""
+        with self._lock:
+            if kind is not None:
+                return self._counters[kind]['queued']
+            return sum(c['queued'] for c in self._counters.values())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Limit, running, queued, peak queued, completed and failed calls per kind."""
+        with self._lock:
+            return {
+                kind: {'limit': self.limits[kind], **counters}
+                for kind, counters in self._counters.items()
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting calls and (optionally) wait for running ones."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
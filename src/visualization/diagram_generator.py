@@ -9,13 +9,17 @@ Automatically generates Mermaid diagrams from database content:
 - Comparison tables
 """
 
-import sqlite3
+import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import re
 import logging
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from database.connections import read_connection
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,10 +74,9 @@ class MermaidDiagramGenerator:
 
     def _get_deadlines(self, topic: str) -> List[Dict]:
         """Get deadlines for topic from database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             # Check if deadlines table exists
             cursor.execute("""
                 SELECT name FROM sqlite_master
@@ -108,15 +111,11 @@ class MermaidDiagramGenerator:
 
             return deadlines
 
-        finally:
-            conn.close()
-
     def _get_procedures(self, topic: str) -> List[Dict]:
         """Get procedures for topic from database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             cursor.execute("""
                 SELECT name FROM sqlite_master
                 WHERE type='table' AND name='procedures'
@@ -151,15 +150,11 @@ class MermaidDiagramGenerator:
 
             return procedures
 
-        finally:
-            conn.close()
-
     def _get_actors(self, topic: str) -> List[Dict]:
         """Get actors for topic from database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             cursor.execute("""
                 SELECT name FROM sqlite_master
                 WHERE type='table' AND name='actors'
@@ -188,9 +183,6 @@ class MermaidDiagramGenerator:
 
             return actors
 
-        finally:
-            conn.close()
-
     def _parse_timeframe(self, timeframe: str) -> tuple[Optional[str], Optional[int]]:
         """
         Parse timeframe into unit and duration.
@@ -354,10 +346,9 @@ class MermaidDiagramGenerator:
         Returns:
             Markdown table string (not Mermaid, as Mermaid doesn't support tables well)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             # Get key features for each topic from concepts table
             features = {}
 
@@ -389,9 +380,6 @@ class MermaidDiagramGenerator:
 
             return table
 
-        finally:
-            conn.close()
-
     def generate_entity_relationship_diagram(self, topic: str) -> str:
         """
         Generate entity-relationship diagram showing actors and documents.
@@ -404,10 +392,9 @@ class MermaidDiagramGenerator:
         """
         actors = self._get_actors(topic)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with read_connection(self.db_path) as conn:
+            cursor = conn.cursor()
 
-        try:
             # Get documents
             cursor.execute("""
                 SELECT DISTINCT extraction_text
@@ -418,9 +405,6 @@ class MermaidDiagramGenerator:
 
             docs = [row[0] for row in cursor.fetchall()]
 
-        finally:
-            conn.close()
-
         # Build ER diagram
         mermaid = "erDiagram\n"
 
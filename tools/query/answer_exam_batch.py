@@ -0,0 +1,103 @@
+"""
+Batch exam question runner.
+
+Answers a file of questions against a project's knowledge base with one
+batched search (single embedding call, single vector scoring pass) and
+appends every answer to the project's questions_answered.csv in one write.
+
+Usage:
+  python tools/query/answer_exam_batch.py questions.txt
+  python tools/query/answer_exam_batch.py questions.csv --project insolvency-law
+  python tools/query/answer_exam_batch.py questions.txt --output run.csv --fts-only
+
+Questions file: one question per line (.txt), or a CSV with a 'question'
+column and optional 'answer_choice' / 'topic_hint' columns.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+repo_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(repo_root / "shared" / "src"))
+
+from project import ProjectManager
+
+sys.path.insert(0, str(repo_root / "src"))
+
+from database.query_engine import QueryEngine
+from database.universal_search import search_batch
+from utils.answer_recorder import CSV_HEADER, build_answer_row, append_answer_rows, load_questions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Answer a file of exam questions in one batch')
+    parser.add_argument('questions_file', type=Path, help='Questions file (.txt or .csv)')
+    parser.add_argument('--project', type=str, help='Project ID (defaults to current project)')
+    parser.add_argument('--output', type=Path, help='CSV to append to (defaults to tracking/questions_answered.csv)')
+    parser.add_argument('--fts-only', action='store_true', help='Skip loading the embedding model')
+
+    args = parser.parse_args()
+
+    pm = ProjectManager(repo_root)
+    project = pm.load_project(args.project) if args.project else pm.get_current_project()
+    if not project:
+        print('❌ No project found. Pass --project or switch to a project first.')
+        sys.exit(1)
+
+    db_path = Path(project.database_path)
+    if not db_path.exists():
+        print(f'❌ No database found for {project.project_name}: {db_path}')
+        sys.exit(1)
+
+    questions = load_questions(args.questions_file)
+    if not questions:
+        print(f'❌ No questions in {args.questions_file}')
+        sys.exit(1)
+
+    engine = QueryEngine()
+    try:
+        if not args.fts_only:
+            print('Loading embedding model...')
+            engine.wait_until_warm()
+        print(f'Query engine: {engine.status()}')
+
+        keywords = [q['topic_hint'] or q['question'] for q in questions]
+
+        start = time.time()
+        results = search_batch(engine, db_path, keywords, project.domain_terminology)
+        elapsed = time.time() - start
+
+        rows = [
+            build_answer_row(
+                q['question'],
+                q['answer_choice'],
+                kw,
+                structured_results,
+                relationship_results,
+                project.domain,
+                project.domain_terminology
+            )
+            for q, kw, (structured_results, relationship_results) in zip(questions, keywords, results)
+        ]
+
+        csv_path = args.output or project.get_tracking_file('questions_answered.csv')
+        append_answer_rows(csv_path, rows)
+
+        reference_column = CSV_HEADER.index('reference')
+        found = sum(1 for row in rows if row[reference_column] != 'N/A')
+        print(f'\n✅ Answered {len(questions)} questions in {elapsed:.2f}s '
+              f'({elapsed * 1000 / len(questions):.0f} ms/question)')
+        print(f'   Found sources for {found}/{len(questions)}')
+        for q, result in zip(questions, results):
+            if result.error:
+                print(f'   ⚠️  Search failed for {q["question"][:60]!r}: {result.error}')
+        print(f'   Recorded to {csv_path}')
+
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,40 +8,32 @@ Enables automatic traversal of statutory references:
 - Bi-directional navigation
 """
 
-import sqlite3
+import sys
 from pathlib import Path
 import re
 from typing import List, Dict
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+
+from database.connections import get_read_pool
+from utils.citations import find_section_references
+
 
 class CrossReferenceNavigator:
     """Navigate cross-references between sources."""
 
     def __init__(self, db_path: Path):
-        self.conn = sqlite3.connect(db_path)
+        self._pool = get_read_pool(db_path)
+        self.conn = self._pool.acquire()
 
     def close(self):
-        """Close connection."""
-        self.conn.close()
+        """Return connection to the read pool."""
+        self._pool.release(self.conn)
 
     def find_bia_section_references(self, text: str) -> List[str]:
         """Extract BIA section references from any text."""
         # Patterns: "BIA s. 50.4", "section 158", "s. 67(1)"
-        patterns = [
-            r'BIA\s+s\.\s*(\d+(?:\.\d+)?(?:\(\d+\))?)',
-            r'section\s+(\d+(?:\.\d+)?(?:\(\d+\))?)',
-            r's\.\s*(\d+(?:\.\d+)?(?:\(\d+\))?)',
-        ]
-
-        found_sections = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean: "50.4(1)" → "50.4" (we store main sections)
-                clean = re.sub(r'\([0-9]+\)', '', match)
-                found_sections.add(clean)
-
-        return sorted(found_sections)
+        return find_section_references(text)
 
     def get_bia_section(self, section_number: str) -> Dict:
         """Retrieve BIA section by number."""